@@ -2,6 +2,10 @@ import sqlite3
 import os
 import json
 import logging
+import argparse
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from functools import wraps
 from datetime import datetime, timedelta
 
 
@@ -11,17 +15,260 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 DATABASE_NAME = "horarios.db"
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), DATABASE_NAME)
 
-def crear_conexion():
-    """Crea una conexión a la base de datos SQLite."""
+# Modo estricto: rechaza sesiones que se cruzan con otra del mismo salón o del
+# mismo docente. Se puede forzar por llamada con `estricto=` o durante una
+# importación con `with modo_estricto(False): ...`.
+MODO_ESTRICTO = False
+
+# Filas que guarda por defecto la caché de entidades de cada conexión
+# (`crear_conexion(tamano_cache=0)` la desactiva)
+TAMANO_CACHE_ENTIDADES = 1024
+
+# Columnas enteras derivadas de SesionesClase (las mantienen los triggers) para
+# que la búsqueda de cruces sea una consulta por rango sobre un índice
+_SQL_DIA_NUM = """
+    CASE replace(replace(replace(replace(lower(trim({dia})), 'é', 'e'), 'É', 'e'), 'á', 'a'), 'Á', 'a')
+        WHEN 'lunes' THEN 0 WHEN 'martes' THEN 1 WHEN 'miercoles' THEN 2
+        WHEN 'jueves' THEN 3 WHEN 'viernes' THEN 4 WHEN 'sabado' THEN 5 WHEN 'domingo' THEN 6
+    END"""
+_SQL_MINUTOS = "(CAST(substr({hora}, 1, instr({hora}, ':') - 1) AS INTEGER) * 60 + CAST(substr({hora}, instr({hora}, ':') + 1) AS INTEGER))"
+_SQL_COLUMNAS_TIEMPO = (
+    "dia_num = " + _SQL_DIA_NUM.format(dia="dia_semana") + ", "
+    "inicio_min = " + _SQL_MINUTOS.format(hora="hora_inicio") + ", "
+    "fin_min = " + _SQL_MINUTOS.format(hora="hora_fin")
+)
+
+# Docente y salón se guardan como claves enteras a las tablas Docentes y
+# Salones. La misma definición sirve para crear la tabla y para migrar bases
+# anteriores, en las que eran columnas de texto.
+_SQL_TABLA_SESIONES = """
+    CREATE TABLE IF NOT EXISTS {tabla} (
+        id_sesion INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_grupo_materia_fk INTEGER NOT NULL,
+        tipo_sesion TEXT NOT NULL,
+        dia_semana TEXT NOT NULL,
+        hora_inicio TEXT NOT NULL,
+        hora_fin TEXT NOT NULL,
+        id_docente_fk INTEGER,
+        id_salon_fk INTEGER,
+        dia_num INTEGER,
+        inicio_min INTEGER,
+        fin_min INTEGER,
+        FOREIGN KEY (id_grupo_materia_fk) REFERENCES GruposMateria (id_grupo_materia) ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY (id_docente_fk) REFERENCES Docentes (id_docente) ON DELETE SET NULL,
+        FOREIGN KEY (id_salon_fk) REFERENCES Salones (id_salon) ON DELETE SET NULL
+    );"""
+_SQL_JOIN_DOCENTE_SALON = """
+        LEFT JOIN Docentes AS D ON D.id_docente = S.id_docente_fk
+        LEFT JOIN Salones AS SA ON SA.id_salon = S.id_salon_fk"""
+# Cómo migrar una base anterior; lo muestran crear_conexion_migrada y las interfaces
+AVISO_MIGRACION = "migrarla con `python -m database.db_manager --migrar`."
+# recurso -> (tabla, columna id, columna en SesionesClase)
+_RECURSOS_SESION = {
+    "salon": ("Salones", "id_salon", "id_salon_fk"),
+    "docente": ("Docentes", "id_docente", "id_docente_fk"),
+}
+
+
+@contextmanager
+def modo_estricto(activo=True):
+    """Activa o desactiva temporalmente la validación de cruces de salón y docente."""
+    global MODO_ESTRICTO
+    anterior = MODO_ESTRICTO
+    MODO_ESTRICTO = activo
+    try:
+        yield
+    finally:
+        MODO_ESTRICTO = anterior
+
+class CacheEntidades:
+    """
+    Caché LRU de las filas que devuelven `obtener_materia_por_codigo`,
+    `obtener_grupo_por_id` y `obtener_sesion_por_id` en una conexión.
+
+    Las funciones actualizar_* y eliminar_* de este módulo desalojan
+    exactamente las filas que cambian, incluidas las cascadas (eliminar una
+    materia desaloja sus grupos y las sesiones de esos grupos). Cualquier otra
+    escritura hecha en la misma conexión (SQL directo) vacía la caché en la
+    siguiente lectura. Los cambios de otras conexiones solo se detectan con
+    `revisar_otras_conexiones=True`, que consulta `PRAGMA data_version` en cada
+    lectura y cuesta casi lo mismo que la consulta que se evita.
+    """
+
+    def __init__(self, tamano=TAMANO_CACHE_ENTIDADES, revisar_otras_conexiones=False):
+        self.tamano = tamano
+        self.revisar_otras_conexiones = revisar_otras_conexiones
+        self._filas = OrderedDict()  # (tipo, clave) -> fila, de la menos a la más reciente
+        self._grupos_por_materia = defaultdict(set)
+        self._sesiones_por_grupo = defaultdict(set)
+        self._cambios = None
+        self._version = None
+        self.aciertos = self.fallos = self.desalojos = self.invalidaciones = 0
+
+    def sincronizar(self, conn):
+        """Vacía la caché si la base cambió por fuera de las funciones de este módulo."""
+        version = conn.execute("PRAGMA data_version").fetchone()[0] if self.revisar_otras_conexiones else None
+        if conn.total_changes != self._cambios or version != self._version:
+            if self._filas:
+                self.invalidaciones += len(self._filas)
+                self.limpiar()
+            self._cambios = conn.total_changes
+            self._version = version
+
+    def obtener(self, conn, tipo, clave):
+        self.sincronizar(conn)
+        fila = self._filas.get((tipo, clave))
+        if fila is None:
+            self.fallos += 1
+            return None
+        self._filas.move_to_end((tipo, clave))
+        self.aciertos += 1
+        return fila
+
+    def guardar(self, conn, tipo, clave, fila):
+        # Lo leído dentro de una transacción abierta todavía puede deshacerse
+        if self.tamano <= 0 or conn.in_transaction:
+            return
+        self._filas[(tipo, clave)] = fila
+        self._filas.move_to_end((tipo, clave))
+        if tipo == "grupo":
+            self._grupos_por_materia[fila[1]].add(clave)
+        elif tipo == "sesion":
+            self._sesiones_por_grupo[fila[1]].add(clave)
+        while len(self._filas) > self.tamano:
+            (tipo_viejo, clave_vieja), fila_vieja = self._filas.popitem(last=False)
+            self._quitar_de_indices(tipo_viejo, clave_vieja, fila_vieja)
+            self.desalojos += 1
+
+    def _quitar(self, tipo, clave):
+        fila = self._filas.pop((tipo, clave), None)
+        if fila is not None:
+            self._quitar_de_indices(tipo, clave, fila)
+            self.invalidaciones += 1
+
+    def _quitar_de_indices(self, tipo, clave, fila):
+        indice = {"grupo": self._grupos_por_materia, "sesion": self._sesiones_por_grupo}.get(tipo)
+        if indice is not None and fila[1] in indice:
+            indice[fila[1]].discard(clave)
+            if not indice[fila[1]]:
+                del indice[fila[1]]
+
+    def invalidar(self, conn, materias=(), grupos=(), sesiones=()):
+        """
+        Desaloja las materias, grupos y sesiones indicados; los grupos
+        desalojados arrastran sus sesiones y las materias sus grupos. Se llama
+        después de confirmar la escritura.
+        """
+        grupos = set(grupos)
+        for codigo in materias:
+            self._quitar("materia", codigo)
+            grupos |= self._grupos_por_materia.pop(codigo, set())
+        for id_grupo in grupos:
+            self._quitar("grupo", id_grupo)
+            for id_sesion in self._sesiones_por_grupo.pop(id_grupo, set()):
+                self._quitar("sesion", id_sesion)
+        for id_sesion in sesiones:
+            self._quitar("sesion", id_sesion)
+        self._cambios = conn.total_changes
+
+    def limpiar(self):
+        self._filas.clear()
+        self._grupos_por_materia.clear()
+        self._sesiones_por_grupo.clear()
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._filas),
+            "tamano": self.tamano,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "desalojos": self.desalojos,
+            "invalidaciones": self.invalidaciones,
+        }
+
+
+class Conexion(sqlite3.Connection):
+    """Conexión de la aplicación: lleva la caché de entidades (None si está desactivada)."""
+    cache_entidades = None
+
+
+def _con_cache(tipo):
+    """Decorador para obtener_*_por_*(conn, clave): lee primero de la caché de la conexión."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(conn, clave):
+            cache = getattr(conn, "cache_entidades", None)
+            if cache is None:
+                return funcion(conn, clave)
+            fila = cache.obtener(conn, tipo, clave)
+            if fila is None:
+                fila = funcion(conn, clave)
+                if fila is not None:
+                    cache.guardar(conn, tipo, clave, fila)
+            return fila
+        return envoltura
+    return decorador
+
+def _sincronizar_cache(conn):
+    """Antes de una escritura: que no se pierdan cambios hechos por fuera del módulo."""
+    cache = getattr(conn, "cache_entidades", None)
+    if cache is not None:
+        cache.sincronizar(conn)
+    return cache
+
+def _invalidar_cache(conn, materias=(), grupos=(), sesiones=()):
+    cache = getattr(conn, "cache_entidades", None)
+    if cache is not None:
+        cache.invalidar(conn, materias, grupos, sesiones)
+
+def _sesiones_en_cache_de_recurso(conn, recurso, id_recurso):
+    """IDs de las sesiones de un docente o salón, para desalojarlas al cambiarlo ([] sin caché)."""
+    if _sincronizar_cache(conn) is None:
+        return []
+    _, _, columna_fk = _RECURSOS_SESION[recurso]
+    return [fila[0] for fila in conn.execute(f"SELECT id_sesion FROM SesionesClase WHERE {columna_fk} = ?", (id_recurso,))]
+
+def estadisticas_cache(conn):
+    """Aciertos, fallos, tasa de aciertos, desalojos e invalidaciones de la caché de la conexión."""
+    cache = getattr(conn, "cache_entidades", None)
+    return cache.estadisticas() if cache is not None else None
+
+def crear_conexion(ruta_db=None, tamano_cache=None):
+    """
+    Crea una conexión a la base de datos SQLite (por defecto, `DATABASE_PATH`)
+    con su caché de entidades de `tamano_cache` filas (por defecto,
+    `TAMANO_CACHE_ENTIDADES`; 0 la desactiva). No revisa si la base está
+    migrada: eso lo hace una vez `crear_conexion_migrada`.
+    """
     conn = None
+    ruta_db = ruta_db or DATABASE_PATH
+    tamano_cache = TAMANO_CACHE_ENTIDADES if tamano_cache is None else tamano_cache
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(ruta_db, factory=Conexion)
         conn.execute("PRAGMA foreign_keys = ON;")
-        logging.info(f"Conexión exitosa a la base de datos: {DATABASE_PATH}")
+        logging.info(f"Conexión exitosa a la base de datos: {ruta_db}")
+        if tamano_cache > 0:
+            conn.cache_entidades = CacheEntidades(tamano_cache)
     except sqlite3.Error as e:
         logging.error(f"Error al conectar con la base de datos: {e}")
     return conn
 
+def crear_conexion_migrada(ruta_db=None, tamano_cache=None):
+    """
+    Conexión para los scripts y las interfaces: como `crear_conexion`, pero
+    devuelve None (y explica cómo migrar) si la base todavía guarda docente y
+    salón como texto. Con esa base las consultas del catálogo fallan y el
+    resultado parecería un catálogo vacío.
+    """
+    conn = crear_conexion(ruta_db, tamano_cache)
+    if conn is not None and necesita_migracion(conn):
+        logging.error(f"La base {ruta_db or DATABASE_PATH} no está migrada: {AVISO_MIGRACION}")
+        conn.close()
+        return None
+    return conn
+
 def crear_tablas(conn):
     """Crea las tablas en la base de datos si no existen."""
     try:
@@ -42,32 +289,233 @@ def crear_tablas(conn):
                 FOREIGN KEY (codigo_materia_fk) REFERENCES Materias (codigo_materia) ON DELETE CASCADE ON UPDATE CASCADE
             );
         """)
+        _crear_tablas_docentes_salones(cursor)
+        cursor.execute(_SQL_TABLA_SESIONES.format(tabla="SesionesClase"))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS HistorialMateriasCursadas (
+                codigo_materia TEXT PRIMARY KEY,
+                fecha_registro TEXT,
+                nota REAL,
+                FOREIGN KEY (codigo_materia) REFERENCES Materias (codigo_materia) ON DELETE CASCADE ON UPDATE CASCADE
+            );
+        """)
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS SesionesClase (
-                id_sesion INTEGER PRIMARY KEY AUTOINCREMENT,
-                id_grupo_materia_fk INTEGER NOT NULL,
-                tipo_sesion TEXT NOT NULL,
-                dia_semana TEXT NOT NULL,
-                hora_inicio TEXT NOT NULL,
-                hora_fin TEXT NOT NULL,
-                docente TEXT,
-                salon TEXT,
-                FOREIGN KEY (id_grupo_materia_fk) REFERENCES GruposMateria (id_grupo_materia) ON DELETE CASCADE ON UPDATE CASCADE
+            CREATE TABLE IF NOT EXISTS Prerrequisitos (
+                codigo_materia_fk TEXT NOT NULL,
+                codigo_prerrequisito_fk TEXT NOT NULL,
+                PRIMARY KEY (codigo_materia_fk, codigo_prerrequisito_fk),
+                CHECK (codigo_materia_fk <> codigo_prerrequisito_fk),
+                FOREIGN KEY (codigo_materia_fk) REFERENCES Materias (codigo_materia) ON DELETE CASCADE ON UPDATE CASCADE,
+                FOREIGN KEY (codigo_prerrequisito_fk) REFERENCES Materias (codigo_materia) ON DELETE CASCADE ON UPDATE CASCADE
             );
         """)
+        _migrar_docentes_salones(conn)
+        _unificar_nombres(cursor)
+        _crear_columnas_tiempo(cursor)
         conn.commit()
         logging.info("Tablas creadas o ya existentes.")
     except sqlite3.Error as e:
         logging.error(f"Error al crear las tablas: {e}")
 
+def _crear_tablas_docentes_salones(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Docentes (
+            id_docente INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE COLLATE NOCASE
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Salones (
+            id_salon INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            capacidad INTEGER
+        );
+    """)
+
+def necesita_migracion(conn):
+    """True si SesionesClase todavía guarda docente y salón como texto (solo lee el esquema)."""
+    columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(SesionesClase)")}
+    return "docente" in columnas and "salon" in columnas
+
+def _migrar_docentes_salones(conn):
+    """
+    Migra una base en la que SesionesClase guarda docente y salón como texto:
+    pasa cada nombre distinto a Docentes o Salones (las variantes que solo
+    difieren en mayúsculas quedan en un mismo registro) y
+    reconstruye la tabla con las claves enteras. Antes de borrar la tabla vieja
+    verifica que cada sesión conserve exactamente su docente y su salón; si no,
+    deshace todo. No hace nada si la base ya está migrada. Solo la llama
+    crear_tablas (`python -m database.db_manager --migrar`); abrir una conexión
+    nunca migra.
+    """
+    if not necesita_migracion(conn):
+        return True
+    cursor = conn.cursor()
+    try:
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        _crear_tablas_docentes_salones(cursor)
+        cursor.execute("INSERT OR IGNORE INTO Docentes(nombre) SELECT DISTINCT docente FROM SesionesClase WHERE docente IS NOT NULL")
+        cursor.execute("INSERT OR IGNORE INTO Salones(nombre) SELECT DISTINCT salon FROM SesionesClase WHERE salon IS NOT NULL")
+        cursor.execute("DROP TABLE IF EXISTS SesionesClase_nueva")
+        cursor.execute(_SQL_TABLA_SESIONES.format(tabla="SesionesClase_nueva"))
+        cursor.execute("""
+            INSERT INTO SesionesClase_nueva (id_sesion, id_grupo_materia_fk, tipo_sesion, dia_semana,
+                                             hora_inicio, hora_fin, id_docente_fk, id_salon_fk)
+            SELECT S.id_sesion, S.id_grupo_materia_fk, S.tipo_sesion, S.dia_semana,
+                   S.hora_inicio, S.hora_fin, D.id_docente, SA.id_salon
+            FROM SesionesClase AS S
+            LEFT JOIN Docentes AS D ON D.nombre = S.docente
+            LEFT JOIN Salones AS SA ON SA.nombre = S.salon
+        """)
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM SesionesClase AS V
+            LEFT JOIN SesionesClase_nueva AS S ON S.id_sesion = V.id_sesion""" + _SQL_JOIN_DOCENTE_SALON + """
+            WHERE S.id_sesion IS NULL OR S.dia_semana IS NOT V.dia_semana
+               OR S.hora_inicio IS NOT V.hora_inicio OR S.hora_fin IS NOT V.hora_fin
+               OR D.nombre IS NOT V.docente OR SA.nombre IS NOT V.salon
+        """)
+        diferencias = cursor.fetchone()[0]
+        if diferencias:
+            conn.rollback()
+            logging.error(f"Migración de docentes y salones cancelada: {diferencias} sesiones no coinciden con la tabla original.")
+            return False
+        cursor.execute("DROP TABLE SesionesClase")
+        cursor.execute("ALTER TABLE SesionesClase_nueva RENAME TO SesionesClase")
+        _crear_columnas_tiempo(cursor)
+        conn.commit()
+        cursor.execute("VACUUM")
+        cursor.execute("SELECT (SELECT COUNT(*) FROM SesionesClase), (SELECT COUNT(*) FROM Docentes), (SELECT COUNT(*) FROM Salones)")
+        sesiones, docentes, salones = cursor.fetchone()
+        logging.info(f"Base migrada: {sesiones} sesiones con {docentes} docentes y {salones} salones normalizados.")
+        return True
+    except sqlite3.Error as e:
+        conn.rollback()
+        logging.error(f"Error al migrar docentes y salones: {e}")
+        return False
+
+def _unificar_nombres(cursor):
+    """
+    Bases cuyas tablas Docentes y Salones son anteriores a COLLATE NOCASE:
+    pasa las sesiones de cada variante de un nombre ("romo guerron", "ROMO
+    GUERRON") al registro más antiguo, borra las demás y crea un índice único
+    NOCASE, el mismo que usan _id_por_nombre y obtener_cruces_sesion.
+    """
+    for tabla, columna_id, columna_fk in _RECURSOS_SESION.values():
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,))
+        definicion = cursor.fetchone()
+        indice = f"idx_{tabla.lower()}_nombre_nocase"
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (indice,))
+        if definicion is None or "COLLATE NOCASE" in definicion[0] or cursor.fetchone():
+            continue
+        cursor.execute(f"""
+            UPDATE SesionesClase SET {columna_fk} = (
+                SELECT MIN(R.{columna_id}) FROM {tabla} AS V
+                JOIN {tabla} AS R ON R.nombre = V.nombre COLLATE NOCASE
+                WHERE V.{columna_id} = SesionesClase.{columna_fk})
+            WHERE {columna_fk} IS NOT NULL
+        """)
+        cursor.execute(f"""
+            DELETE FROM {tabla} WHERE {columna_id} NOT IN (
+                SELECT MIN({columna_id}) FROM {tabla} GROUP BY nombre COLLATE NOCASE)
+        """)
+        if cursor.rowcount:
+            logging.info(f"{cursor.rowcount} nombres de {tabla} unificados sin distinguir mayúsculas.")
+        cursor.execute(f"CREATE UNIQUE INDEX {indice} ON {tabla} (nombre COLLATE NOCASE)")
+
+def _id_por_nombre(cursor, recurso, nombre, creados=None):
+    """
+    Id del docente o salón `nombre` (se crea si no existe); None si no hay
+    nombre. Los nombres se guardan sin espacios en los extremos y se comparan
+    sin distinguir mayúsculas. `creados` es un caché opcional {nombre: id}
+    para operaciones masivas.
+    """
+    if nombre is None or not nombre.strip():
+        return None
+    nombre = nombre.strip()
+    if creados is not None and nombre in creados:
+        return creados[nombre]
+    tabla, columna_id, _ = _RECURSOS_SESION[recurso]
+    cursor.execute(f"SELECT {columna_id} FROM {tabla} WHERE nombre = ? COLLATE NOCASE", (nombre,))
+    fila = cursor.fetchone()
+    if fila:
+        id_recurso = fila[0]
+    else:
+        cursor.execute(f"INSERT INTO {tabla}(nombre) VALUES(?)", (nombre,))
+        id_recurso = cursor.lastrowid
+    if creados is not None:
+        creados[nombre] = id_recurso
+    return id_recurso
+
+def _crear_columnas_tiempo(cursor):
+    """
+    Agrega a SesionesClase las columnas dia_num, inicio_min y fin_min (si la
+    base es anterior a ellas), las recalcula, y crea los triggers que las
+    mantienen y los índices por día, por salón y por docente.
+    """
+    cursor.execute("PRAGMA table_info(SesionesClase)")
+    existentes = {fila[1] for fila in cursor.fetchall()}
+    for columna in ("dia_num", "inicio_min", "fin_min"):
+        if columna not in existentes:
+            cursor.execute(f"ALTER TABLE SesionesClase ADD COLUMN {columna} INTEGER")
+    cursor.execute(f"UPDATE SesionesClase SET {_SQL_COLUMNAS_TIEMPO} WHERE dia_num IS NULL OR inicio_min IS NULL OR fin_min IS NULL")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sesiones_tiempo_insert AFTER INSERT ON SesionesClase
+        BEGIN
+            UPDATE SesionesClase SET {_SQL_COLUMNAS_TIEMPO} WHERE id_sesion = NEW.id_sesion;
+        END;
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sesiones_tiempo_update AFTER UPDATE OF dia_semana, hora_inicio, hora_fin ON SesionesClase
+        BEGIN
+            UPDATE SesionesClase SET {_SQL_COLUMNAS_TIEMPO} WHERE id_sesion = NEW.id_sesion;
+        END;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sesiones_salon_tiempo ON SesionesClase (id_salon_fk, dia_num, inicio_min);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sesiones_docente_tiempo ON SesionesClase (id_docente_fk, dia_num, inicio_min);")
+    # Filtros por día y hora de ConsultaSesiones, y su orden de paginación
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sesiones_tiempo ON SesionesClase (dia_num, inicio_min);")
+
+def obtener_cruces_sesion(conn, dia_semana, hora_inicio, hora_fin, docente=None, salon=None, excluir_id_sesion=None):
+    """
+    Obtiene las sesiones que se solapan con la franja dada en el mismo salón o
+    con el mismo docente: lista de (id_sesion, recurso, valor, dia_semana,
+    hora_inicio, hora_fin). Los nombres se comparan sin distinguir mayúsculas,
+    igual que al guardarlos, así que la búsqueda del id usa el índice único del
+    nombre; luego cada recurso es una consulta por rango sobre su índice (id,
+    día, inicio).
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {_SQL_DIA_NUM.format(dia='?')}, {_SQL_MINUTOS.format(hora='?')}, {_SQL_MINUTOS.format(hora='?')}",
+                   (dia_semana, hora_inicio, hora_inicio, hora_inicio, hora_inicio, hora_fin, hora_fin, hora_fin, hora_fin))
+    dia_num, inicio_min, fin_min = cursor.fetchone()
+    cruces = []
+    for recurso, valor in (("salon", salon), ("docente", docente)):
+        if not valor or not valor.strip():
+            continue
+        tabla, columna_id, columna_fk = _RECURSOS_SESION[recurso]
+        cursor.execute(f"""
+            SELECT S.id_sesion, '{recurso}', R.nombre, S.dia_semana, S.hora_inicio, S.hora_fin
+            FROM SesionesClase AS S
+            JOIN {tabla} AS R ON R.{columna_id} = S.{columna_fk}
+            WHERE S.{columna_fk} IN (SELECT {columna_id} FROM {tabla} WHERE nombre = ? COLLATE NOCASE)
+              AND S.dia_num = ? AND S.inicio_min < ? AND S.fin_min > ?
+              AND S.id_sesion IS NOT ?
+        """, (valor.strip(), dia_num, fin_min, inicio_min, excluir_id_sesion))
+        cruces.extend(cursor.fetchall())
+    return cruces
+
 def insertar_materia(conn, codigo_materia, nombre_materia, creditos=None):
     """Inserta una nueva materia en la base de datos."""
     sql = ''' INSERT INTO Materias(codigo_materia, nombre_materia, creditos)
               VALUES(?,?,?) '''
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
         cursor.execute(sql, (codigo_materia, nombre_materia, creditos))
         conn.commit()
+        _invalidar_cache(conn)
         logging.info(f"Materia insertada: {codigo_materia} - {nombre_materia}")
         return True
     except sqlite3.IntegrityError:
@@ -82,9 +530,11 @@ def insertar_grupo_materia(conn, codigo_materia_fk, nombre_grupo, cupos=None):
     sql = ''' INSERT INTO GruposMateria(codigo_materia_fk, nombre_grupo, cupos)
               VALUES(?,?,?) '''
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
         cursor.execute(sql, (codigo_materia_fk, nombre_grupo, cupos))
         conn.commit()
+        _invalidar_cache(conn)
         id_grupo_materia = cursor.lastrowid
         logging.info(f"Grupo de materia insertado: ID {id_grupo_materia} para {codigo_materia_fk} (Grupo {nombre_grupo})")
         return id_grupo_materia
@@ -93,29 +543,97 @@ def insertar_grupo_materia(conn, codigo_materia_fk, nombre_grupo, cupos=None):
         return None
 
 def insertar_sesion_clase(conn, id_grupo_materia_fk, tipo_sesion, dia_semana,
-                          hora_inicio, hora_fin, docente=None, salon=None):
-    """Inserta una nueva sesión de clase en la base de datos."""
+                          hora_inicio, hora_fin, docente=None, salon=None, estricto=None):
+    """
+    Inserta una nueva sesión de clase en la base de datos. En modo estricto
+    (`estricto`, o `MODO_ESTRICTO` si es None) rechaza la sesión si se cruza
+    con otra del mismo salón o del mismo docente. `docente` y `salon` son
+    nombres; los que no existan se agregan a Docentes y Salones.
+    """
     sql = ''' INSERT INTO SesionesClase(id_grupo_materia_fk, tipo_sesion, dia_semana,
-                                        hora_inicio, hora_fin, docente, salon)
+                                        hora_inicio, hora_fin, id_docente_fk, id_salon_fk)
               VALUES(?,?,?,?,?,?,?) '''
+    deshacer = conn.rollback
     try:
         # Validación básica de formato de hora
         datetime.strptime(hora_inicio, "%H:%M")
         datetime.strptime(hora_fin, "%H:%M")
 
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
-        cursor.execute(sql, (id_grupo_materia_fk, tipo_sesion, dia_semana,
-                             hora_inicio, hora_fin, docente, salon))
+        estricto = MODO_ESTRICTO if estricto is None else estricto
+        deshacer = _iniciar_escritura(conn, inmediata=estricto)
+        if estricto:
+            cruces = obtener_cruces_sesion(conn, dia_semana, hora_inicio, hora_fin, docente, salon)
+            if cruces:
+                deshacer()
+                logging.error(f"Sesión del grupo ID {id_grupo_materia_fk} rechazada: se cruza con {_describir_cruces(cruces)}")
+                return None
+        cursor.execute(sql, (id_grupo_materia_fk, tipo_sesion, dia_semana, hora_inicio, hora_fin,
+                             _id_por_nombre(cursor, "docente", docente), _id_por_nombre(cursor, "salon", salon)))
         conn.commit()
+        _invalidar_cache(conn)
         return cursor.lastrowid
     except ValueError:
         logging.error(f"Error de formato de hora para la sesión del grupo ID {id_grupo_materia_fk}. Use HH:MM.")
         return None
     except sqlite3.Error as e:
+        deshacer()
         logging.error(f"Error al insertar sesión de clase para grupo ID {id_grupo_materia_fk}: {e}")
         return None
 
+def _describir_cruces(cruces):
+    return "; ".join(f"sesión {id_sesion} ({recurso} {valor}, {dia} {inicio}-{fin})"
+                     for id_sesion, recurso, valor, dia, inicio, fin in cruces)
+
+def _iniciar_escritura(conn, inmediata=False):
+    """
+    Prepara una escritura de sesiones y devuelve la función que deshace solo
+    lo que ella haga. Si el llamador ya tiene una transacción abierta se usa un
+    SAVEPOINT dentro de ella, para no descartar sus escrituras pendientes; si
+    no, `inmediata` (modo estricto) toma el bloqueo de escritura con BEGIN
+    IMMEDIATE antes de buscar cruces.
+    """
+    if conn.in_transaction:
+        conn.execute("SAVEPOINT escritura_sesiones")
+
+        def deshacer():
+            conn.execute("ROLLBACK TO escritura_sesiones")
+            conn.execute("RELEASE escritura_sesiones")
+        return deshacer
+    if inmediata:
+        conn.execute("BEGIN IMMEDIATE")
+    return conn.rollback
+
+def _cruces_de_sesiones(conn, ids_sesion):
+    """Cruces de salón o docente de cada sesión indicada, con sus datos actuales: [(id_sesion, cruces)]."""
+    resultado = []
+    for id_sesion in ids_sesion:
+        fila = conn.execute("SELECT S.dia_semana, S.hora_inicio, S.hora_fin, D.nombre, SA.nombre FROM SesionesClase AS S"
+                            + _SQL_JOIN_DOCENTE_SALON + " WHERE S.id_sesion = ?", (id_sesion,)).fetchone()
+        if fila is not None:
+            cruces = obtener_cruces_sesion(conn, *fila, excluir_id_sesion=id_sesion)
+            if cruces:
+                resultado.append((id_sesion, cruces))
+    return resultado
+
+def _aceptar_sin_cruces(conn, ids_sesion, deshacer):
+    """
+    Modo estricto de las escrituras masivas: con los cambios ya aplicados (así
+    cuentan también los cruces entre sesiones del mismo lote), deshace todo y
+    devuelve False si alguna de las sesiones quedó cruzada.
+    """
+    cruzadas = _cruces_de_sesiones(conn, ids_sesion)
+    if not cruzadas:
+        return True
+    deshacer()
+    id_sesion, cruces = cruzadas[0]
+    logging.error(f"Cambios rechazados: {len(cruzadas)} sesiones quedarían cruzadas, "
+                  f"por ejemplo la {id_sesion} con {_describir_cruces(cruces)}")
+    return False
+
 # --- Nuevas Funciones para Obtener Entidades Individuales ---
+@_con_cache("materia")
 def obtener_materia_por_codigo(conn, codigo_materia):
     """Obtiene la información de una materia por su código."""
     sql = "SELECT codigo_materia, nombre_materia, creditos FROM Materias WHERE codigo_materia = ?"
@@ -127,6 +645,7 @@ def obtener_materia_por_codigo(conn, codigo_materia):
         print(f"Error al obtener materia por código {codigo_materia}: {e}")
         return None
 
+@_con_cache("grupo")
 def obtener_grupo_por_id(conn, id_grupo):
     """Obtiene la información de un grupo por su ID."""
     sql = "SELECT id_grupo_materia, codigo_materia_fk, nombre_grupo, cupos FROM GruposMateria WHERE id_grupo_materia = ?"
@@ -138,11 +657,14 @@ def obtener_grupo_por_id(conn, id_grupo):
         print(f"Error al obtener grupo por ID {id_grupo}: {e}")
         return None
 
+@_con_cache("sesion")
 def obtener_sesion_por_id(conn, id_sesion):
     """Obtiene la información de una sesión por su ID."""
     sql = """
-    SELECT id_sesion, id_grupo_materia_fk, tipo_sesion, dia_semana, hora_inicio, hora_fin, docente, salon
-    FROM SesionesClase WHERE id_sesion = ?
+    SELECT S.id_sesion, S.id_grupo_materia_fk, S.tipo_sesion, S.dia_semana, S.hora_inicio, S.hora_fin,
+           D.nombre, SA.nombre
+    FROM SesionesClase AS S""" + _SQL_JOIN_DOCENTE_SALON + """
+    WHERE S.id_sesion = ?
     """
     try:
         cursor = conn.cursor()
@@ -172,9 +694,11 @@ def actualizar_materia(conn, codigo_materia, nuevo_nombre=None, nuevos_creditos=
     params.append(codigo_materia)
 
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
         cursor.execute(sql, tuple(params))
         conn.commit()
+        _invalidar_cache(conn, materias=[codigo_materia])
         if cursor.rowcount > 0:
             print(f"Materia {codigo_materia} actualizada exitosamente.")
             return True
@@ -204,9 +728,11 @@ def actualizar_grupo_materia(conn, id_grupo_materia, nuevo_nombre_grupo=None, nu
     params.append(id_grupo_materia)
 
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
         cursor.execute(sql, tuple(params))
         conn.commit()
+        _invalidar_cache(conn, grupos=[id_grupo_materia])
         if cursor.rowcount > 0:
             print(f"Grupo de materia ID {id_grupo_materia} actualizado exitosamente.")
             return True
@@ -218,8 +744,12 @@ def actualizar_grupo_materia(conn, id_grupo_materia, nuevo_nombre_grupo=None, nu
         return False
 
 def actualizar_sesion_clase(conn, id_sesion, tipo_sesion=None, dia_semana=None,
-                            hora_inicio=None, hora_fin=None, docente=None, salon=None):
-    """Actualiza los datos de una sesión de clase existente."""
+                            hora_inicio=None, hora_fin=None, docente=None, salon=None, estricto=None):
+    """
+    Actualiza los datos de una sesión de clase existente. En modo estricto
+    rechaza el cambio si la sesión resultante se cruza con otra del mismo
+    salón o del mismo docente.
+    """
     sets = []
     params = []
     if tipo_sesion is not None:
@@ -235,11 +765,9 @@ def actualizar_sesion_clase(conn, id_sesion, tipo_sesion=None, dia_semana=None,
         sets.append("hora_fin = ?")
         params.append(hora_fin)
     if docente is not None:
-        sets.append("docente = ?")
-        params.append(docente)
+        sets.append("id_docente_fk = ?")
     if salon is not None:
-        sets.append("salon = ?")
-        params.append(salon)
+        sets.append("id_salon_fk = ?")
     
     if not sets:
         print("No hay datos para actualizar para la sesión.")
@@ -256,12 +784,33 @@ def actualizar_sesion_clase(conn, id_sesion, tipo_sesion=None, dia_semana=None,
         return False
 
     sql = f"UPDATE SesionesClase SET {', '.join(sets)} WHERE id_sesion = ?"
-    params.append(id_sesion)
 
+    deshacer = conn.rollback
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
+        estricto = MODO_ESTRICTO if estricto is None else estricto
+        deshacer = _iniciar_escritura(conn, inmediata=estricto)
+        if estricto:
+            cursor.execute("SELECT S.dia_semana, S.hora_inicio, S.hora_fin, D.nombre, SA.nombre FROM SesionesClase AS S"
+                           + _SQL_JOIN_DOCENTE_SALON + " WHERE S.id_sesion = ?", (id_sesion,))
+            actual = cursor.fetchone()
+            if actual is not None:
+                nuevo = [valor if valor is not None else anterior
+                         for valor, anterior in zip((dia_semana, hora_inicio, hora_fin, docente, salon), actual)]
+                cruces = obtener_cruces_sesion(conn, *nuevo, excluir_id_sesion=id_sesion)
+                if cruces:
+                    deshacer()
+                    print(f"Sesión de clase ID {id_sesion} no actualizada: se cruza con {_describir_cruces(cruces)}")
+                    return False
+        if docente is not None:
+            params.append(_id_por_nombre(cursor, "docente", docente))
+        if salon is not None:
+            params.append(_id_por_nombre(cursor, "salon", salon))
+        params.append(id_sesion)
         cursor.execute(sql, tuple(params))
         conn.commit()
+        _invalidar_cache(conn, sesiones=[id_sesion])
         if cursor.rowcount > 0:
             print(f"Sesión de clase ID {id_sesion} actualizada exitosamente.")
             return True
@@ -269,17 +818,84 @@ def actualizar_sesion_clase(conn, id_sesion, tipo_sesion=None, dia_semana=None,
             print(f"Sesión de clase ID {id_sesion} no encontrada para actualizar.")
             return False
     except sqlite3.Error as e:
+        deshacer()
         print(f"Error al actualizar sesión de clase ID {id_sesion}: {e}")
         return False
 
+def actualizar_salones_sesiones(conn, asignaciones, estricto=None):
+    """
+    Actualiza el salón de muchas sesiones en una sola transacción.
+    `asignaciones` es un iterable de (id_sesion, salon). Devuelve el número de
+    sesiones actualizadas, o None si hubo un error o, en modo estricto, si
+    alguna sesión queda cruzada con otra (no se aplica ningún cambio).
+    """
+    deshacer = conn.rollback
+    try:
+        _sincronizar_cache(conn)
+        cursor = conn.cursor()
+        estricto = MODO_ESTRICTO if estricto is None else estricto
+        deshacer = _iniciar_escritura(conn, inmediata=estricto)
+        ids_salon = {}
+        filas = [(_id_por_nombre(cursor, "salon", salon, ids_salon), id_sesion) for id_sesion, salon in asignaciones]
+        cursor.executemany("UPDATE SesionesClase SET id_salon_fk = ? WHERE id_sesion = ?", filas)
+        actualizadas = cursor.rowcount
+        if estricto and not _aceptar_sin_cruces(conn, [fila[-1] for fila in filas], deshacer):
+            return None
+        conn.commit()
+        _invalidar_cache(conn, sesiones=[fila[-1] for fila in filas])
+        logging.info(f"Salones actualizados en {actualizadas} sesiones.")
+        return actualizadas
+    except sqlite3.Error as e:
+        deshacer()
+        logging.error(f"Error al actualizar los salones de las sesiones: {e}")
+        return None
+
+def actualizar_franjas_sesiones(conn, asignaciones, estricto=None):
+    """
+    Actualiza día, horas y salón de muchas sesiones en una sola transacción.
+    `asignaciones` es un iterable de (id_sesion, dia_semana, hora_inicio,
+    hora_fin, salon). Devuelve el número de sesiones actualizadas, o None si
+    hubo un error o, en modo estricto, si alguna sesión queda cruzada con otra
+    (no se aplica ningún cambio).
+    """
+    deshacer = conn.rollback
+    try:
+        _sincronizar_cache(conn)
+        cursor = conn.cursor()
+        estricto = MODO_ESTRICTO if estricto is None else estricto
+        deshacer = _iniciar_escritura(conn, inmediata=estricto)
+        ids_salon = {}
+        filas = [(dia, inicio, fin, _id_por_nombre(cursor, "salon", salon, ids_salon), id_sesion)
+                 for id_sesion, dia, inicio, fin, salon in asignaciones]
+        cursor.executemany(
+            "UPDATE SesionesClase SET dia_semana = ?, hora_inicio = ?, hora_fin = ?, id_salon_fk = ? WHERE id_sesion = ?",
+            filas)
+        actualizadas = cursor.rowcount
+        if estricto and not _aceptar_sin_cruces(conn, [fila[-1] for fila in filas], deshacer):
+            return None
+        conn.commit()
+        _invalidar_cache(conn, sesiones=[fila[-1] for fila in filas])
+        logging.info(f"Franjas actualizadas en {actualizadas} sesiones.")
+        return actualizadas
+    except sqlite3.Error as e:
+        deshacer()
+        logging.error(f"Error al actualizar las franjas de las sesiones: {e}")
+        return None
+
 # --- Nuevas Funciones de Eliminación ---
 def eliminar_materia(conn, codigo_materia):
     """Elimina una materia y todos sus grupos y sesiones asociados."""
     sql = "DELETE FROM Materias WHERE codigo_materia = ?"
     try:
         cursor = conn.cursor()
+        grupos = []
+        if _sincronizar_cache(conn) is not None:
+            # Grupos que borra la cascada, aunque solo sus sesiones estén en la caché
+            cursor.execute("SELECT id_grupo_materia FROM GruposMateria WHERE codigo_materia_fk = ?", (codigo_materia,))
+            grupos = [fila[0] for fila in cursor.fetchall()]
         cursor.execute(sql, (codigo_materia,))
         conn.commit()
+        _invalidar_cache(conn, materias=[codigo_materia], grupos=grupos)
         if cursor.rowcount > 0:
             print(f"Materia {codigo_materia} eliminada exitosamente (y sus grupos/sesiones).")
             return True
@@ -294,9 +910,11 @@ def eliminar_grupo_materia(conn, id_grupo_materia):
     """Elimina un grupo de materia y todas sus sesiones asociadas."""
     sql = "DELETE FROM GruposMateria WHERE id_grupo_materia = ?"
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
         cursor.execute(sql, (id_grupo_materia,))
         conn.commit()
+        _invalidar_cache(conn, grupos=[id_grupo_materia])
         if cursor.rowcount > 0:
             print(f"Grupo de materia ID {id_grupo_materia} eliminado exitosamente (y sus sesiones).")
             return True
@@ -311,9 +929,11 @@ def eliminar_sesion_clase(conn, id_sesion):
     """Elimina una sesión de clase específica."""
     sql = "DELETE FROM SesionesClase WHERE id_sesion = ?"
     try:
+        _sincronizar_cache(conn)
         cursor = conn.cursor()
         cursor.execute(sql, (id_sesion,))
         conn.commit()
+        _invalidar_cache(conn, sesiones=[id_sesion])
         if cursor.rowcount > 0:
             print(f"Sesión de clase ID {id_sesion} eliminada exitosamente.")
             return True
@@ -324,6 +944,185 @@ def eliminar_sesion_clase(conn, id_sesion):
         print(f"Error al eliminar sesión de clase ID {id_sesion}: {e}")
         return False
 
+# --- Docentes y Salones ---
+def insertar_docente(conn, nombre):
+    """Inserta un docente y devuelve su ID (el existente si ya estaba registrado)."""
+    try:
+        _sincronizar_cache(conn)
+        cursor = conn.cursor()
+        id_docente = _id_por_nombre(cursor, "docente", nombre)
+        conn.commit()
+        _invalidar_cache(conn)
+        return id_docente
+    except sqlite3.Error as e:
+        logging.error(f"Error al insertar docente {nombre}: {e}")
+        return None
+
+def obtener_todos_los_docentes(conn):
+    """Obtiene (id_docente, nombre) de todos los docentes."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id_docente, nombre FROM Docentes ORDER BY nombre")
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al obtener los docentes: {e}")
+        return []
+
+def obtener_docente_por_id(conn, id_docente):
+    """Obtiene la información de un docente por su ID."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id_docente, nombre FROM Docentes WHERE id_docente = ?", (id_docente,))
+        return cursor.fetchone()
+    except sqlite3.Error as e:
+        print(f"Error al obtener docente por ID {id_docente}: {e}")
+        return None
+
+def actualizar_docente(conn, id_docente, nuevo_nombre):
+    """Cambia el nombre de un docente; se refleja en todas sus sesiones."""
+    try:
+        cursor = conn.cursor()
+        sesiones = _sesiones_en_cache_de_recurso(conn, "docente", id_docente)
+        cursor.execute("UPDATE Docentes SET nombre = ? WHERE id_docente = ?", (nuevo_nombre, id_docente))
+        conn.commit()
+        _invalidar_cache(conn, sesiones=sesiones)
+        if cursor.rowcount > 0:
+            print(f"Docente ID {id_docente} actualizado exitosamente.")
+            return True
+        else:
+            print(f"Docente ID {id_docente} no encontrado para actualizar.")
+            return False
+    except sqlite3.Error as e:
+        print(f"Error al actualizar docente ID {id_docente}: {e}")
+        return False
+
+def eliminar_docente(conn, id_docente):
+    """Elimina un docente; sus sesiones quedan sin docente asignado."""
+    try:
+        cursor = conn.cursor()
+        sesiones = _sesiones_en_cache_de_recurso(conn, "docente", id_docente)
+        cursor.execute("DELETE FROM Docentes WHERE id_docente = ?", (id_docente,))
+        conn.commit()
+        _invalidar_cache(conn, sesiones=sesiones)
+        if cursor.rowcount > 0:
+            print(f"Docente ID {id_docente} eliminado exitosamente.")
+            return True
+        else:
+            print(f"Docente ID {id_docente} no encontrado para eliminar.")
+            return False
+    except sqlite3.Error as e:
+        print(f"Error al eliminar docente ID {id_docente}: {e}")
+        return False
+
+def insertar_salon(conn, nombre, capacidad=None):
+    """Inserta un salón y devuelve su ID (el existente si ya estaba registrado)."""
+    try:
+        _sincronizar_cache(conn)
+        cursor = conn.cursor()
+        id_salon = _id_por_nombre(cursor, "salon", nombre)
+        if capacidad is not None:
+            cursor.execute("UPDATE Salones SET capacidad = ? WHERE id_salon = ?", (capacidad, id_salon))
+        conn.commit()
+        _invalidar_cache(conn)
+        return id_salon
+    except sqlite3.Error as e:
+        logging.error(f"Error al insertar salón {nombre}: {e}")
+        return None
+
+def obtener_todos_los_salones(conn):
+    """Obtiene (id_salon, nombre, capacidad) de todos los salones."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id_salon, nombre, capacidad FROM Salones ORDER BY nombre")
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al obtener los salones: {e}")
+        return []
+
+def obtener_salon_por_id(conn, id_salon):
+    """Obtiene la información de un salón por su ID."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id_salon, nombre, capacidad FROM Salones WHERE id_salon = ?", (id_salon,))
+        return cursor.fetchone()
+    except sqlite3.Error as e:
+        print(f"Error al obtener salón por ID {id_salon}: {e}")
+        return None
+
+def actualizar_salon(conn, id_salon, nuevo_nombre=None, nueva_capacidad=None):
+    """Actualiza el nombre o la capacidad de un salón."""
+    sets = []
+    params = []
+    if nuevo_nombre is not None:
+        sets.append("nombre = ?")
+        params.append(nuevo_nombre)
+    if nueva_capacidad is not None:
+        sets.append("capacidad = ?")
+        params.append(nueva_capacidad)
+
+    if not sets:
+        print("No hay datos para actualizar para el salón.")
+        return False
+
+    sql = f"UPDATE Salones SET {', '.join(sets)} WHERE id_salon = ?"
+    params.append(id_salon)
+
+    try:
+        cursor = conn.cursor()
+        # Las sesiones muestran el nombre del salón, no su capacidad
+        sesiones = _sesiones_en_cache_de_recurso(conn, "salon", id_salon) if nuevo_nombre is not None else []
+        cursor.execute(sql, tuple(params))
+        conn.commit()
+        _invalidar_cache(conn, sesiones=sesiones)
+        if cursor.rowcount > 0:
+            print(f"Salón ID {id_salon} actualizado exitosamente.")
+            return True
+        else:
+            print(f"Salón ID {id_salon} no encontrado para actualizar.")
+            return False
+    except sqlite3.Error as e:
+        print(f"Error al actualizar salón ID {id_salon}: {e}")
+        return False
+
+def eliminar_salon(conn, id_salon):
+    """Elimina un salón; sus sesiones quedan sin salón asignado."""
+    try:
+        cursor = conn.cursor()
+        sesiones = _sesiones_en_cache_de_recurso(conn, "salon", id_salon)
+        cursor.execute("DELETE FROM Salones WHERE id_salon = ?", (id_salon,))
+        conn.commit()
+        _invalidar_cache(conn, sesiones=sesiones)
+        if cursor.rowcount > 0:
+            print(f"Salón ID {id_salon} eliminado exitosamente.")
+            return True
+        else:
+            print(f"Salón ID {id_salon} no encontrado para eliminar.")
+            return False
+    except sqlite3.Error as e:
+        print(f"Error al eliminar salón ID {id_salon}: {e}")
+        return False
+
+def obtener_sesiones_por_recurso(conn, recurso, id_recurso):
+    """
+    Obtiene las sesiones de un docente o de un salón (`recurso` es 'docente' o
+    'salon'), ordenadas por día y hora, con el mismo formato que
+    `obtener_sesion_por_id`.
+    """
+    _, _, columna_fk = _RECURSOS_SESION[recurso]
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT S.id_sesion, S.id_grupo_materia_fk, S.tipo_sesion, S.dia_semana, S.hora_inicio, S.hora_fin,
+                   D.nombre, SA.nombre
+            FROM SesionesClase AS S""" + _SQL_JOIN_DOCENTE_SALON + f"""
+            WHERE S.{columna_fk} = ?
+            ORDER BY S.dia_num, S.inicio_min
+        """, (id_recurso,))
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al obtener las sesiones del {recurso} ID {id_recurso}: {e}")
+        return []
+
 def obtener_todas_las_materias_simple(conn):
     """Obtiene una lista simple de todas las materias."""
     try:
@@ -335,6 +1134,61 @@ def obtener_todas_las_materias_simple(conn):
         print(f"Error al obtener todas las materias: {e}")
         return []
 
+# --- Prerrequisitos e Historial ---
+def insertar_prerrequisito(conn, codigo_materia, codigo_prerrequisito):
+    """Registra que `codigo_prerrequisito` debe aprobarse antes de `codigo_materia`."""
+    sql = ''' INSERT INTO Prerrequisitos(codigo_materia_fk, codigo_prerrequisito_fk)
+              VALUES(?,?) '''
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, (codigo_materia, codigo_prerrequisito))
+        conn.commit()
+        logging.info(f"Prerrequisito insertado: {codigo_prerrequisito} -> {codigo_materia}")
+        return True
+    except sqlite3.IntegrityError as e:
+        logging.info(f"Prerrequisito {codigo_prerrequisito} -> {codigo_materia} no insertado: {e}")
+        return False
+    except sqlite3.Error as e:
+        logging.error(f"Error al insertar prerrequisito {codigo_prerrequisito} -> {codigo_materia}: {e}")
+        return False
+
+def eliminar_prerrequisito(conn, codigo_materia, codigo_prerrequisito):
+    """Elimina un prerrequisito de una materia."""
+    sql = "DELETE FROM Prerrequisitos WHERE codigo_materia_fk = ? AND codigo_prerrequisito_fk = ?"
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, (codigo_materia, codigo_prerrequisito))
+        conn.commit()
+        if cursor.rowcount > 0:
+            print(f"Prerrequisito {codigo_prerrequisito} de {codigo_materia} eliminado exitosamente.")
+            return True
+        else:
+            print(f"Prerrequisito {codigo_prerrequisito} de {codigo_materia} no encontrado para eliminar.")
+            return False
+    except sqlite3.Error as e:
+        print(f"Error al eliminar prerrequisito {codigo_prerrequisito} de {codigo_materia}: {e}")
+        return False
+
+def obtener_prerrequisitos(conn):
+    """Obtiene todas las aristas (materia, prerrequisito) del pensum."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT codigo_materia_fk, codigo_prerrequisito_fk FROM Prerrequisitos")
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al obtener prerrequisitos: {e}")
+        return []
+
+def obtener_materias_cursadas(conn):
+    """Obtiene los códigos registrados en el historial de materias cursadas."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT codigo_materia FROM HistorialMateriasCursadas")
+        return [row[0] for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"Error al obtener el historial de materias cursadas: {e}")
+        return []
+
 # --- NUEVA FUNCIÓN AGREGADA ---
 def obtener_horarios_de_materia(conn, codigo_materia):
     """
@@ -346,12 +1200,14 @@ def obtener_horarios_de_materia(conn, codigo_materia):
             T2.hora_inicio,
             T2.hora_fin,
             T1.nombre_grupo,
-            T2.docente,
-            T2.salon,
+            T3.nombre,
+            T4.nombre,
             T2.tipo_sesion
         FROM GruposMateria AS T1
         INNER JOIN SesionesClase AS T2
         ON T1.id_grupo_materia = T2.id_grupo_materia_fk
+        LEFT JOIN Docentes AS T3 ON T3.id_docente = T2.id_docente_fk
+        LEFT JOIN Salones AS T4 ON T4.id_salon = T2.id_salon_fk
         WHERE T1.codigo_materia_fk = ?
         ORDER BY T1.nombre_grupo, T2.dia_semana, T2.hora_inicio;
     """
@@ -368,6 +1224,214 @@ def obtener_horarios_de_materia(conn, codigo_materia):
         print(f"Error al obtener horarios para la materia {codigo_materia}: {e}")
         return []
 
+def obtener_sesiones_catalogo(conn):
+    """
+    Obtiene todas las sesiones del catálogo en una sola consulta, junto con los
+    datos de su grupo y su materia. Las materias sin grupos o los grupos sin
+    sesiones aparecen con las columnas faltantes en None. Si la consulta falla
+    lanza sqlite3.Error: una lista vacía haría pasar la falla por un catálogo
+    sin materias.
+    """
+    sql = """
+        SELECT
+            M.codigo_materia, M.nombre_materia, M.creditos,
+            G.id_grupo_materia, G.nombre_grupo, G.cupos,
+            S.id_sesion, S.tipo_sesion, S.dia_semana, S.hora_inicio, S.hora_fin,
+            D.nombre, SA.nombre
+        FROM Materias AS M
+        LEFT JOIN GruposMateria AS G ON G.codigo_materia_fk = M.codigo_materia
+        LEFT JOIN SesionesClase AS S ON S.id_grupo_materia_fk = G.id_grupo_materia""" + _SQL_JOIN_DOCENTE_SALON + """
+        ORDER BY M.nombre_materia, G.nombre_grupo, S.dia_semana, S.hora_inicio;
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al obtener las sesiones del catálogo: {e}")
+        raise
+
+# --- Consultas componibles sobre las sesiones ---
+# Mismos números que dia_num (_SQL_DIA_NUM)
+_NUMERO_DIA = {"lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3, "viernes": 4, "sabado": 5, "domingo": 6}
+COLUMNAS_CONSULTA_SESIONES = ("id_sesion", "id_grupo_materia", "codigo_materia", "nombre_materia", "creditos",
+                              "nombre_grupo", "cupos", "tipo_sesion", "dia_semana", "hora_inicio", "hora_fin",
+                              "docente", "salon", "dia_num", "inicio_min", "fin_min")
+
+def _numero_dia(dia):
+    clave = dia.strip().lower().replace("é", "e").replace("á", "a")
+    if clave not in _NUMERO_DIA:
+        raise ValueError(f"Día no reconocido: {dia}")
+    return _NUMERO_DIA[clave]
+
+def _minutos(hora):
+    hora = datetime.strptime(hora, "%H:%M")
+    return hora.hour * 60 + hora.minute
+
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class ConsultaSesiones:
+    """
+    Filtros sobre las sesiones (con su grupo y su materia) que se compilan a
+    una sola consulta parametrizada sobre las columnas indexadas: dia_num e
+    inicio_min/fin_min para días y horas, id_docente_fk e id_salon_fk para
+    docentes y salones. Cada método agrega un filtro y devuelve la consulta,
+    así que se pueden encadenar:
+
+        consulta = (ConsultaSesiones().dias("Martes").franja(hasta="11:00")
+                    .tipos("PRACTICA").docente("JOJOA").con_cupos())
+        for fila in consulta.iterar(conn): ...
+        filas, siguiente = consulta.pagina(conn, 50)
+        filas, siguiente = consulta.pagina(conn, 50, despues_de=siguiente)
+
+    Las filas tienen las columnas de COLUMNAS_CONSULTA_SESIONES y salen
+    ordenadas por día, hora de inicio e id de sesión; esa terna es la clave de
+    la paginación por conjunto de claves (sin OFFSET: cada página es una
+    búsqueda en el índice, sin importar cuántas haya antes).
+    """
+
+    def __init__(self):
+        self._condiciones = []
+        self._parametros = []
+        self._desde = None  # minutos; aparte para combinarlo con la clave de la paginación
+        self._por_recurso = False
+
+    def _agregar(self, condicion, *parametros):
+        self._condiciones.append(condicion)
+        self._parametros.extend(parametros)
+        return self
+
+    def dias(self, *dias):
+        """Sesiones en alguno de los días dados ("Miércoles" o "miercoles")."""
+        numeros = [_numero_dia(dia) for dia in dias]
+        return self._agregar(f"S.dia_num IN ({', '.join('?' * len(numeros))})", *numeros)
+
+    def franja(self, desde=None, hasta=None):
+        """Sesiones que empiezan desde `desde` y terminan a más tardar a `hasta` (HH:MM)."""
+        if desde is not None:
+            self._desde = _minutos(desde)
+        if hasta is not None:
+            self._agregar("S.fin_min <= ?", _minutos(hasta))
+        return self
+
+    def tipos(self, *tipos):
+        """Sesiones de alguno de los tipos dados (TEORICA, PRACTICA...), sin distinguir mayúsculas."""
+        return self._agregar(f"upper(S.tipo_sesion) IN ({', '.join('?' * len(tipos))})", *(t.upper() for t in tipos))
+
+    def docente(self, nombre):
+        """Sesiones de los docentes cuyo nombre contiene `nombre` (sin distinguir mayúsculas)."""
+        self._por_recurso = True
+        return self._agregar("S.id_docente_fk IN (SELECT id_docente FROM Docentes WHERE nombre LIKE ? ESCAPE '\\')",
+                             f"%{_escapar_like(nombre)}%")
+
+    def salon(self, nombre):
+        """Sesiones en los salones cuyo nombre contiene `nombre` (sin distinguir mayúsculas)."""
+        self._por_recurso = True
+        return self._agregar("S.id_salon_fk IN (SELECT id_salon FROM Salones WHERE nombre LIKE ? ESCAPE '\\')",
+                             f"%{_escapar_like(nombre)}%")
+
+    def creditos(self, minimo=None, maximo=None):
+        """Sesiones de materias con créditos entre `minimo` y `maximo` (inclusive)."""
+        if minimo is not None:
+            self._agregar("M.creditos >= ?", minimo)
+        if maximo is not None:
+            self._agregar("M.creditos <= ?", maximo)
+        return self
+
+    def materias(self, *codigos):
+        """Sesiones de las materias con esos códigos."""
+        return self._agregar(f"G.codigo_materia_fk IN ({', '.join('?' * len(codigos))})", *codigos)
+
+    def con_cupos(self):
+        """Sesiones de grupos con cupos libres (o sin límite de cupos)."""
+        return self._agregar("(G.cupos IS NULL OR G.cupos > 0)")
+
+    def compilar(self, condiciones=(), parametros=(), limite=None, inicio_minimo=None):
+        """
+        (sql, parametros) de la consulta, con `condiciones` adicionales, un
+        LIMIT opcional e `inicio_minimo` (minutos) como cota inferior de inicio_min.
+        """
+        condiciones = self._condiciones + list(condiciones)
+        parametros = self._parametros + list(parametros)
+        # Una sola cota inferior: con dos, SQLite puede elegir la más floja para el índice
+        cotas = [cota for cota in (self._desde, inicio_minimo) if cota is not None]
+        if cotas:
+            condiciones.append("S.inicio_min >= ?")
+            parametros.append(max(cotas))
+        sql = """
+            SELECT S.id_sesion, G.id_grupo_materia, M.codigo_materia, M.nombre_materia, M.creditos,
+                   G.nombre_grupo, G.cupos, S.tipo_sesion, S.dia_semana, S.hora_inicio, S.hora_fin,
+                   D.nombre, SA.nombre, S.dia_num, S.inicio_min, S.fin_min
+            FROM SesionesClase AS S
+            JOIN GruposMateria AS G ON G.id_grupo_materia = S.id_grupo_materia_fk
+            JOIN Materias AS M ON M.codigo_materia = G.codigo_materia_fk""" + _SQL_JOIN_DOCENTE_SALON
+        if condiciones:
+            sql += "\n            WHERE " + "\n              AND ".join(condiciones)
+        sql += "\n            ORDER BY S.dia_num, S.inicio_min, S.id_sesion"
+        if limite is not None:
+            sql += "\n            LIMIT ?"
+            parametros.append(limite)
+        return sql, parametros
+
+    def iterar(self, conn, tamano_lote=500):
+        """
+        Recorre las filas a medida que SQLite las produce, de a `tamano_lote`
+        por lectura, sin cargar el resultado completo en memoria.
+        """
+        sql, parametros = self.compilar()
+        try:
+            cursor = conn.execute(sql, parametros)
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    return
+                yield from filas
+        except sqlite3.Error as e:
+            print(f"Error al consultar las sesiones: {e}")
+
+    def pagina(self, conn, tamano, despues_de=None):
+        """
+        (filas, siguiente): hasta `tamano` filas a partir de la clave
+        `despues_de` (dia_num, inicio_min, id_sesion) de la última fila ya
+        leída, y la clave para pedir la página siguiente (None si no hay más).
+        """
+        if despues_de is None:
+            tramos = [((), (), None)]
+        else:
+            # Con el filtro de días como IN, SQLite no usa la clave completa
+            # como rango del índice; se pide el resto del día de la clave y,
+            # si no alcanza, los días siguientes, cada uno con su búsqueda. Si
+            # hay filtro de docente o salón, el "+" deja el índice del recurso
+            # (pocas filas) en lugar del de día y hora.
+            dia, inicio, id_sesion = despues_de
+            mas = "+" if self._por_recurso else ""
+            tramos = [([f"{mas}S.dia_num = ?", "(S.inicio_min, S.id_sesion) > (?, ?)"], [dia, inicio, id_sesion], inicio),
+                      ([f"{mas}S.dia_num > ?"], [dia], None)]
+        filas = []
+        try:
+            for condiciones, parametros, inicio_minimo in tramos:
+                sql, parametros = self.compilar(condiciones, parametros, tamano + 1 - len(filas), inicio_minimo)
+                filas.extend(conn.execute(sql, parametros).fetchall())
+                if len(filas) > tamano:
+                    break
+        except sqlite3.Error as e:
+            print(f"Error al consultar las sesiones: {e}")
+            return [], None
+        if len(filas) <= tamano:
+            return filas, None
+        ultima = filas[tamano - 1]
+        return filas[:tamano], (ultima[13], ultima[14], ultima[0])
+
+    def contar(self, conn):
+        """Número de sesiones que cumplen los filtros."""
+        sql, parametros = self.compilar()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM ({sql})", parametros).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error al contar las sesiones: {e}")
+            return 0
+
 def obtener_materia_con_detalles(conn, codigo_materia_buscado):
     """Obtiene una materia con todos sus grupos y sesiones."""
     materia_info = None
@@ -400,8 +1464,9 @@ def obtener_materia_con_detalles(conn, codigo_materia_buscado):
                     "sesiones": []
                 }
                 cursor.execute("""
-                    SELECT id_sesion, tipo_sesion, dia_semana, hora_inicio, hora_fin, docente, salon
-                    FROM SesionesClase WHERE id_grupo_materia_fk = ? ORDER BY dia_semana, hora_inicio
+                    SELECT S.id_sesion, S.tipo_sesion, S.dia_semana, S.hora_inicio, S.hora_fin, D.nombre, SA.nombre
+                    FROM SesionesClase AS S""" + _SQL_JOIN_DOCENTE_SALON + """
+                    WHERE S.id_grupo_materia_fk = ? ORDER BY S.dia_semana, S.hora_inicio
                 """, (grupo_db[0],))
                 sesiones_db = cursor.fetchall()
                 for sesion_db in sesiones_db:
@@ -603,8 +1668,15 @@ def insertar_datos_personalizados(conn):
     
 # Código de inicialización de la base de datos
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Crea (o migra) las tablas y carga los datos personalizados.")
+    parser.add_argument("--migrar", action="store_true",
+                        help="Solo crea las tablas que falten y migra docentes y salones, sin insertar datos")
+    args = parser.parse_args()
     conn = crear_conexion()
-    if conn:
+    if conn and args.migrar:
+        crear_tablas(conn)
+        conn.close()
+    elif conn:
         crear_tablas(conn)
         insertar_datos_personalizados(conn)
         
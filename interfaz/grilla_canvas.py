@@ -0,0 +1,344 @@
+# PROYECTO_RAIZ/interfaz/grilla_canvas.py
+#
+# Grilla semanal dibujada en un solo tk.Canvas, alternativa a la grilla de
+# Frames y Labels por celda. Cada sesión es un rectángulo, un texto y un botón
+# de eliminar etiquetados con su ID, que ocupan sus minutos reales de inicio
+# y fin (una clase de 07:00 a 09:30 es un solo bloque de dos horas y media).
+# El hover y los clics se resuelven buscando el ítem bajo el puntero; al
+# redimensionar solo se mueven los ítems existentes.
+#
+#     python -m interfaz.grilla_canvas --benchmark 60   # canvas contra widgets (necesita pantalla)
+
+import tkinter as tk
+import sys
+import os
+import time
+import random
+import argparse
+import statistics
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_interfaz = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_interfaz)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from logica import logica
+
+ANCHO_HORAS = 70
+ALTO_ENCABEZADO = 44
+ANCHO_DIA = 200
+ALTO_HORA = 57
+
+
+class GrillaCanvas(tk.Canvas):
+    """
+    Semana de `dias` entre `hora_inicio` y `hora_fin` (horas enteras).
+    `mostrar(sesiones)` dibuja solo las sesiones nuevas y borra las que ya no
+    están; `al_eliminar(sesion)` se llama al hacer clic en su ❌ y
+    `texto_tooltip(sesion)` da el texto del hover.
+    """
+
+    def __init__(self, parent, dias, hora_inicio, hora_fin, colores, colores_materias=None,
+                 al_eliminar=None, texto_tooltip=None, **opciones):
+        opciones.setdefault('width', ANCHO_HORAS + ANCHO_DIA * len(dias))
+        opciones.setdefault('height', ALTO_ENCABEZADO + ALTO_HORA * (hora_fin - hora_inicio))
+        super().__init__(parent, bg="white", highlightthickness=0, bd=0, **opciones)
+        self.dias = list(dias)
+        self._columna_dia = {logica.normalizar_texto(dia): i for i, dia in enumerate(self.dias)}
+        self.minuto_inicio = hora_inicio * 60
+        self.minuto_fin = hora_fin * 60
+        self.colores = colores
+        self.colores_materias = colores_materias if colores_materias is not None else {}
+        self.al_eliminar = al_eliminar
+        self.texto_tooltip = texto_tooltip or (lambda sesion: sesion.grupo.materia.nombre)
+        self.contador_items = {'creados': 0, 'borrados': 0}  # de la última llamada a mostrar
+        self._ancho = int(opciones['width'])
+        self._alto = int(opciones['height'])
+        self._sesiones = {}  # {id de la sesión: Sesion}
+        self._items = {}  # {id de la sesión: (rectángulo, texto, botón)}
+        self._sesion_de_item = {}  # {ítem: id de la sesión}
+        self._resaltada = None
+        self._crear_fondo()
+        self._crear_tooltip()
+        self.bind("<Configure>", self._al_redimensionar)
+        self.bind("<Motion>", self._al_mover)
+        self.bind("<Leave>", lambda e: self._resaltar(None))
+        self.bind("<Button-1>", self._al_hacer_clic)
+
+    # --- Geometría ---
+
+    def _ancho_columna(self):
+        return max(1.0, (self._ancho - ANCHO_HORAS) / len(self.dias))
+
+    def _x(self, columna):
+        return ANCHO_HORAS + columna * self._ancho_columna()
+
+    def _y(self, minuto):
+        escala = max(0.1, (self._alto - ALTO_ENCABEZADO) / (self.minuto_fin - self.minuto_inicio))
+        return ALTO_ENCABEZADO + (minuto - self.minuto_inicio) * escala
+
+    def _caja_sesion(self, sesion):
+        """(x0, y0, x1, y1) del bloque de la sesión, o None si su día no está en la grilla."""
+        columna = self._columna_dia.get(logica.normalizar_texto(sesion.dia))
+        if columna is None:
+            return None
+        inicio = max(self.minuto_inicio, logica.hora_a_minutos(sesion.hora_inicio))
+        fin = min(self.minuto_fin, logica.hora_a_minutos(sesion.hora_fin))
+        if fin <= inicio:
+            return None
+        return (self._x(columna) + 2, self._y(inicio) + 1, self._x(columna + 1) - 2, self._y(fin) - 1)
+
+    # --- Fondo ---
+
+    def _crear_fondo(self):
+        self._fondo = []  # [(ítem, función que da sus coordenadas)]
+
+        def agregar(item, coordenadas):
+            self._fondo.append((item, coordenadas))
+
+        primario = self.colores['primary']
+        agregar(self.create_rectangle(0, 0, 0, 0, fill=primario, outline=""),
+                lambda: (0, 0, self._ancho, ALTO_ENCABEZADO))
+        agregar(self.create_text(0, 0, text="⏰ Hora", fill="white", font=("Segoe UI", 11, "bold")),
+                lambda: (ANCHO_HORAS / 2, ALTO_ENCABEZADO / 2))
+        agregar(self.create_rectangle(0, 0, 0, 0, fill=self.colores['primary_light'], outline=""),
+                lambda: (0, ALTO_ENCABEZADO, ANCHO_HORAS, self._alto))
+        for columna, dia in enumerate(self.dias):
+            agregar(self.create_text(0, 0, text=f"📅 {dia}", fill="white", font=("Segoe UI", 11, "bold")),
+                    lambda c=columna: ((self._x(c) + self._x(c + 1)) / 2, ALTO_ENCABEZADO / 2))
+            agregar(self.create_line(0, 0, 0, 0, fill=self.colores['border']),
+                    lambda c=columna: (self._x(c), ALTO_ENCABEZADO, self._x(c), self._alto))
+        for minuto in range(self.minuto_inicio, self.minuto_fin, 60):
+            agregar(self.create_line(0, 0, 0, 0, fill=self.colores['border']),
+                    lambda m=minuto: (ANCHO_HORAS, self._y(m), self._ancho, self._y(m)))
+            agregar(self.create_text(0, 0, text=f"{minuto // 60:02d}:00", anchor="n", fill=primario,
+                                     font=("Segoe UI", 10, "bold")),
+                    lambda m=minuto: (ANCHO_HORAS / 2, self._y(m) + 6))
+        self._ubicar_fondo()
+
+    def _ubicar_fondo(self):
+        for item, coordenadas in self._fondo:
+            self.coords(item, *coordenadas())
+
+    # --- Sesiones ---
+
+    def mostrar(self, sesiones):
+        """Deja dibujadas exactamente estas sesiones, tocando solo las que cambiaron."""
+        self.contador_items = {'creados': 0, 'borrados': 0}
+        nuevas = {sesion.id: sesion for sesion in sesiones}
+        for id_sesion in [i for i in self._sesiones if i not in nuevas]:
+            self._borrar_sesion(id_sesion)
+        for id_sesion, sesion in nuevas.items():
+            if self._sesiones.get(id_sesion) is not sesion:
+                if id_sesion in self._sesiones:
+                    self._borrar_sesion(id_sesion)
+                self._dibujar_sesion(sesion)
+        self.tag_raise("tooltip")
+
+    def _dibujar_sesion(self, sesion):
+        caja = self._caja_sesion(sesion)
+        if caja is None:
+            return
+        color = self.colores_materias.get(sesion.grupo.materia.codigo, "white")
+        etiqueta = f"sesion{sesion.id}"
+        nombre = sesion.grupo.materia.nombre
+        if len(nombre) > 18:
+            nombre = nombre[:15] + "..."
+        rectangulo = self.create_rectangle(*caja, fill=color, outline=self.colores['border'],
+                                           tags=("sesion", etiqueta))
+        texto = self.create_text(0, 0, text=f"{nombre}\n{sesion.grupo.nombre} • {sesion.tipo[:3]}",
+                                 justify=tk.CENTER, anchor="n", fill=self.colores['text_primary'],
+                                 font=("Segoe UI", 9, "bold"), tags=("sesion", etiqueta))
+        boton = self.create_text(0, 0, text="❌", anchor="ne", fill=self.colores['danger'],
+                                 font=("Segoe UI", 8), tags=("sesion", "eliminar", etiqueta))
+        self._items[sesion.id] = (rectangulo, texto, boton)
+        for item in self._items[sesion.id]:
+            self._sesion_de_item[item] = sesion.id
+        self._sesiones[sesion.id] = sesion
+        self._ubicar_sesion(sesion.id, caja)
+        self.contador_items['creados'] += 3
+
+    def _ubicar_sesion(self, id_sesion, caja):
+        rectangulo, texto, boton = self._items[id_sesion]
+        x0, y0, x1, y1 = caja
+        self.coords(rectangulo, x0, y0, x1, y1)
+        self.coords(texto, (x0 + x1) / 2, y0 + 4)
+        self.itemconfigure(texto, width=max(1, x1 - x0 - 8))
+        self.coords(boton, x1 - 2, y0 + 2)
+
+    def _borrar_sesion(self, id_sesion):
+        if self._resaltada == id_sesion:
+            self._resaltar(None)
+        for item in self._items.pop(id_sesion, ()):
+            del self._sesion_de_item[item]
+            self.delete(item)
+            self.contador_items['borrados'] += 1
+        self._sesiones.pop(id_sesion, None)
+
+    def _al_redimensionar(self, event):
+        if (event.width, event.height) == (self._ancho, self._alto):
+            return
+        self._ancho, self._alto = event.width, event.height
+        self._ubicar_fondo()
+        for id_sesion, sesion in self._sesiones.items():
+            self._ubicar_sesion(id_sesion, self._caja_sesion(sesion))
+
+    # --- Hover, tooltip y clics ---
+
+    def item_en(self, x, y):
+        """(ítem, sesión) más arriba bajo el punto, o (None, None)."""
+        for item in reversed(self.find_overlapping(x, y, x, y)):
+            id_sesion = self._sesion_de_item.get(item)
+            if id_sesion is not None:
+                return item, self._sesiones[id_sesion]
+        return None, None
+
+    def _crear_tooltip(self):
+        self._tooltip_fondo = self.create_rectangle(0, 0, 0, 0, fill=self.colores['text_primary'], outline="",
+                                                    state="hidden", tags=("tooltip",))
+        self._tooltip_texto = self.create_text(0, 0, anchor="nw", fill="white", justify="left",
+                                               font=("Segoe UI", 9), state="hidden", tags=("tooltip",))
+
+    def _al_mover(self, event):
+        x, y = self.canvasx(event.x), self.canvasy(event.y)
+        _, sesion = self.item_en(x, y)
+        self._resaltar(sesion.id if sesion is not None else None)
+        if sesion is None:
+            return
+        self.itemconfigure(self._tooltip_texto, text=self.texto_tooltip(sesion), state="normal")
+        self.coords(self._tooltip_texto, x + 14, y + 14)
+        x0, y0, x1, y1 = self.bbox(self._tooltip_texto)
+        # Si se sale por la derecha o por abajo, se muestra del otro lado del puntero
+        dx = -(x1 - x0) - 28 if x1 + 10 > self._ancho else 0
+        dy = -(y1 - y0) - 28 if y1 + 10 > self._alto else 0
+        if dx or dy:
+            self.move(self._tooltip_texto, dx, dy)
+            x0, y0, x1, y1 = x0 + dx, y0 + dy, x1 + dx, y1 + dy
+        self.coords(self._tooltip_fondo, x0 - 8, y0 - 6, x1 + 8, y1 + 6)
+        self.itemconfigure(self._tooltip_fondo, state="normal")
+        self.tag_raise("tooltip")
+
+    def _resaltar(self, id_sesion):
+        if id_sesion == self._resaltada:
+            return
+        if self._resaltada in self._items:
+            self.itemconfigure(self._items[self._resaltada][0], outline=self.colores['border'], width=1)
+        if id_sesion is not None:
+            self.itemconfigure(self._items[id_sesion][0], outline=self.colores['primary'], width=2)
+            self.configure(cursor="hand2")
+        else:
+            self.itemconfigure("tooltip", state="hidden")
+            self.configure(cursor="")
+        self._resaltada = id_sesion
+
+    def _al_hacer_clic(self, event):
+        item, sesion = self.item_en(self.canvasx(event.x), self.canvasy(event.y))
+        if sesion is not None and "eliminar" in self.gettags(item) and self.al_eliminar is not None:
+            self.al_eliminar(sesion)
+
+
+def _grilla_widgets(parent, dias, horas, colores):
+    """Grilla de Frames por celda como la de AplicacionHorarioModerna, para comparar."""
+    frame = tk.Frame(parent, bg="white")
+    celdas = {}
+    for i, hora in enumerate(horas):
+        tk.Label(frame, text=hora, bg=colores['primary_light']).grid(row=i + 1, column=0, sticky="nsew")
+        for j, dia in enumerate(dias):
+            celda = tk.Frame(frame, bg="white", bd=1, relief="solid", width=ANCHO_DIA, height=ALTO_HORA)
+            celda.grid(row=i + 1, column=j + 1, sticky="nsew", padx=1, pady=1)
+            celda.grid_propagate(False)
+            tk.Label(celda, text="", bg="white").pack(fill="both", expand=True)
+            celdas[(dia, hora)] = celda
+    for i in range(len(horas) + 1):
+        frame.grid_rowconfigure(i, weight=1)
+    for j in range(len(dias) + 1):
+        frame.grid_columnconfigure(j, weight=1)
+    return frame, celdas
+
+
+def _pintar_widgets(celdas, horario):
+    """Repintado completo, como lo hacía la grilla de widgets: borra y recrea todas las celdas."""
+    for celda in celdas.values():
+        for widget in celda.winfo_children():
+            widget.destroy()
+        tk.Label(celda, text="", bg="white").pack(fill="both", expand=True)
+    for clave, sesion in horario.items():
+        if clave in celdas:
+            contenedor = tk.Frame(celdas[clave], bg="#EEF2FF")
+            contenedor.pack(fill="both", expand=True, padx=2, pady=2)
+            tk.Label(contenedor, text="❌", bg="#EF4444").place(relx=1.0, rely=0.0, anchor="ne")
+            info = tk.Frame(contenedor, bg="#EEF2FF")
+            info.pack(fill="both", expand=True)
+            tk.Label(info, text=sesion.grupo.materia.nombre[:15]).pack()
+            tk.Label(info, text=f"{sesion.grupo.nombre}\n{sesion.tipo[:3]}").pack()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara la grilla en Canvas con la grilla de widgets.")
+    parser.add_argument("--benchmark", type=int, default=60, metavar="REPETICIONES",
+                        help="Horarios aleatorios a pintar y redimensionar con cada grilla (por defecto 60)")
+    parser.add_argument("--sesiones", type=int, default=4000, help="Sesiones del catálogo sintético")
+    args = parser.parse_args(argv)
+
+    from logica import catalogo as catalogo_compacto
+    from logica.estado_horario import EstadoHorario
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"No hay pantalla disponible para medir: {e}")
+        return 1
+    conn = catalogo_compacto.base_sintetica(args.sesiones)
+    try:
+        catalogo = catalogo_compacto.cargar_catalogo(conn)
+    finally:
+        conn.close()
+    azar = random.Random(0)
+    horarios = []
+    for _ in range(args.benchmark):
+        estado = EstadoHorario()
+        for grupo in azar.sample(catalogo.grupos, 200):
+            estado.agregar(grupo)
+        horarios.append(estado)
+
+    dias = logica.DIAS_SEMANA[:5]
+    horas = [f"{h:02d}:00" for h in range(7, 20)]
+    colores = {'primary': '#3B82F6', 'primary_light': '#DBEAFE', 'border': '#E5E7EB',
+               'text_primary': '#111827', 'danger': '#EF4444'}
+    root.geometry("1200x800")
+
+    def medir(pintar, redimensionar):
+        pintado, redimensionado = [], []
+        for n, estado in enumerate(horarios):
+            inicio = time.perf_counter()
+            pintar(estado)
+            root.update()
+            pintado.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            redimensionar(1100 + 100 * (n % 2), 750 + 50 * (n % 2))
+            root.update()
+            redimensionado.append(time.perf_counter() - inicio)
+        return 1000 * statistics.median(pintado), 1000 * statistics.median(redimensionado)
+
+    frame, celdas = _grilla_widgets(root, dias, horas, colores)
+    frame.pack(fill="both", expand=True)
+    widgets = medir(lambda estado: _pintar_widgets(celdas, estado.celdas),
+                    lambda ancho, alto: root.geometry(f"{ancho}x{alto}"))
+    frame.destroy()
+
+    grilla = GrillaCanvas(root, dias, 7, 20, colores)
+    grilla.pack(fill="both", expand=True)
+    canvas = medir(lambda estado: grilla.mostrar([s for g in estado.grupos() for s in g.sesiones]),
+                   lambda ancho, alto: root.geometry(f"{ancho}x{alto}"))
+    root.destroy()
+
+    print(f"Mediana de {args.benchmark} horarios     pintar    redimensionar")
+    print(f"  widgets por celda   {widgets[0]:8.2f} ms {widgets[1]:11.2f} ms")
+    print(f"  un solo Canvas      {canvas[0]:8.2f} ms {canvas[1]:11.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
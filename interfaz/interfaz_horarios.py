@@ -5,7 +5,12 @@ from tkinter import ttk, messagebox
 import sys
 import os
 import random
-from datetime import datetime, timedelta
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import OrderedDict
 
 # --- Inicio: Ajuste de ruta para importar db_manager ---
 directorio_actual_interfaz = os.path.dirname(os.path.abspath(__file__))
@@ -14,40 +19,65 @@ sys.path.append(proyecto_raiz)
 # --- Fin: Ajuste de ruta ---
 
 from database import db_manager
+from logica.catalogo import cargar_catalogo_rapido
+from logica.busqueda import IndiceBusqueda
+from logica.compatibles import BuscadorCompatibles
+from logica.estado_horario import EstadoHorario
+from interfaz.grilla_canvas import GrillaCanvas
+from interfaz.lista_virtual import ListaVirtual
+
+GRILLAS = ('canvas', 'widgets')
+RETARDO_BUSQUEDA_MS = 150  # espera tras la última tecla antes de filtrar
+PRESUPUESTO_WIDGETS_GRUPOS = 800  # widgets de paneles de grupos ocultos que se conservan para reabrirlos
+LOTE_MATERIAS = 100  # materias que se agregan a la barra lateral en cada after() durante la carga
+INTERVALO_CARGA_MS = 30  # cada cuánto se revisa lo que entregó el hilo de carga
 
 class AplicacionHorarioModerna:
-    def __init__(self, master_window):
+    def __init__(self, master_window, grilla='canvas', depurar=False):
         self.master = master_window
+        self.grilla = grilla  # 'canvas': GrillaCanvas; 'widgets': un Frame por celda
+        self.depurar = depurar  # imprime los tiempos de arranque
+        self._inicio = time.perf_counter()
         self.master.title("📚 Generador de Horarios - Lic. en Informática")
         self.master.geometry("1600x900")  # Aumenté la ventana para acomodar mejor el contenido
         self.master.state('zoomed')  # Maximizar en Windows
         self.master.configure(bg="#F8F9FA")
         
-        self.conexion_db = None
-        self.materias_data = {}  
-        self.horario_asignado = {}  
+        self.catalogo = None
+        self.indice_busqueda = None
+        self.buscador_compatibles = None
+        self._cola_carga = queue.Queue()  # ('catalogo' | 'indices' | 'error', dato) desde el hilo de carga
+        self._materias_por_mostrar = []
+        self._indices_recibidos = None
+        self.estado_horario = EstadoHorario()
         self.colores_materias = {}  
-        self.widgets_grupos_expandidos = {}
+        self.materias_expandidas = set()  # códigos de las materias con los grupos desplegados
+        self.botones_agregar = {}  # {id del grupo: botón ➕} de los paneles de grupos construidos
+        self.paneles_grupos = OrderedDict()  # {codigo: panel de grupos}, del usado hace más tiempo al más reciente
+        self.widgets_en_paneles = 0
+        self.solo_compatibles_var = tk.BooleanVar(value=False)
         self.busqueda_var = tk.StringVar()
-        self.busqueda_var.trace('w', self._filtrar_materias)
+        self.busqueda_var.trace('w', self._programar_filtrado)
+        self._filtrado_pendiente = None
         
         # Configuración de horarios
         self.dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes']
         self.horas = [f"{h:02d}:00" for h in range(7, 20)]
         
         # Variables de estado
-        self.total_creditos = 0
-        self.materias_filtradas = {}
+        self.grilla_pintada = {}  # {(dia, hora): Sesion} tal como se ve en la grilla
+        self.vistas_celdas = {}  # {(dia, hora): widgets de la celda, reutilizados entre repintados}
+        self.contador_widgets = {'celdas': 0, 'creados': 0, 'destruidos': 0}  # del último repintado
+        self.materias_filtradas = []
         self.hover_celda = None
         
         self._configurar_estilos_modernos()
-        self._conectar_a_base_de_datos()
         
-        if self.conexion_db:
-            self._cargar_datos_materias()
-            self._crear_interfaz_moderna()
-        else:
-            self._mostrar_error_conexion()
+        # La ventana aparece ya; la base se abre en el hilo de carga y las
+        # materias llegan por lotes (un error de conexión llega por la misma cola)
+        self._crear_interfaz_moderna()
+        self.master.after_idle(self._medir_arranque, "primer pintado")
+        self._iniciar_carga_catalogo()
 
     def _configurar_estilos_modernos(self):
         """Configuración de estilos modernos y minimalistas"""
@@ -96,62 +126,81 @@ class AplicacionHorarioModerna:
         style.configure("Primary.TButton",
                         font=("Segoe UI", 9, "bold"))
 
-    def _conectar_a_base_de_datos(self):
+    def _iniciar_carga_catalogo(self):
+        """Carga el catálogo en un hilo aparte; _revisar_carga recibe los resultados en el hilo de Tk"""
+        threading.Thread(target=self._cargar_datos_materias, daemon=True).start()
+        self.master.after(INTERVALO_CARGA_MS, self._revisar_carga)
+
+    def _cargar_datos_materias(self):
+        """Carga todas las materias desde la BD (corre en el hilo de carga: no toca Tk)"""
         try:
-            self.conexion_db = db_manager.crear_conexion()
-            if self.conexion_db is None:
-                messagebox.showerror(
-                    "Error de Base de Datos",
-                    "No se pudo conectar a la base de datos 'horarios.db'.\n"
-                    "Asegúrate de que existe y está correctamente configurada."
-                )
+            # Conexión propia de este hilo: una conexión de SQLite no se comparte entre hilos
+            conexion = db_manager.crear_conexion_migrada()
+            if conexion is None:
+                raise RuntimeError("no se pudo abrir la base de datos 'horarios.db'; si guarda docente y salón "
+                                   f"como texto, {db_manager.AVISO_MIGRACION}")
+            try:
+                catalogo = cargar_catalogo_rapido(conn=conexion)
+            finally:
+                conexion.close()
+            self._cola_carga.put(('catalogo', catalogo))
+            self._cola_carga.put(('indices', (IndiceBusqueda(catalogo), BuscadorCompatibles(catalogo))))
         except Exception as e:
-            messagebox.showerror("Error de Conexión", f"Error inesperado: {e}")
+            self._cola_carga.put(('error', e))
 
-    def _mostrar_error_conexion(self):
-        error_frame = tk.Frame(self.master, bg=self.colores['bg_principal'])
-        error_frame.pack(fill=tk.BOTH, expand=True)
+    def _revisar_carga(self):
+        """Atiende la cola del hilo de carga y agrega un lote de materias a la barra lateral por llamada"""
+        try:
+            while True:
+                tipo, dato = self._cola_carga.get_nowait()
+                if tipo == 'catalogo':
+                    self.catalogo = dato
+                    self._materias_por_mostrar = list(dato)
+                    self._medir_arranque(f"catálogo recibido ({len(dato.materias)} materias)")
+                elif tipo == 'indices':
+                    self._indices_recibidos = dato
+                else:
+                    self.label_carga.configure(text="⚠️ No se pudieron cargar las materias")
+                    messagebox.showerror("Error al Cargar Datos", f"No se pudieron cargar las materias: {dato}")
+                    return
+        except queue.Empty:
+            pass
         
-        error_label = tk.Label(
-            error_frame, 
-            text="⚠️ Error Crítico\n\nNo se pudo conectar a la base de datos.\nLa aplicación no puede funcionar.",
-            font=("Segoe UI", 16, "bold"), 
-            fg=self.colores['danger'],
-            bg=self.colores['bg_principal'],
-            justify=tk.CENTER
-        )
-        error_label.pack(expand=True)
+        pendientes = len(self._materias_por_mostrar) - len(self.materias_filtradas)
+        if pendientes > 0:
+            self._agregar_lote_materias()
+        elif self.catalogo is not None and self._indices_recibidos is not None:
+            self._terminar_carga()
+            return
+        self.master.after(0 if pendientes > 0 else INTERVALO_CARGA_MS, self._revisar_carga)
 
-    def _cargar_datos_materias(self):
-        """Carga todas las materias desde la BD"""
-        try:
-            materias_tuplas = db_manager.obtener_todas_las_materias_simple(self.conexion_db)
-            
-            for codigo, nombre, creditos in materias_tuplas:
-                horarios = db_manager.obtener_horarios_de_materia(self.conexion_db, codigo)
-                
-                grupos = {}
-                for horario in horarios:
-                    nombre_grupo = horario.get('nombre_grupo', 'Sin Grupo')
-                    if nombre_grupo not in grupos:
-                        grupos[nombre_grupo] = {
-                            'sesiones': [],
-                            'docente': horario.get('docente', 'N/A')
-                        }
-                    grupos[nombre_grupo]['sesiones'].append(horario)
-
-                self.materias_data[codigo] = {
-                    'nombre': nombre,
-                    'creditos': creditos or 0,
-                    'grupos': grupos
-                }
-                
-                self.colores_materias[codigo] = self._generar_color_moderno()
-            
-            self.materias_filtradas = self.materias_data.copy()
-            
-        except Exception as e:
-            messagebox.showerror("Error al Cargar Datos", f"No se pudieron cargar las materias: {e}")
+    def _agregar_lote_materias(self):
+        """Suma LOTE_MATERIAS materias a la lista; la búsqueda sigue desactivada hasta _terminar_carga"""
+        inicio = len(self.materias_filtradas)
+        lote = self._materias_por_mostrar[inicio:inicio + LOTE_MATERIAS]
+        for materia in lote:
+            self.colores_materias[materia.codigo] = self._generar_color_moderno()
+        self.materias_filtradas.extend(lote)
+        self._crear_lista_materias_moderna(conservar_posicion=True)
+        self.label_carga.configure(
+            text=f"⏳ Cargando materias… {len(self.materias_filtradas)} de {len(self._materias_por_mostrar)}")
+        if inicio == 0:
+            self._medir_arranque("primeras materias")
+
+    def _terminar_carga(self):
+        """Activa búsqueda, facetas y compatibilidad con los índices que armó el hilo de carga"""
+        self.indice_busqueda, self.buscador_compatibles = self._indices_recibidos
+        self._indices_recibidos = None
+        self.label_carga.pack_forget()
+        # Aplica lo que se haya escrito o marcado mientras cargaba
+        self._filtrar_materias(conservar_posicion=True)
+        for id_grupo, btn_agregar in self.botones_agregar.items():
+            self._marcar_compatibilidad(id_grupo, btn_agregar)
+        self._medir_arranque("interactivo")
+
+    def _medir_arranque(self, etapa):
+        if self.depurar:
+            print(f"[arranque] {etapa}: {1000 * (time.perf_counter() - self._inicio):.0f} ms")
 
     def _generar_color_moderno(self):
         """Genera colores modernos y sutiles"""
@@ -257,7 +306,7 @@ class AplicacionHorarioModerna:
         
         # Barra de búsqueda
         search_frame = tk.Frame(sidebar, bg=self.colores['bg_sidebar'])
-        search_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
+        search_frame.pack(fill=tk.X, padx=20, pady=(0, 8))
         
         search_icon = tk.Label(
             search_frame,
@@ -281,6 +330,44 @@ class AplicacionHorarioModerna:
         self.search_entry.bind("<FocusIn>", self._on_search_focus)
         self.search_entry.bind("<FocusOut>", self._on_search_blur)
         
+        # Conteo de grupos por faceta de la búsqueda actual
+        self.label_facetas = tk.Label(
+            sidebar,
+            text="",
+            font=("Segoe UI", 9),
+            bg=self.colores['bg_sidebar'],
+            fg=self.colores['text_secondary'],
+            justify=tk.LEFT,
+            anchor="w",
+            wraplength=400
+        )
+        self.label_facetas.pack(fill=tk.X, padx=20, pady=(0, 4))
+        self._actualizar_facetas()
+        
+        check_compatibles = tk.Checkbutton(
+            sidebar,
+            text="Solo lo que cabe en mi horario",
+            variable=self.solo_compatibles_var,
+            command=self._filtrar_materias,
+            font=("Segoe UI", 9),
+            bg=self.colores['bg_sidebar'],
+            fg=self.colores['text_secondary'],
+            activebackground=self.colores['bg_sidebar'],
+            anchor="w"
+        )
+        check_compatibles.pack(fill=tk.X, padx=16, pady=(0, 12))
+        
+        # Progreso de la carga del catálogo; se oculta al terminar
+        self.label_carga = tk.Label(
+            sidebar,
+            text="⏳ Cargando materias…",
+            font=("Segoe UI", 10, "italic"),
+            bg=self.colores['bg_sidebar'],
+            fg=self.colores['text_secondary'],
+            anchor="w"
+        )
+        self.label_carga.pack(fill=tk.X, padx=20, pady=(0, 8))
+        
         # Área de scroll para materias
         self._crear_area_materias_scroll(sidebar)
 
@@ -302,49 +389,43 @@ class AplicacionHorarioModerna:
             command=self.canvas_materias.yview
         )
         
-        self.canvas_materias.configure(yscrollcommand=scrollbar_materias.set)
-        
         scrollbar_materias.pack(side="right", fill="y")
         self.canvas_materias.pack(side="left", fill="both", expand=True)
         
-        self.frame_materias_scroll = tk.Frame(self.canvas_materias, bg=self.colores['bg_sidebar'])
-        self.canvas_materias.create_window((0, 0), window=self.frame_materias_scroll, anchor="nw")
-        
-        self._crear_lista_materias_moderna()
-        
-        self.frame_materias_scroll.bind(
-            "<Configure>", 
-            lambda e: self.canvas_materias.configure(scrollregion=self.canvas_materias.bbox("all"))
+        self.lista_materias = ListaVirtual(
+            self.canvas_materias,
+            scrollbar_materias,
+            crear_tarjeta=self._crear_card_materia_moderna,
+            llenar_tarjeta=self._llenar_card_materia,
+            vaciar_tarjeta=self._vaciar_card_materia,
+            clave_altura=self._clave_altura_materia
         )
+        self._crear_lista_materias_moderna()
         
         # Scroll con mouse wheel
         self.canvas_materias.bind_all("<MouseWheel>", self._on_mousewheel)
 
-    def _crear_lista_materias_moderna(self):
-        """Crea la lista moderna de materias"""
-        for widget in self.frame_materias_scroll.winfo_children():
-            widget.destroy()
-        
-        for codigo, data in self.materias_filtradas.items():
-            self._crear_card_materia_moderna(codigo, data)
+    def _crear_lista_materias_moderna(self, conservar_posicion=False):
+        """Muestra las materias filtradas; solo se instancian las tarjetas visibles"""
+        self.lista_materias.mostrar(self.materias_filtradas, conservar_posicion)
 
-    def _crear_card_materia_moderna(self, codigo, data):
-        """Crea una card moderna para cada materia"""
+    def _crear_card_materia_moderna(self, parent):
+        """Crea una card moderna vacía; _llenar_card_materia la asigna a una materia y se recicla al desplazarse"""
+        tarjeta = {}
         # Card principal
         card_frame = tk.Frame(
-            self.frame_materias_scroll,
+            parent,
             bg="white",
             relief="flat",
             bd=1
         )
-        card_frame.pack(fill="x", pady=(0, 15))
         
         # Header de la card
         header_frame = tk.Frame(card_frame, bg="white")
         header_frame.pack(fill="x", padx=15, pady=(15, 10))
         
         # Botón de expansión moderno
-        self.btn_expand = tk.Label(
+        btn_expand = tk.Label(
             header_frame,
             text="▶",
             font=("Segoe UI", 12),
@@ -353,8 +434,8 @@ class AplicacionHorarioModerna:
             cursor="hand2",
             width=2
         )
-        self.btn_expand.pack(side=tk.LEFT)
-        self.btn_expand.bind("<Button-1>", lambda e, c=codigo: self._toggle_grupos_moderno(c))
+        btn_expand.pack(side=tk.LEFT)
+        btn_expand.bind("<Button-1>", lambda e: self._toggle_grupos_moderno(tarjeta['materia'].codigo))
         
         # Info de la materia
         info_frame = tk.Frame(header_frame, bg="white")
@@ -362,7 +443,6 @@ class AplicacionHorarioModerna:
         
         nombre_label = tk.Label(
             info_frame,
-            text=data['nombre'],
             font=("Segoe UI", 12, "bold"),
             bg="white",
             fg=self.colores['text_primary'],
@@ -373,7 +453,6 @@ class AplicacionHorarioModerna:
         
         codigo_creditos = tk.Label(
             info_frame,
-            text=f"{codigo} • {data['creditos']} créditos",
             font=("Segoe UI", 9),
             bg="white",
             fg=self.colores['text_secondary'],
@@ -381,22 +460,87 @@ class AplicacionHorarioModerna:
         )
         codigo_creditos.pack(fill="x")
         
-        # Frame para grupos (inicialmente oculto)
-        grupos_frame = tk.Frame(card_frame, bg="white")
-        
-        self.widgets_grupos_expandidos[codigo] = {
-            'frame': grupos_frame,
-            'btn_toggle': self.btn_expand,
-            'expandido': False,
-            'card_frame': card_frame
-        }
-        
-        # Crear widgets para cada grupo
-        for nombre_grupo, grupo_data in data['grupos'].items():
-            self._crear_grupo_moderno(grupos_frame, codigo, nombre_grupo, grupo_data)
+        tarjeta.update(frame=card_frame, btn_toggle=btn_expand, nombre=nombre_label,
+                       codigo_creditos=codigo_creditos, panel=None, materia=None)
+        return tarjeta
+
+    def _llenar_card_materia(self, tarjeta, materia):
+        """Configura una card (nueva o reciclada) con los datos de la materia y, si está expandida, sus grupos"""
+        self._vaciar_card_materia(tarjeta)
+        tarjeta['materia'] = materia
+        tarjeta['nombre'].configure(text=materia.nombre)
+        tarjeta['codigo_creditos'].configure(text=f"{materia.codigo} • {materia.creditos} créditos")
+        
+        if materia.codigo in self.materias_expandidas:
+            panel = self._panel_grupos(materia)
+            panel['frame'].pack(in_=tarjeta['frame'], fill="x")
+            panel['frame'].lift(tarjeta['frame'])
+            panel['visible'] = True
+            tarjeta['panel'] = panel
+            tarjeta['btn_toggle'].configure(text="▼")
+            self._recortar_paneles()
+        else:
+            tarjeta['btn_toggle'].configure(text="▶")
+
+    def _vaciar_card_materia(self, tarjeta):
+        """Saca el panel de grupos de una card antes de reutilizarla; el panel queda guardado"""
+        panel = tarjeta['panel']
+        if panel is not None:
+            panel['frame'].pack_forget()
+            panel['visible'] = False
+            tarjeta['panel'] = None
+
+    def _panel_grupos(self, materia):
+        """Panel con los grupos de la materia: se construye al expandirla la primera vez y luego se reutiliza"""
+        grupos = self._grupos_a_mostrar(materia)
+        clave = tuple(grupo.id for grupo in grupos)
+        panel = self.paneles_grupos.get(materia.codigo)
+        if panel is not None and panel['clave'] == clave:
+            self.paneles_grupos.move_to_end(materia.codigo)
+            return panel
+        if panel is not None:
+            self._descartar_panel(materia.codigo)
+        
+        # Hijo del canvas (no de una card) para poder mostrarlo en cualquier card reciclada
+        frame = tk.Frame(self.canvas_materias, bg="white")
+        widgets = 1
+        for grupo in grupos:
+            self._crear_grupo_moderno(frame, grupo)
+            widgets += 4 + len(grupo.sesiones)
+        panel = {'frame': frame, 'clave': clave, 'widgets': widgets, 'visible': False}
+        self.paneles_grupos[materia.codigo] = panel
+        self.widgets_en_paneles += widgets
+        return panel
+
+    def _recortar_paneles(self):
+        """Destruye los paneles ocultos usados hace más tiempo mientras se exceda PRESUPUESTO_WIDGETS_GRUPOS"""
+        for codigo in list(self.paneles_grupos):
+            if self.widgets_en_paneles <= PRESUPUESTO_WIDGETS_GRUPOS:
+                break
+            if not self.paneles_grupos[codigo]['visible']:
+                self._descartar_panel(codigo)
 
-    def _crear_grupo_moderno(self, parent, codigo_materia, nombre_grupo, grupo_data):
+    def _descartar_panel(self, codigo):
+        panel = self.paneles_grupos.pop(codigo)
+        for id_grupo in panel['clave']:
+            self.botones_agregar.pop(id_grupo, None)
+        panel['frame'].destroy()
+        self.widgets_en_paneles -= panel['widgets']
+
+    def _grupos_a_mostrar(self, materia):
+        solo_compatibles = self.solo_compatibles_var.get() and self.buscador_compatibles is not None
+        return [grupo for grupo in materia.grupos
+                if grupo.sesiones and not (solo_compatibles and not self.buscador_compatibles.cabe(grupo, self.estado_horario))]
+
+    def _clave_altura_materia(self, materia):
+        """Las cards colapsadas miden lo mismo; las expandidas, según los grupos que muestran"""
+        if materia.codigo not in self.materias_expandidas:
+            return 'colapsada'
+        return materia.id, tuple(grupo.id for grupo in self._grupos_a_mostrar(materia))
+
+    def _crear_grupo_moderno(self, parent, grupo):
         """Crea un widget moderno para cada grupo con mejor distribución"""
+        codigo_materia = grupo.materia.codigo
         grupo_frame = tk.Frame(
             parent,
             bg=self.colores_materias[codigo_materia],
@@ -420,12 +564,14 @@ class AplicacionHorarioModerna:
             relief="flat"
         )
         btn_agregar.pack(side=tk.RIGHT, padx=(10, 0))  # Mayor separación del texto
-        btn_agregar.bind("<Button-1>", lambda e, c=codigo_materia, g=nombre_grupo: self._agregar_grupo_al_horario(c, g))
+        btn_agregar.bind("<Button-1>", lambda e, g=grupo.id: self._agregar_grupo_al_horario(g))
+        self.botones_agregar[grupo.id] = btn_agregar
+        self._marcar_compatibilidad(grupo.id, btn_agregar)
 
         # Etiqueta del docente y grupo - ahora con más espacio
         docente_label = tk.Label(
             grupo_header,
-            text=f"👨‍🏫 {grupo_data['docente']} • Grupo {nombre_grupo}",
+            text=f"👨‍🏫 {grupo.docente or 'N/A'} • Grupo {grupo.nombre}",
             font=("Segoe UI", 10, "bold"),
             bg=self.colores_materias[codigo_materia],
             fg=self.colores['text_primary'],
@@ -436,10 +582,10 @@ class AplicacionHorarioModerna:
         docente_label.pack(side=tk.LEFT, fill="x", expand=True, pady=4)
 
         # Horarios del grupo
-        for sesion in grupo_data['sesiones']:
+        for sesion in grupo.sesiones:
             horario_label = tk.Label(
                 grupo_frame,
-                text=f"📅 {sesion['tipo_sesion']}: {sesion['dia_semana']} {sesion['hora_inicio']}-{sesion['hora_fin']}",
+                text=f"📅 {sesion.tipo}: {sesion.dia} {sesion.hora_inicio}-{sesion.hora_fin}",
                 font=("Segoe UI", 9),
                 bg=self.colores_materias[codigo_materia],
                 fg=self.colores['text_secondary'],
@@ -480,6 +626,21 @@ class AplicacionHorarioModerna:
         canvas_container = tk.Frame(horario_frame, bg=self.colores['bg_card'])
         canvas_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=(10, 20))
         
+        if self.grilla == 'canvas':
+            self.grilla_canvas = GrillaCanvas(
+                canvas_container,
+                self.dias,
+                hora_inicio=int(self.horas[0][:2]),
+                hora_fin=int(self.horas[-1][:2]) + 1,
+                colores=self.colores,
+                colores_materias=self.colores_materias,
+                al_eliminar=lambda sesion: self._quitar_grupo_del_horario(sesion.grupo),
+                texto_tooltip=self._generar_texto_tooltip
+            )
+            self.grilla_canvas.pack(fill=tk.BOTH, expand=True)
+            self.grilla_widgets = {}
+            return
+        
         self.canvas_horario = tk.Canvas(
             canvas_container, 
             bg="white",
@@ -573,6 +734,7 @@ class AplicacionHorarioModerna:
                     font=("Segoe UI", 8)
                 )
                 label_vacio.pack(fill="both", expand=True)
+                self.vistas_celdas[(dia, hora)] = {'vacio': label_vacio}
         # Configurar grid weights
         for i in range(len(self.horas) + 1):
             self.frame_grilla.grid_rowconfigure(i, weight=1)
@@ -590,19 +752,57 @@ class AplicacionHorarioModerna:
         """Maneja el evento de blur en la búsqueda"""
         self.search_entry.configure(bg="white")
 
-    def _filtrar_materias(self, *args):
-        """Filtra las materias según el texto de búsqueda"""
-        texto_busqueda = self.busqueda_var.get().lower()
-        
-        if texto_busqueda == "":
-            self.materias_filtradas = self.materias_data.copy()
+    def _programar_filtrado(self, *args):
+        """Filtra cuando se deja de escribir por RETARDO_BUSQUEDA_MS, no en cada tecla"""
+        if self._filtrado_pendiente is not None:
+            self.master.after_cancel(self._filtrado_pendiente)
+        self._filtrado_pendiente = self.master.after(RETARDO_BUSQUEDA_MS, self._filtrar_materias)
+
+    def _filtrar_materias(self, *args, conservar_posicion=False):
+        """Filtra las materias según el texto de búsqueda (código, nombre, docente, salón o día)"""
+        self._filtrado_pendiente = None
+        if self.indice_busqueda is None:
+            return
+        self.materias_filtradas = self.indice_busqueda.buscar(self.busqueda_var.get())
+        if self.solo_compatibles_var.get():
+            caben = self.buscador_compatibles.materias_compatibles(self.estado_horario)
+            self.materias_filtradas = [materia for materia in self.materias_filtradas if caben[materia.id]]
+        self._actualizar_facetas()
+        self._crear_lista_materias_moderna(conservar_posicion)
+
+    def _marcar_compatibilidad(self, id_grupo, btn_agregar):
+        """Pinta el botón ➕ según el grupo quepa o no en el horario actual"""
+        if self.buscador_compatibles is None:
+            return
+        if self.buscador_compatibles.compatibles(self.estado_horario)[id_grupo]:
+            btn_agregar.configure(text="➕", bg=self.colores['success'])
         else:
-            self.materias_filtradas = {
-                codigo: data for codigo, data in self.materias_data.items()
-                if texto_busqueda in data['nombre'].lower() or texto_busqueda in codigo.lower()
-            }
-        
-        self._crear_lista_materias_moderna()
+            btn_agregar.configure(text="⛔", bg=self.colores['border'])
+
+    def _actualizar_compatibles(self):
+        """Refleja en la barra lateral los grupos que caben tras cambiar el horario"""
+        if self.solo_compatibles_var.get():
+            self._filtrar_materias(conservar_posicion=True)
+            return
+        for id_grupo, btn_agregar in self.botones_agregar.items():
+            self._marcar_compatibilidad(id_grupo, btn_agregar)
+
+    def _actualizar_facetas(self):
+        """Muestra cuántos grupos de las materias filtradas hay por día, tipo, docente, créditos y turno"""
+        if self.indice_busqueda is None:
+            return
+        conteos = self.indice_busqueda.facetas(self.busqueda_var.get())
+        etiquetas = (('dia', "📅"), ('turno', "🕐"), ('tipo', "📝"), ('creditos', "⭐"), ('docente', "👤"))
+        lineas = []
+        for faceta, icono in etiquetas:
+            pares = conteos[faceta]
+            if faceta == 'docente':
+                pares = pares[:3]
+            elif faceta == 'creditos':
+                pares = [(f"{valor} cr", n) for valor, n in pares]
+            if pares:
+                lineas.append(f"{icono} " + " · ".join(f"{valor} ({n})" for valor, n in pares))
+        self.label_facetas.configure(text="\n".join(lineas) if lineas else "Sin grupos para esta búsqueda")
 
     def _on_mousewheel(self, event):
         """Maneja el scroll con rueda del mouse"""
@@ -611,193 +811,167 @@ class AplicacionHorarioModerna:
     def _on_celda_hover(self, dia, hora):
         """Maneja el hover sobre las celdas del horario"""
         self.hover_celda = (dia, hora)
-        if (dia, hora) not in self.horario_asignado:
+        if (dia, hora) not in self.estado_horario.celdas:
             celda = self.grilla_widgets[(dia, hora)]
             celda.configure(bg=self.colores['hover'])
 
     def _on_celda_leave(self):
         """Maneja cuando el mouse sale de una celda"""
-        if self.hover_celda and self.hover_celda not in self.horario_asignado:
+        if self.hover_celda and self.hover_celda not in self.estado_horario.celdas:
             celda = self.grilla_widgets[self.hover_celda]
             celda.configure(bg="white")
         self.hover_celda = None
 
     def _toggle_grupos_moderno(self, codigo):
         """Toggle moderno para expandir/colapsar grupos"""
-        widget_info = self.widgets_grupos_expandidos[codigo]
-        
-        if widget_info['expandido']:
-            widget_info['frame'].pack_forget()
-            widget_info['btn_toggle'].configure(text="▶")
+        if codigo in self.materias_expandidas:
+            self.materias_expandidas.discard(codigo)
         else:
-            widget_info['frame'].pack(fill="x")
-            widget_info['btn_toggle'].configure(text="▼")
-            
-        widget_info['expandido'] = not widget_info['expandido']
+            self.materias_expandidas.add(codigo)
         
-        # Actualizar scroll
-        self.frame_materias_scroll.update_idletasks()
-        self.canvas_materias.configure(scrollregion=self.canvas_materias.bbox("all"))
+        # Rellenar la card y reacomodar las de abajo
+        self.lista_materias.actualizar(self.catalogo.materia(codigo))
 
-    def _agregar_grupo_al_horario(self, codigo_materia, nombre_grupo):
+    def _agregar_grupo_al_horario(self, id_grupo):
         """Agrega un grupo al horario con validación mejorada"""
-        materia_info = self.materias_data.get(codigo_materia)
-        if not materia_info:
-            self._mostrar_mensaje_error("❌ Error", f"No se encontró información para la materia {codigo_materia}.")
+        if not 0 <= id_grupo < len(self.catalogo.grupos):
+            self._mostrar_mensaje_error("❌ Error", f"No se encontró el grupo {id_grupo}.")
             return
-        
-        grupo_info = materia_info['grupos'].get(nombre_grupo)
-        if not grupo_info:
-            self._mostrar_mensaje_error("❌ Error", f"No se encontró el grupo {nombre_grupo}.")
-            return
-            
-        horarios_a_agregar = grupo_info['sesiones']
-        conflictos = []
+        grupo = self.catalogo.grupos[id_grupo]
+        materia_info = grupo.materia
+        nombre_grupo = grupo.nombre
         
         # Verificar conflictos
-        for horario in horarios_a_agregar:
-            dia = horario['dia_semana']
-            inicio = horario['hora_inicio']
-            fin = horario['hora_fin']
-            
-            hora_inicio_dt = datetime.strptime(inicio, "%H:%M")
-            hora_fin_dt = datetime.strptime(fin, "%H:%M")
-            
-            hora_actual_dt = hora_inicio_dt
-            while hora_actual_dt < hora_fin_dt:
-                hora_str = hora_actual_dt.strftime("%H:%M")
-                if (dia, hora_str) in self.horario_asignado:
-                    conflictos.append({
-                        "dia": dia, 
-                        "hora": hora_str, 
-                        "materia_existente": self.horario_asignado[(dia, hora_str)]['info']['nombre']
-                    })
-                hora_actual_dt += timedelta(hours=1)
-
+        conflictos = self.estado_horario.conflictos(grupo)
         if conflictos:
             mensaje_conflicto = "⚠️ Conflictos de Horario\n\nLos siguientes horarios ya están ocupados:\n\n"
-            for c in conflictos:
-                mensaje_conflicto += f"• {c['dia']} a las {c['hora']} - {c['materia_existente']}\n"
+            for dia, hora, sesion in conflictos:
+                mensaje_conflicto += f"• {dia} a las {hora} - {sesion.grupo.materia.nombre}\n"
             
             self._mostrar_mensaje_warning("Conflicto", mensaje_conflicto)
             return
-            
+        
         # Agregar al horario
-        for horario in horarios_a_agregar:
-            dia = horario['dia_semana']
-            inicio = horario['hora_inicio']
-            fin = horario['hora_fin']
-            
-            hora_inicio_dt = datetime.strptime(inicio, "%H:%M")
-            hora_fin_dt = datetime.strptime(fin, "%H:%M")
-            
-            hora_actual_dt = hora_inicio_dt
-            while hora_actual_dt < hora_fin_dt:
-                hora_str = hora_actual_dt.strftime("%H:%M")
-                self.horario_asignado[(dia, hora_str)] = {
-                    'codigo': codigo_materia,
-                    'info': materia_info,
-                    'nombre_grupo': nombre_grupo,
-                    'horario_sesion': horario
-                }
-                hora_actual_dt += timedelta(hours=1)
-        
-        # Actualizar totales
-        self.total_creditos += materia_info['creditos']
+        if not self.estado_horario.agregar(grupo):
+            inscrito = self.estado_horario.materias.get(materia_info.id)
+            if inscrito is not None:
+                mensaje = f"⚠️ Ya tienes el grupo '{inscrito.nombre}' de {materia_info.nombre} en el horario"
+            else:
+                mensaje = f"⚠️ '{nombre_grupo}' se cruza con una sesión que ya está en el horario"
+            self._mostrar_mensaje_warning("Conflicto", mensaje)
+            return
+        
+        self._actualizar_compatibles()
         self._actualizar_grilla_horarios()
         self._actualizar_indicadores()
-        self._mostrar_mensaje_success("✅ Grupo Agregado", f"'{nombre_grupo}' de {materia_info['nombre']} agregado al horario")
+        self._mostrar_mensaje_success("✅ Grupo Agregado", f"'{nombre_grupo}' de {materia_info.nombre} agregado al horario")
 
     def _actualizar_grilla_horarios(self):
-        """Actualiza la grilla del horario con animaciones suaves"""
-        # Limpiar celdas
-        for celda in self.grilla_widgets.values():
-            for widget in celda.winfo_children():
-                widget.destroy()
-            tk.Label(celda, text="", bg="white").pack(fill="both", expand=True)
-
-        # Agregar materias asignadas
-        for (dia, hora), data in self.horario_asignado.items():
-            if (dia, hora) in self.grilla_widgets:
-                frame_celda = self.grilla_widgets[(dia, hora)]
-                color = self.colores_materias.get(data['codigo'], "white")
-                
-                # Limpiar celda
-                for widget in frame_celda.winfo_children():
-                    widget.destroy()
+        """Repinta solo las celdas cuya sesión cambió desde el último repintado, reutilizando sus widgets"""
+        if self.grilla == 'canvas':
+            self.grilla_canvas.mostrar(sesion for grupo in self.estado_horario.grupos() for sesion in grupo.sesiones)
+            logging.debug("Grilla: {creados} ítems creados, {borrados} borrados".format(
+                **self.grilla_canvas.contador_items))
+            return
+        self.contador_widgets = {'celdas': 0, 'creados': 0, 'destruidos': 0}
+        celdas = self.estado_horario.celdas
+        for clave in self.grilla_pintada.keys() | celdas.keys():
+            sesion = celdas.get(clave)
+            if clave in self.vistas_celdas and self.grilla_pintada.get(clave) is not sesion:
+                self._pintar_celda(clave, sesion)
+                self.contador_widgets['celdas'] += 1
+        logging.debug("Grilla: {celdas} celdas repintadas, {creados} widgets creados, "
+                      "{destruidos} destruidos".format(**self.contador_widgets))
 
-                # Container principal de la celda
-                container = tk.Frame(frame_celda, bg=color, relief="flat")
-                container.pack(fill="both", expand=True, padx=2, pady=2)
-                
-                # Botón de eliminar (aparece en hover)
-                btn_eliminar = tk.Label(
-                    container,
-                    text="❌",
-                    font=("Segoe UI", 8),
-                    bg=self.colores['danger'],
-                    fg="white",
-                    cursor="hand2",
-                    padx=2, pady=1
-                )
-                btn_eliminar.place(relx=1.0, rely=0.0, anchor="ne")
-                btn_eliminar.bind("<Button-1>", lambda e, d=dia, h=hora: self._eliminar_de_horario(d, h))
-                
-                # Información de la materia
-                info_frame = tk.Frame(container, bg=color)
-                info_frame.pack(fill="both", expand=True, padx=5, pady=3)
-                
-                # Nombre de la materia (con mejor manejo de texto largo)
-                nombre_display = data['info']['nombre']
-                if len(nombre_display) > 18:  # Aumenté el límite
-                    nombre_display = nombre_display[:15] + "..."
-                
-                label_materia = tk.Label(
-                    info_frame,
-                    text=nombre_display,
-                    bg=color,
-                    font=("Segoe UI", 9, "bold"),
-                    fg=self.colores['text_primary'],
-                    justify=tk.CENTER,
-                    wraplength=180  # Añadí wraplength para mejor ajuste
-                )
-                label_materia.pack()
-                
-                # Información adicional
-                info_adicional = f"{data['nombre_grupo']}\n{data['horario_sesion']['tipo_sesion'][:3]}"
-                label_info = tk.Label(
-                    info_frame,
-                    text=info_adicional,
-                    bg=color,
-                    font=("Segoe UI", 7),
-                    fg=self.colores['text_secondary'],
-                    justify=tk.CENTER
-                )
-                label_info.pack()
-                
-                # Tooltip con información completa
-                self._crear_tooltip(container, self._generar_texto_tooltip(data))
+    def _pintar_celda(self, clave, sesion):
+        """Muestra en la celda la sesión indicada, o la deja vacía si es None"""
+        vista = self.vistas_celdas[clave]
+        if sesion is None:
+            vista['container'].pack_forget()
+            vista['vacio'].pack(fill="both", expand=True)
+            del self.grilla_pintada[clave]
+            return
+        if 'container' not in vista:
+            self._crear_vista_ocupada(clave, vista)
+        color = self.colores_materias.get(sesion.grupo.materia.codigo, "white")
+        
+        # Nombre de la materia (con mejor manejo de texto largo)
+        nombre_display = sesion.grupo.materia.nombre
+        if len(nombre_display) > 18:  # Aumenté el límite
+            nombre_display = nombre_display[:15] + "..."
+        
+        vista['container'].configure(bg=color)
+        vista['info_frame'].configure(bg=color)
+        vista['label_materia'].configure(text=nombre_display, bg=color)
+        vista['label_info'].configure(text=f"{sesion.grupo.nombre}\n{sesion.tipo[:3]}", bg=color)
+        vista['sesion'] = sesion
+        if clave not in self.grilla_pintada:
+            vista['vacio'].pack_forget()
+            vista['container'].pack(fill="both", expand=True, padx=2, pady=2)
+        self.grilla_pintada[clave] = sesion
+
+    def _crear_vista_ocupada(self, clave, vista):
+        """Crea una sola vez los widgets de una celda ocupada; después solo se reconfiguran"""
+        dia, hora = clave
+        frame_celda = self.grilla_widgets[clave]
+        
+        # Container principal de la celda
+        container = tk.Frame(frame_celda, relief="flat")
+        
+        # Botón de eliminar (aparece en hover)
+        btn_eliminar = tk.Label(
+            container,
+            text="❌",
+            font=("Segoe UI", 8),
+            bg=self.colores['danger'],
+            fg="white",
+            cursor="hand2",
+            padx=2, pady=1
+        )
+        btn_eliminar.place(relx=1.0, rely=0.0, anchor="ne")
+        btn_eliminar.bind("<Button-1>", lambda e, d=dia, h=hora: self._eliminar_de_horario(d, h))
+        
+        # Información de la materia
+        info_frame = tk.Frame(container)
+        info_frame.pack(fill="both", expand=True, padx=5, pady=3)
+        
+        label_materia = tk.Label(
+            info_frame,
+            font=("Segoe UI", 9, "bold"),
+            fg=self.colores['text_primary'],
+            justify=tk.CENTER,
+            wraplength=180  # Añadí wraplength para mejor ajuste
+        )
+        label_materia.pack()
+        
+        # Información adicional
+        label_info = tk.Label(
+            info_frame,
+            font=("Segoe UI", 7),
+            fg=self.colores['text_secondary'],
+            justify=tk.CENTER
+        )
+        label_info.pack()
+        
+        # Tooltip con la información completa de la sesión que muestre la celda en ese momento
+        self._crear_tooltip(container, lambda: self._generar_texto_tooltip(vista['sesion']))
+        
+        vista.update(container=container, info_frame=info_frame,
+                     label_materia=label_materia, label_info=label_info)
+        self.contador_widgets['creados'] += 5
 
     def _eliminar_de_horario(self, dia, hora):
         """Elimina una materia específica del horario"""
-        if (dia, hora) in self.horario_asignado:
-            data = self.horario_asignado[(dia, hora)]
-            codigo_materia = data['codigo']
-            nombre_grupo = data['nombre_grupo']
-            creditos = data['info']['creditos']
-            
-            # Encontrar y eliminar todas las horas de este grupo
-            horas_a_eliminar = []
-            for (d, h), asignacion in self.horario_asignado.items():
-                if (asignacion['codigo'] == codigo_materia and 
-                    asignacion['nombre_grupo'] == nombre_grupo):
-                    horas_a_eliminar.append((d, h))
-            
-            for hora_eliminar in horas_a_eliminar:
-                del self.horario_asignado[hora_eliminar]
+        grupo = self.estado_horario.grupo_en(dia, hora)
+        if grupo is not None:
+            self._quitar_grupo_del_horario(grupo)
+
+    def _quitar_grupo_del_horario(self, grupo):
+        """Quita un grupo completo del horario"""
+        if self.estado_horario.quitar(grupo):
+            nombre_grupo = grupo.nombre
             
-            # Actualizar créditos
-            self.total_creditos -= creditos
+            self._actualizar_compatibles()
             self._actualizar_grilla_horarios()
             self._actualizar_indicadores()
             
@@ -805,19 +979,20 @@ class AplicacionHorarioModerna:
 
     def _actualizar_indicadores(self):
         """Actualiza los indicadores de créditos y resumen"""
-        num_materias = len(set(data['codigo'] for data in self.horario_asignado.values()))
+        num_materias = len(self.estado_horario.materias)
+        total_creditos = self.estado_horario.creditos
         
         # Actualizar label de créditos en toolbar
-        self.creditos_label.configure(text=f"📊 {self.total_creditos} créditos")
+        self.creditos_label.configure(text=f"📊 {total_creditos} créditos")
         
         # Actualizar resumen en área de horario
-        self.resumen_label.configure(text=f"{num_materias} materias • {self.total_creditos} créditos")
+        self.resumen_label.configure(text=f"{num_materias} materias • {total_creditos} créditos")
         
         # Cambiar color según la cantidad de créditos
-        if self.total_creditos <= 12:
+        if total_creditos <= 12:
             bg_color = self.colores['primary_light']
             fg_color = self.colores['primary']
-        elif self.total_creditos <= 18:
+        elif total_creditos <= 18:
             bg_color = "#FEF3C7"  # Amarillo claro
             fg_color = "#D97706"  # Amarillo oscuro
         else:
@@ -828,39 +1003,39 @@ class AplicacionHorarioModerna:
 
     def _limpiar_horario(self):
         """Limpia completamente el horario"""
-        if not self.horario_asignado:
+        if not self.estado_horario:
             self._mostrar_mensaje_info("ℹ️ Información", "El horario ya está vacío")
             return
             
         if messagebox.askyesno("🗑️ Confirmar", "¿Estás seguro de que quieres limpiar todo el horario?"):
-            self.horario_asignado = {}
-            self.total_creditos = 0
+            self.estado_horario.limpiar()
+            self._actualizar_compatibles()
             self._actualizar_grilla_horarios()
             self._actualizar_indicadores()
             self._mostrar_mensaje_success("✅ Limpiado", "Horario limpiado completamente")
 
     def _guardar_horario(self):
         """Guarda el horario actual (placeholder)"""
-        if not self.horario_asignado:
+        if not self.estado_horario:
             self._mostrar_mensaje_warning("⚠️ Aviso", "No hay materias en el horario para guardar")
             return
         
         # Aquí se implementaría la lógica de guardado real
         self._mostrar_mensaje_success("💾 Guardado", "Horario guardado exitosamente")
 
-    def _generar_texto_tooltip(self, data):
+    def _generar_texto_tooltip(self, sesion):
         """Genera el texto del tooltip con información completa"""
-        horario = data['horario_sesion']
-        return (f"{data['info']['nombre']}\n"
-                f"Código: {data['codigo']}\n"
-                f"Grupo: {data['nombre_grupo']}\n"
-                f"Docente: {horario.get('docente', 'N/A')}\n"
-                f"Tipo: {horario['tipo_sesion']}\n"
-                f"Horario: {horario['hora_inicio']}-{horario['hora_fin']}\n"
-                f"Créditos: {data['info']['creditos']}")
+        materia = sesion.grupo.materia
+        return (f"{materia.nombre}\n"
+                f"Código: {materia.codigo}\n"
+                f"Grupo: {sesion.grupo.nombre}\n"
+                f"Docente: {sesion.docente or 'N/A'}\n"
+                f"Tipo: {sesion.tipo}\n"
+                f"Horario: {sesion.hora_inicio}-{sesion.hora_fin}\n"
+                f"Créditos: {materia.creditos}")
 
     def _crear_tooltip(self, widget, texto):
-        """Crea un tooltip para un widget"""
+        """Crea un tooltip para un widget (texto puede ser una función que lo genere al mostrarse)"""
         def mostrar_tooltip(event):
             tooltip = tk.Toplevel()
             tooltip.wm_overrideredirect(True)
@@ -868,7 +1043,7 @@ class AplicacionHorarioModerna:
             
             label = tk.Label(
                 tooltip,
-                text=texto,
+                text=texto() if callable(texto) else texto,
                 justify='left',
                 background=self.colores['text_primary'],
                 foreground='white',
@@ -921,16 +1096,20 @@ class AplicacionHorarioModerna:
     def run(self):
         """Inicia la aplicación"""
         self.master.mainloop()
-        
-    def __del__(self):
-        """Destructor para cerrar la conexión a la BD"""
-        if hasattr(self, 'conexion_db') and self.conexion_db:
-            self.conexion_db.close()
 
 # Función principal para ejecutar la aplicación
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Armado manual del horario.")
+    parser.add_argument("--grilla", choices=GRILLAS, default='canvas',
+                        help="Cómo se dibuja el horario: un solo Canvas (por defecto) o un widget por celda")
+    parser.add_argument("--debug", action="store_true",
+                        help="Imprime los tiempos hasta el primer pintado y hasta que la interfaz es usable")
+    args = parser.parse_args(argv)
+
+    if args.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
     root = tk.Tk()
-    app = AplicacionHorarioModerna(root)
+    app = AplicacionHorarioModerna(root, grilla=args.grilla, depurar=args.debug)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+# PROYECTO_RAIZ/interfaz/lista_virtual.py
+#
+# Lista vertical virtualizada sobre un tk.Canvas para la barra lateral de
+# materias: solo existen las tarjetas que caben en la vista (más un margen) y,
+# al desplazarse, las que salen se reutilizan para las que entran. Cada
+# tarjeta es un Frame dentro de un ítem "window" del Canvas, ubicado según
+# la suma de las alturas anteriores; la altura de cada elemento se mide la
+# primera vez que se muestra y mientras tanto se estima con la ya medida.
+#
+#     python -m interfaz.lista_virtual --benchmark 3000   # lista completa contra virtual (necesita pantalla)
+
+import tkinter as tk
+import sys
+import os
+import time
+import argparse
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_interfaz = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_interfaz)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+ALTO_ESTIMADO = 80
+MARGEN_VISTA = 300  # píxeles por encima y por debajo de la vista que también se instancian
+
+
+class ListaVirtual:
+    """
+    `crear_tarjeta(padre)` devuelve un dict con al menos 'frame';
+    `llenar_tarjeta(tarjeta, elemento)` la configura para un elemento y
+    `vaciar_tarjeta(tarjeta)` (opcional) la suelta antes de reciclarla.
+    `clave_altura(elemento)` identifica las alturas medidas: si el elemento
+    cambia de aspecto (por ejemplo, se expande) debe cambiar su clave.
+    """
+
+    def __init__(self, canvas, scrollbar, crear_tarjeta, llenar_tarjeta, vaciar_tarjeta=None,
+                 clave_altura=id, separacion=15):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.crear_tarjeta = crear_tarjeta
+        self.llenar_tarjeta = llenar_tarjeta
+        self.vaciar_tarjeta = vaciar_tarjeta
+        self.clave_altura = clave_altura
+        self.separacion = separacion
+        self.elementos = []
+        self.contador = {'creadas': 0, 'recicladas': 0}  # acumulado
+        self._alturas = {}  # {clave: alto medido}
+        self._alto_estimado = ALTO_ESTIMADO
+        self._inicios = []  # y de cada elemento
+        self._alto_total = 0
+        self._visibles = {}  # {índice: tarjeta}
+        self._libres = []
+        self._refresco_pendiente = None
+        self.canvas.configure(yscrollcommand=self._al_desplazar)
+        self.canvas.bind("<Configure>", self._al_redimensionar, add="+")
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def mostrar(self, elementos, conservar_posicion=False):
+        """Reemplaza los elementos de la lista; vuelve arriba salvo con conservar_posicion."""
+        for indice in list(self._visibles):
+            self._soltar(indice)
+        self.elementos = list(elementos)
+        self._recalcular()
+        if not conservar_posicion:
+            self.canvas.yview_moveto(0)
+        self._refrescar()
+
+    def actualizar(self, elemento=None):
+        """Vuelve a llenar las tarjetas visibles (o solo la de `elemento`) y corrige las alturas."""
+        for indice, tarjeta in list(self._visibles.items()):
+            if elemento is None or self.elementos[indice] is elemento:
+                self.llenar_tarjeta(tarjeta, self.elementos[indice])
+                self._medir(indice, tarjeta)
+        self._recalcular()
+        self._refrescar()
+
+    def tarjetas_visibles(self):
+        return list(self._visibles.values())
+
+    # --- Disposición ---
+
+    def _altura(self, elemento):
+        return self._alturas.get(self.clave_altura(elemento), self._alto_estimado)
+
+    def _recalcular(self):
+        alturas = [self._altura(elemento) + self.separacion for elemento in self.elementos]
+        self._inicios = [0, *accumulate(alturas)][:-1] if alturas else []
+        self._alto_total = sum(alturas)
+        ancho = max(1, self.canvas.winfo_width())
+        self.canvas.configure(scrollregion=(0, 0, ancho, self._alto_total))
+        for indice, tarjeta in self._visibles.items():
+            self.canvas.coords(tarjeta['_ventana'], 0, self._inicios[indice])
+
+    def _rango_visible(self):
+        arriba = self.canvas.canvasy(0)
+        abajo = arriba + max(1, self.canvas.winfo_height())
+        primero = max(0, bisect_right(self._inicios, arriba - MARGEN_VISTA) - 1)
+        ultimo = bisect_left(self._inicios, abajo + MARGEN_VISTA)
+        return range(primero, ultimo)
+
+    def _refrescar(self):
+        self._refresco_pendiente = None
+        # Medir tarjetas nuevas puede mover a las demás; unas pocas pasadas bastan
+        for _ in range(3):
+            visibles = self._rango_visible()
+            for indice in [i for i in self._visibles if i not in visibles]:
+                self._soltar(indice)
+            cambio = False
+            for indice in visibles:
+                if indice not in self._visibles:
+                    cambio |= self._tomar(indice)
+            if not cambio:
+                break
+            self._recalcular()
+
+    def _tomar(self, indice):
+        """Pone una tarjeta (reciclada si hay) en la posición; True si su altura medida cambió la disposición."""
+        if self._libres:
+            tarjeta = self._libres.pop()
+            self.contador['recicladas'] += 1
+        else:
+            tarjeta = self.crear_tarjeta(self.canvas)
+            tarjeta['_ventana'] = self.canvas.create_window(0, 0, window=tarjeta['frame'], anchor="nw",
+                                                            width=max(1, self.canvas.winfo_width()))
+            self.contador['creadas'] += 1
+        self.llenar_tarjeta(tarjeta, self.elementos[indice])
+        self.canvas.coords(tarjeta['_ventana'], 0, self._inicios[indice])
+        self.canvas.itemconfigure(tarjeta['_ventana'], state="normal")
+        self._visibles[indice] = tarjeta
+        return self._medir(indice, tarjeta)
+
+    def _soltar(self, indice):
+        tarjeta = self._visibles.pop(indice)
+        self.canvas.itemconfigure(tarjeta['_ventana'], state="hidden")
+        if self.vaciar_tarjeta is not None:
+            self.vaciar_tarjeta(tarjeta)
+        self._libres.append(tarjeta)
+
+    def _medir(self, indice, tarjeta):
+        tarjeta['frame'].update_idletasks()
+        alto = tarjeta['frame'].winfo_reqheight()
+        clave = self.clave_altura(self.elementos[indice])
+        if alto <= 1 or self._alturas.get(clave) == alto:
+            return False
+        anterior = self._altura(self.elementos[indice])
+        self._alturas[clave] = alto
+        if len(self._alturas) == 1:
+            self._alto_estimado = alto
+        return alto != anterior
+
+    # --- Eventos ---
+
+    def _al_desplazar(self, primero, ultimo):
+        self.scrollbar.set(primero, ultimo)
+        if self._refresco_pendiente is None:
+            self._refresco_pendiente = self.canvas.after_idle(self._refrescar)
+
+    def _al_redimensionar(self, event):
+        for tarjeta in self._visibles.values():
+            self.canvas.itemconfigure(tarjeta['_ventana'], width=event.width)
+        for tarjeta in self._libres:
+            self.canvas.itemconfigure(tarjeta['_ventana'], width=event.width)
+        self._recalcular()
+        self._refrescar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara la lista de materias completa con la virtualizada.")
+    parser.add_argument("--benchmark", type=int, default=3000, metavar="MATERIAS",
+                        help="Número de tarjetas de la lista (por defecto 3000)")
+    args = parser.parse_args(argv)
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"No hay pantalla disponible para medir: {e}")
+        return 1
+    root.geometry("450x800")
+    elementos = [(f"{1000 + i}", f"MATERIA SINTETICA {i}") for i in range(args.benchmark)]
+
+    def crear(padre):
+        frame = tk.Frame(padre, bg="white")
+        nombre = tk.Label(frame, anchor="w", font=("Segoe UI", 12, "bold"))
+        nombre.pack(fill="x", padx=15, pady=(15, 0))
+        codigo = tk.Label(frame, anchor="w", font=("Segoe UI", 9))
+        codigo.pack(fill="x", padx=15, pady=(0, 10))
+        return {'frame': frame, 'nombre': nombre, 'codigo': codigo}
+
+    def llenar(tarjeta, elemento):
+        tarjeta['nombre'].configure(text=elemento[1])
+        tarjeta['codigo'].configure(text=elemento[0])
+
+    def cronometrar(funcion):
+        inicio = time.perf_counter()
+        funcion()
+        root.update()
+        return 1000 * (time.perf_counter() - inicio)
+
+    # Lista completa: una tarjeta por elemento dentro de un Frame desplazable
+    canvas = tk.Canvas(root, highlightthickness=0)
+    canvas.pack(fill="both", expand=True)
+    interior = tk.Frame(canvas)
+    canvas.create_window((0, 0), window=interior, anchor="nw")
+
+    def completa():
+        for widget in interior.winfo_children():
+            widget.destroy()
+        for elemento in elementos:
+            tarjeta = crear(interior)
+            llenar(tarjeta, elemento)
+            tarjeta['frame'].pack(fill="x", pady=(0, 15))
+
+    tiempo_completa = cronometrar(completa)
+    canvas.destroy()
+
+    canvas = tk.Canvas(root, highlightthickness=0)
+    scrollbar = tk.Scrollbar(root, command=canvas.yview)
+    scrollbar.pack(side="right", fill="y")
+    canvas.pack(fill="both", expand=True)
+    root.update()
+    lista = ListaVirtual(canvas, scrollbar, crear, llenar, clave_altura=lambda elemento: 0)
+    tiempo_virtual = cronometrar(lambda: lista.mostrar(elementos))
+    desplazamientos = [cronometrar(lambda: canvas.yview_scroll(10, "units")) for _ in range(50)]
+    root.destroy()
+
+    print(f"Lista de {args.benchmark} materias")
+    print(f"  completa:   {tiempo_completa:9.1f} ms")
+    print(f"  virtual:    {tiempo_virtual:9.1f} ms ({lista.contador['creadas']} tarjetas creadas)")
+    print(f"  desplazar:  {sum(desplazamientos) / len(desplazamientos):9.2f} ms por paso "
+          f"({lista.contador['recicladas']} tarjetas recicladas)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,6 +18,7 @@ sys.path.append(proyecto_raiz)
 
 # Ahora podemos importar db_manager
 from database import db_manager
+from logica.catalogo import cargar_catalogo_rapido
 
 # Constantes para la aplicación
 DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
@@ -41,6 +42,7 @@ class AplicacionAvanzadaHorarios:
         self.checkbox_vars_electivas = {}    # {codigo_materia: BooleanVar()} para electivas
         self.materias_cursadas = {}  # {codigo_materia: BooleanVar()}
         self.materias_info = {}      # {codigo_materia: (nombre_materia, creditos, tipo_materia)}
+        self.catalogo = None         # Catálogo compacto con los grupos y sesiones de cada materia
         self.preferencia_turno_var = StringVar(value="cualquiera")
         self.current_tab = None      # Para rastrear la pestaña actual
         self.horario_generado = None # Para almacenar el último horario generado
@@ -106,15 +108,17 @@ class AplicacionAvanzadaHorarios:
     def _conectar_a_base_de_datos(self):
         """Establece la conexión con la base de datos SQLite."""
         try:
-            self.conexion_db = db_manager.crear_conexion()
+            self.conexion_db = db_manager.crear_conexion_migrada()
 
             if self.conexion_db is None:
                 messagebox.showerror(
                     "Error de Base de Datos",
                     "No se pudo conectar a la base de datos 'horarios.db'.\n"
                     "Por favor, asegúrate de que 'database/horarios.db' exista y "
-                    "que el script 'database/db_manager.py' se haya ejecutado para crearla y poblarla."
+                    "que el script 'database/db_manager.py' se haya ejecutado para crearla y poblarla.\n"
+                    f"Si guarda docente y salón como texto, {db_manager.AVISO_MIGRACION}"
                 )
+                return
 
             # Verificar si existe la tabla de historial; crearla si no existe
             self._crear_tabla_historial()
@@ -832,7 +836,10 @@ class AplicacionAvanzadaHorarios:
         # Obtener información detallada de las materias seleccionadas de la DB
         # Esto es importante para tener los horarios, docentes, etc.
         try:
-            materias_con_detalles = db_manager.obtener_detalles_materias_por_codigos(self.conexion_db, materias_a_considerar)
+            if self.catalogo is None:
+                self.catalogo = cargar_catalogo_rapido(conn=self.conexion_db)
+            materias_con_detalles = [self.catalogo.materia(codigo) for codigo in materias_a_considerar
+                                     if self.catalogo.materia(codigo) is not None]
             if not materias_con_detalles:
                 messagebox.showerror("Error", "No se encontraron detalles para las materias seleccionadas. La base de datos podría estar vacía o dañada.")
                 self.horario_generado = None
@@ -877,22 +884,9 @@ class AplicacionAvanzadaHorarios:
         """
         Simula la generación de un horario.
         Esta es una versión simplificada y DEBE ser reemplazada por tu algoritmo real.
-        Recibe una lista de diccionarios, donde cada diccionario contiene la información de una materia
-        y sus secciones/horarios.
-
-        Ejemplo de `materias_con_detalles`:
-        [
-            {'codigo_materia': 'INF201', 'nombre_materia': 'Programación I', 'creditos': 4,
-             'secciones': [
-                {'seccion_id': 1, 'dia': 'Lunes', 'hora_inicio': '08:00', 'hora_fin': '10:00', 'docente': 'Dr. Pérez'},
-                {'seccion_id': 2, 'dia': 'Miércoles', 'hora_inicio': '08:00', 'hora_fin': '10:00', 'docente': 'Dr. Pérez'}
-             ]},
-            {'codigo_materia': 'MAT101', 'nombre_materia': 'Cálculo I', 'creditos': 5,
-             'secciones': [
-                {'seccion_id': 3, 'dia': 'Lunes', 'hora_inicio': '10:00', 'hora_fin': '12:00', 'docente': 'Ing. García'},
-                {'seccion_id': 4, 'dia': 'Jueves', 'hora_inicio': '09:00', 'hora_fin': '11:00', 'docente': 'Ing. García'}
-             ]}
-        ]
+        Recibe una lista de objetos `Materia` del catálogo compacto (`logica.catalogo`);
+        de cada materia se elige un grupo y se agregan todas sus sesiones.
+        Devuelve una lista de horarios, cada uno una lista de objetos `Sesion`.
         """
         horarios_generados = []
         
@@ -907,47 +901,44 @@ class AplicacionAvanzadaHorarios:
                 return True # En esta simulación, solo buscamos el primer horario válido.
 
             materia = materias_con_detalles[index]
-            materia_codigo = materia['codigo_materia']
+            materia_codigo = materia.codigo
 
-            for seccion in materia['secciones']:
+            for grupo in materia.grupos:
+                if not grupo.sesiones:
+                    continue
                 # Verificar conflictos con el horario actual
                 is_conflict = False
-                for existing_class in current_schedule:
-                    # Convierte horas a un formato comparable (e.g., minutos desde medianoche)
-                    start1_min = self._time_to_minutes(seccion['hora_inicio'])
-                    end1_min = self._time_to_minutes(seccion['hora_fin'])
-                    start2_min = self._time_to_minutes(existing_class['hora_inicio'])
-                    end2_min = self._time_to_minutes(existing_class['hora_fin'])
-
-                    if seccion['dia'] == existing_class['dia'] and \
-                       max(start1_min, start2_min) < min(end1_min, end2_min):
-                        is_conflict = True
-                        break
+                for seccion in grupo.sesiones:
+                    for existing_class in current_schedule:
+                        # Convierte horas a un formato comparable (e.g., minutos desde medianoche)
+                        start1_min = self._time_to_minutes(seccion.hora_inicio)
+                        end1_min = self._time_to_minutes(seccion.hora_fin)
+                        start2_min = self._time_to_minutes(existing_class.hora_inicio)
+                        end2_min = self._time_to_minutes(existing_class.hora_fin)
+
+                        if seccion.dia == existing_class.dia and \
+                           max(start1_min, start2_min) < min(end1_min, end2_min):
+                            is_conflict = True
+                            break
                 
-                # Verificar preferencias de turno
-                if preferencia_turno != "cualquiera":
-                    start_hour = int(seccion['hora_inicio'].split(':')[0])
-                    if preferencia_turno == "mañana" and start_hour >= 13: # Asumimos mañana hasta 12:59
-                        is_conflict = True
-                    elif preferencia_turno == "tarde" and start_hour < 13: # Asumimos tarde desde 13:00
-                        is_conflict = True
+                    # Verificar preferencias de turno
+                    if preferencia_turno != "cualquiera":
+                        start_hour = int(seccion.hora_inicio.split(':')[0])
+                        if preferencia_turno == "mañana" and start_hour >= 13: # Asumimos mañana hasta 12:59
+                            is_conflict = True
+                        elif preferencia_turno == "tarde" and start_hour < 13: # Asumimos tarde desde 13:00
+                            is_conflict = True
+                    if is_conflict:
+                        break
 
                 if not is_conflict:
-                    current_schedule.append({
-                        'codigo_materia': materia_codigo,
-                        'nombre_materia': materia['nombre_materia'],
-                        'creditos': materia['creditos'],
-                        'dia': seccion['dia'],
-                        'hora_inicio': seccion['hora_inicio'],
-                        'hora_fin': seccion['hora_fin'],
-                        'docente': seccion['docente']
-                    })
-                    selected_sections[materia_codigo] = seccion['seccion_id'] # Guarda la sección elegida
+                    current_schedule.extend(grupo.sesiones)
+                    selected_sections[materia_codigo] = grupo.id # Guarda el grupo elegido
                     
                     if find_schedule_combinations(index + 1, current_schedule, selected_sections):
                         return True # Found one schedule
                     
-                    current_schedule.pop() # Backtrack
+                    del current_schedule[-len(grupo.sesiones):] # Backtrack
                     del selected_sections[materia_codigo]
 
             return False
@@ -981,7 +972,7 @@ class AplicacionAvanzadaHorarios:
     def _mostrar_horario_en_calendario(self, horario):
         """
         Muestra el horario generado en la pestaña de calendario.
-        `horario` es una lista de diccionarios, cada uno representando una clase.
+        `horario` es una lista de objetos `Sesion`, cada uno representando una clase.
         """
         self._limpiar_calendario() # Limpiar el contenido anterior
 
@@ -1022,20 +1013,20 @@ class AplicacionAvanzadaHorarios:
 
         # Asignar colores a las materias si aún no lo están
         for clase in horario:
-            codigo_materia = clase['codigo_materia']
+            codigo_materia = clase.grupo.materia.codigo
             if codigo_materia not in self.color_mapping:
                 # Asigna un color de la lista, ciclando si se acaban
                 self.color_mapping[codigo_materia] = COLORES_MATERIAS[len(self.color_mapping) % len(COLORES_MATERIAS)]
 
         # Rellenar el calendario con las clases del horario generado
         for clase in horario:
-            dia = clase['dia']
-            hora_inicio_clase = clase['hora_inicio']
-            hora_fin_clase = clase['hora_fin']
-            nombre_materia = clase['nombre_materia']
-            codigo_materia = clase['codigo_materia']
-            docente = clase['docente']
-            creditos = clase['creditos']
+            dia = clase.dia
+            hora_inicio_clase = clase.hora_inicio
+            hora_fin_clase = clase.hora_fin
+            nombre_materia = clase.grupo.materia.nombre
+            codigo_materia = clase.grupo.materia.codigo
+            docente = clase.docente
+            creditos = clase.grupo.materia.creditos
 
             # Calcular las horas que ocupa la clase
             inicio_idx = HORAS_CLASE.index(hora_inicio_clase)
@@ -0,0 +1,269 @@
+# PROYECTO_RAIZ/logica/analitica.py
+#
+# Analítica de uso de salones y docentes:
+#
+#     python -m logica.analitica                       # resumen en texto
+#     python -m logica.analitica -o reporte.json       # todo en un JSON
+#     python -m logica.analitica -o carpeta_reporte/   # un CSV por tabla
+#
+# Las sesiones se cargan en arreglos de NumPy (salon_id, docente_id, dia,
+# bloque) y los mapas de ocupación, horas pico y salones ociosos se calculan
+# con agregaciones vectorizadas, sin recorrer sesión por sesión. Requiere NumPy.
+
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+
+import numpy as np
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+from logica.auditoria import sesiones_desde_catalogo, VALORES_SIN_ASIGNAR
+
+HORA_DESDE = "07:00"
+HORA_HASTA = "21:00"
+UMBRAL_OCIOSO = 0.25  # Un salón ocupado menos de este porcentaje de la jornada es ocioso
+NUM_HORAS_PICO = 10
+
+B = logica.BLOQUES_POR_DIA
+D = len(logica.DIAS_SEMANA)
+_NOMBRES_RECURSO = {'salon': 'salones', 'docente': 'docentes'}
+
+
+def _bloque(hora):
+    return (logica.hora_a_minutos(hora) - logica.HORA_INICIO_JORNADA * 60) // logica.MINUTOS_POR_BLOQUE
+
+
+def _ventana(desde, hasta):
+    """Bloques [desde, hasta) recortados a la jornada (06:00-22:00); vacía si `hasta` no pasa de `desde`."""
+    primero = min(max(_bloque(desde), 0), B)
+    return slice(primero, min(max(_bloque(hasta), primero), B))
+
+
+def _hora(bloque):
+    minutos = logica.HORA_INICIO_JORNADA * 60 + int(bloque) * logica.MINUTOS_POR_BLOQUE
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def _indexar(valores):
+    """Ids enteros para nombres (sin tildes ni mayúsculas); -1 para los vacíos. Devuelve (nombres, ids)."""
+    nombres = {}
+    ids = np.empty(len(valores), dtype=np.int32)
+    for i, valor in enumerate(valores):
+        clave = logica.normalizar_texto(valor or '')
+        if clave in VALORES_SIN_ASIGNAR:
+            ids[i] = -1
+        else:
+            ids[i] = nombres.setdefault(clave, (len(nombres), valor.strip()))[0]
+    return [nombre for _, nombre in sorted(nombres.values())], ids
+
+
+def cargar_arreglos(sesiones):
+    """
+    Arreglos columnares de las sesiones: 'salon' y 'docente' (ids, -1 si no
+    tiene), 'dia', 'inicio' y 'fin' (bloques de 30 minutos, fin exclusivo),
+    más las listas de nombres 'salones' y 'docentes'.
+    """
+    sesiones = [s for s in sesiones if s['dia'] < D]
+    salones, id_salon = _indexar([s['salon'] for s in sesiones])
+    docentes, id_docente = _indexar([s['docente'] for s in sesiones])
+    base = logica.HORA_INICIO_JORNADA * 60
+    inicio = (np.array([s['inicio'] for s in sesiones], dtype=np.int32) - base) // logica.MINUTOS_POR_BLOQUE
+    fin = -(-(np.array([s['fin'] for s in sesiones], dtype=np.int32) - base) // logica.MINUTOS_POR_BLOQUE)
+    return {
+        'salones': salones,
+        'docentes': docentes,
+        'salon': id_salon,
+        'docente': id_docente,
+        'dia': np.array([s['dia'] for s in sesiones], dtype=np.int32),
+        'inicio': np.clip(inicio, 0, B),
+        'fin': np.clip(fin, 0, B)
+    }
+
+
+def _expandir(arreglos):
+    """Una fila por (sesión, bloque ocupado): devuelve (índice de sesión, bloque)."""
+    duracion = np.maximum(arreglos['fin'] - arreglos['inicio'], 0)
+    sesion = np.repeat(np.arange(len(duracion)), duracion)
+    desplazamiento = np.arange(len(sesion)) - np.repeat(np.cumsum(duracion) - duracion, duracion)
+    return sesion, arreglos['inicio'][sesion] + desplazamiento
+
+
+def mapa_ocupacion(arreglos, recurso=None):
+    """
+    Sesiones en curso por (dia, bloque); con `recurso` ('salon' o 'docente'),
+    por (recurso, dia, bloque). Se cuenta con un único bincount.
+    """
+    sesion, bloque = _expandir(arreglos)
+    celda = arreglos['dia'][sesion] * B + bloque
+    if recurso is None:
+        return np.bincount(celda, minlength=D * B).reshape(D, B)
+    ids = arreglos[recurso][sesion]
+    validos = ids >= 0
+    total = len(arreglos[_NOMBRES_RECURSO[recurso]])
+    return np.bincount(ids[validos] * (D * B) + celda[validos], minlength=total * D * B).reshape(total, D, B)
+
+
+def calcular_analitica(arreglos, desde=HORA_DESDE, hasta=HORA_HASTA, dias=5,
+                       umbral_ocioso=UMBRAL_OCIOSO, num_horas_pico=NUM_HORAS_PICO):
+    """
+    Calcula los indicadores sobre la ventana [desde, hasta) de los primeros
+    `dias` días, recortada a la jornada: mapas de calor, uso por salón, carga
+    por docente, horas pico y salones ociosos. Devuelve un diccionario listo
+    para exportar.
+    """
+    ventana = _ventana(desde, hasta)
+    bloques_ventana = (ventana.stop - ventana.start) * dias
+    horas_bloque = logica.MINUTOS_POR_BLOQUE / 60
+
+    global_ = mapa_ocupacion(arreglos)[:dias, ventana]
+    por_salon = mapa_ocupacion(arreglos, 'salon')[:, :dias, ventana]
+    por_docente = mapa_ocupacion(arreglos, 'docente')[:, :dias, ventana]
+
+    ocupado_salon = por_salon > 0
+    uso_salon = ocupado_salon.sum(axis=(1, 2)) / max(bloques_ventana, 1)
+    uso_salon_dia = ocupado_salon.sum(axis=2) / max(bloques_ventana // max(dias, 1), 1)
+    salones_ocupados = ocupado_salon.sum(axis=0)  # (dias, bloques)
+    salones_libres = len(arreglos['salones']) - salones_ocupados
+
+    horas_docente = (por_docente > 0).sum(axis=2) * horas_bloque  # (docentes, dias)
+    choques_salon = np.maximum(por_salon - 1, 0).sum(axis=(1, 2))
+
+    plano = global_.ravel()
+    pico = np.argsort(-plano, kind='stable')[:num_horas_pico]
+    primer_bloque = ventana.start
+    horas = [_hora(b) for b in range(primer_bloque, ventana.stop)]
+    dias_nombres = logica.DIAS_SEMANA[:dias]
+
+    return {
+        'dias': dias_nombres,
+        'horas': horas,
+        'mapa_global': global_.tolist(),
+        'mapa_salones': {
+            salon: por_salon[r].tolist() for r, salon in enumerate(arreglos['salones'])
+        },
+        'uso_salones': sorted((
+            {
+                'salon': salon,
+                'uso': round(float(uso_salon[r]), 4),
+                'horas_ocupadas': float(ocupado_salon[r].sum() * horas_bloque),
+                'uso_por_dia': dict(zip(dias_nombres, np.round(uso_salon_dia[r], 4).tolist())),
+                'bloques_en_choque': int(choques_salon[r])
+            }
+            for r, salon in enumerate(arreglos['salones'])
+        ), key=lambda fila: -fila['uso']),
+        'carga_docentes': sorted((
+            {
+                'docente': docente,
+                'horas_semana': float(horas_docente[t].sum()),
+                'horas_por_dia': dict(zip(dias_nombres, horas_docente[t].tolist()))
+            }
+            for t, docente in enumerate(arreglos['docentes'])
+        ), key=lambda fila: -fila['horas_semana']),
+        'horas_pico': [
+            {
+                'dia': dias_nombres[i // global_.shape[1]],
+                'hora': horas[i % global_.shape[1]],
+                'sesiones': int(plano[i]),
+                'salones_libres': int(salones_libres.ravel()[i])
+            }
+            for i in pico if plano[i] > 0
+        ],
+        'salones_ociosos': [
+            {'salon': arreglos['salones'][r], 'uso': round(float(uso_salon[r]), 4)}
+            for r in np.flatnonzero(uso_salon < umbral_ocioso)
+        ],
+        'salones_libres': salones_libres.tolist()
+    }
+
+
+def exportar_analitica(analitica, ruta):
+    """Exporta a un JSON (si `ruta` termina en .json) o a una carpeta con un CSV por tabla."""
+    if ruta.lower().endswith(".json"):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(analitica, archivo, ensure_ascii=False, indent=2)
+        return
+    os.makedirs(ruta, exist_ok=True)
+
+    def escribir(nombre, encabezado, filas):
+        with open(os.path.join(ruta, nombre), "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(encabezado)
+            escritor.writerows(filas)
+
+    dias, horas = analitica['dias'], analitica['horas']
+    escribir("mapa_global.csv", ["hora"] + dias,
+             ([hora] + [analitica['mapa_global'][d][b] for d in range(len(dias))] for b, hora in enumerate(horas)))
+    escribir("mapa_salones.csv", ["salon", "dia", "hora", "sesiones"],
+             ((salon, dias[d], horas[b], mapa[d][b])
+              for salon, mapa in analitica['mapa_salones'].items()
+              for d in range(len(dias)) for b in range(len(horas)) if mapa[d][b]))
+    escribir("uso_salones.csv", ["salon", "uso", "horas_ocupadas", "bloques_en_choque"] + dias,
+             ([f['salon'], f['uso'], f['horas_ocupadas'], f['bloques_en_choque']] + [f['uso_por_dia'][d] for d in dias]
+              for f in analitica['uso_salones']))
+    escribir("carga_docentes.csv", ["docente", "horas_semana"] + dias,
+             ([f['docente'], f['horas_semana']] + [f['horas_por_dia'][d] for d in dias]
+              for f in analitica['carga_docentes']))
+    escribir("horas_pico.csv", ["dia", "hora", "sesiones", "salones_libres"],
+             ((f['dia'], f['hora'], f['sesiones'], f['salones_libres']) for f in analitica['horas_pico']))
+    escribir("salones_ociosos.csv", ["salon", "uso"],
+             ((f['salon'], f['uso']) for f in analitica['salones_ociosos']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mapas de ocupación, horas pico y salones ociosos.")
+    parser.add_argument("-o", "--salida", help="Archivo .json o carpeta para los CSV (por defecto, resumen en texto)")
+    parser.add_argument("--desde", default=HORA_DESDE)
+    parser.add_argument("--hasta", default=HORA_HASTA)
+    parser.add_argument("--incluir-sabado", action="store_true")
+    parser.add_argument("--umbral-ocioso", type=float, default=UMBRAL_OCIOSO)
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+    try:
+        ventana = _ventana(args.desde, args.hasta)
+    except ValueError:
+        parser.error("--desde y --hasta deben tener el formato HH:MM")
+    if ventana.stop <= ventana.start:
+        parser.error(f"la ventana {args.desde}-{args.hasta} no tiene horas dentro de la jornada "
+                     f"({_hora(0)}-{_hora(B)})")
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        inicio = time.perf_counter()
+        sesiones = sesiones_desde_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+    finally:
+        conn.close()
+    arreglos = cargar_arreglos(sesiones)
+    analitica = calcular_analitica(arreglos, args.desde, args.hasta, 6 if args.incluir_sabado else 5,
+                                   args.umbral_ocioso)
+    duracion = time.perf_counter() - inicio
+
+    if args.salida:
+        exportar_analitica(analitica, args.salida)
+    else:
+        print("Horas pico:")
+        for fila in analitica['horas_pico']:
+            print(f"  {fila['dia']:<10} {fila['hora']}  {fila['sesiones']:>4} sesiones, {fila['salones_libres']} salones libres")
+        print("Uso de salones:")
+        for fila in analitica['uso_salones']:
+            print(f"  {fila['salon']:<40} {fila['uso']:>7.1%}  ({fila['horas_ocupadas']:.1f} h)")
+        if analitica['salones_ociosos']:
+            print("Salones ociosos: " + ", ".join(f['salon'] for f in analitica['salones_ociosos']))
+    print(f"{len(sesiones)} sesiones analizadas en {duracion * 1000:.0f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,431 @@
+# PROYECTO_RAIZ/logica/asignacion_cupos.py
+#
+# Asignación de cupos para una cohorte completa:
+#
+#     python -m logica.asignacion_cupos solicitudes.jsonl -o asignacion.jsonl
+#
+# Cada solicitud usa el formato de logica.batch y puede traer además
+# "grupos_preferidos": {codigo: [id_grupo o nombre_grupo, ...]} en orden de
+# preferencia; si una materia no trae ranking, todos sus grupos valen igual.
+# Las solicitudes mal formadas y las repetidas de un mismo estudiante salen
+# en la asignación como {"estudiante": ..., "estado": "error", "error": motivo}.
+
+import sys
+import os
+import json
+import time
+import argparse
+import heapq
+from collections import deque
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+from logica.batch import leer_solicitudes, leer_bloqueo
+
+INFINITO = float("inf")
+
+
+class RedFlujo:
+    """Red de flujo de costo mínimo resuelta con caminos más cortos sucesivos."""
+
+    def __init__(self, num_nodos):
+        self.num_nodos = num_nodos
+        self.adyacencia = [[] for _ in range(num_nodos)]
+        self.destino = []
+        self.capacidad = []
+        self.costo = []
+
+    def agregar_arista(self, origen, destino, capacidad, costo):
+        """Agrega la arista y su reversa residual; devuelve el índice de la arista."""
+        indice = len(self.destino)
+        self.destino += [destino, origen]
+        self.capacidad += [capacidad, 0]
+        self.costo += [costo, -costo]
+        self.adyacencia[origen].append(indice)
+        self.adyacencia[destino].append(indice + 1)
+        return indice
+
+    def flujo(self, indice):
+        """Flujo que circula por la arista `indice`."""
+        return self.capacidad[indice ^ 1]
+
+    def _admisible(self, indice, u, potencial):
+        """Arista residual con costo reducido cero (pertenece a algún camino mínimo)."""
+        return (self.capacidad[indice] > 0
+                and self.costo[indice] + potencial[u] - potencial[self.destino[indice]] == 0)
+
+    def _flujo_bloqueante(self, fuente, sumidero, potencial):
+        """Flujo máximo (Dinic) restringido a las aristas admisibles."""
+        total = 0
+        while True:
+            nivel = [-1] * self.num_nodos
+            nivel[fuente] = 0
+            cola = deque([fuente])
+            while cola:
+                u = cola.popleft()
+                for indice in self.adyacencia[u]:
+                    v = self.destino[indice]
+                    if nivel[v] < 0 and self._admisible(indice, u, potencial):
+                        nivel[v] = nivel[u] + 1
+                        cola.append(v)
+            if nivel[sumidero] < 0:
+                return total
+
+            siguiente = [0] * self.num_nodos
+
+            def empujar(u, limite):
+                if u == sumidero:
+                    return limite
+                aristas = self.adyacencia[u]
+                while siguiente[u] < len(aristas):
+                    indice = aristas[siguiente[u]]
+                    v = self.destino[indice]
+                    if nivel[v] == nivel[u] + 1 and self._admisible(indice, u, potencial):
+                        empujado = empujar(v, min(limite, self.capacidad[indice]))
+                        if empujado:
+                            self.capacidad[indice] -= empujado
+                            self.capacidad[indice ^ 1] += empujado
+                            return empujado
+                    siguiente[u] += 1
+                return 0
+
+            while True:
+                empujado = empujar(fuente, INFINITO)
+                if not empujado:
+                    break
+                total += empujado
+
+    def resolver(self, fuente, sumidero):
+        """
+        Flujo máximo de costo mínimo; devuelve (flujo, costo).
+
+        Algoritmo primal-dual: Dijkstra con potenciales (los costos iniciales no
+        son negativos) calcula las distancias y, en cada fase, se satura a la
+        vez todo el subgrafo de caminos mínimos. El número de fases queda
+        acotado por los distintos costos de camino, no por el tamaño de la cohorte.
+        """
+        flujo_total = costo_total = 0
+        potencial = [0] * self.num_nodos
+        while True:
+            distancia = [INFINITO] * self.num_nodos
+            distancia[fuente] = 0
+            monticulo = [(0, fuente)]
+            while monticulo:
+                d, u = heapq.heappop(monticulo)
+                if d > distancia[u]:
+                    continue
+                for indice in self.adyacencia[u]:
+                    if self.capacidad[indice] > 0:
+                        v = self.destino[indice]
+                        nueva = d + self.costo[indice] + potencial[u] - potencial[v]
+                        if nueva < distancia[v]:
+                            distancia[v] = nueva
+                            heapq.heappush(monticulo, (nueva, v))
+            if distancia[sumidero] == INFINITO:
+                return flujo_total, costo_total
+            # Los nodos inalcanzables se suben hasta la distancia del sumidero
+            for v in range(self.num_nodos):
+                potencial[v] += min(distancia[v], distancia[sumidero])
+
+            aumento = self._flujo_bloqueante(fuente, sumidero, potencial)
+            flujo_total += aumento
+            costo_total += aumento * (potencial[sumidero] - potencial[fuente])
+
+
+def _grupos_candidatos(materia, ranking, bloqueada):
+    """Lista [(grupo, costo)] de los grupos aceptables, con costo = posición en el ranking."""
+    if ranking:
+        por_referencia = {}
+        for grupo in materia['grupos']:
+            por_referencia.setdefault(grupo['id'], grupo)
+            por_referencia.setdefault(str(grupo['id']), grupo)
+            por_referencia.setdefault(grupo['nombre'], grupo)
+        ordenados = []
+        for referencia in ranking:
+            grupo = por_referencia.get(referencia)
+            if grupo is not None and grupo not in ordenados:
+                ordenados.append(grupo)
+        candidatos = [(grupo, posicion) for posicion, grupo in enumerate(ordenados)]
+    else:
+        candidatos = [(grupo, 0) for grupo in materia['grupos']]
+    return [(grupo, costo) for grupo, costo in candidatos if not grupo['mascara'] & bloqueada]
+
+
+def _podar_por_consistencia(candidatos_estudiante):
+    """
+    Descarta los grupos que chocan con todos los candidatos de otra materia del
+    mismo estudiante; se repite hasta que no haya cambios.
+    """
+    cambio = True
+    while cambio:
+        cambio = False
+        mascaras = {codigo: {g['mascara'] for g, _ in candidatos}
+                    for codigo, candidatos in candidatos_estudiante.items()}
+        for codigo, candidatos in candidatos_estudiante.items():
+            conservados = [
+                (grupo, costo) for grupo, costo in candidatos
+                if all(any(not grupo['mascara'] & otra for otra in otras)
+                       for otro_codigo, otras in mascaras.items() if otro_codigo != codigo)
+            ]
+            if len(conservados) != len(candidatos):
+                candidatos_estudiante[codigo] = conservados
+                mascaras[codigo] = {g['mascara'] for g, _ in conservados}
+                cambio = True
+
+
+class AsignadorCohorte:
+    """
+    Reparte los estudiantes de una cohorte entre los grupos respetando `cupos`,
+    los cruces de horario de cada estudiante y su ranking de grupos.
+
+    Las materias se procesan de la más a la menos disputada. Para cada una se
+    resuelve un problema de transporte de costo mínimo en el que los
+    estudiantes con los mismos grupos admisibles y el mismo ranking se agregan
+    en una sola clase, así que la red tiene pocos nodos aunque la cohorte tenga
+    miles de estudiantes; como los grupos ya asignados se descuentan de los
+    admisibles, el resultado no tiene cruces. Al final, cada solicitud sin
+    grupo intenta un cupo libre o un intercambio con otro estudiante que
+    pueda moverse de grupo.
+    """
+
+    def __init__(self, catalogo):
+        self.catalogo = catalogo
+        self.libres = {}
+        for materia in catalogo.values():
+            for grupo in materia['grupos']:
+                self.libres[grupo['id']] = grupo['cupos']
+        self.miembros = {id_grupo: {} for id_grupo in self.libres}
+        self.ocupado = {}
+        self.asignaciones = {}
+        self.candidatos = {}
+        self.sin_asignar = []
+        self.rechazadas = []
+        self.costo_total = 0
+
+    def _hay_cupo(self, id_grupo):
+        return self.libres[id_grupo] is None or self.libres[id_grupo] > 0
+
+    def _asignar(self, estudiante, codigo, grupo, costo):
+        self.asignaciones[estudiante][codigo] = (grupo, costo)
+        self.ocupado[estudiante] |= grupo['mascara']
+        self.miembros[grupo['id']][estudiante] = None
+        if self.libres[grupo['id']] is not None:
+            self.libres[grupo['id']] -= 1
+        self.costo_total += costo
+
+    def _liberar(self, estudiante, codigo):
+        grupo, costo = self.asignaciones[estudiante].pop(codigo)
+        self.ocupado[estudiante] &= ~grupo['mascara']
+        del self.miembros[grupo['id']][estudiante]
+        if self.libres[grupo['id']] is not None:
+            self.libres[grupo['id']] += 1
+        self.costo_total -= costo
+
+    def cargar(self, solicitudes):
+        """
+        Registra las solicitudes y calcula los grupos admisibles de cada una.
+        Las solicitudes mal formadas y las de un estudiante repetido (vale la
+        primera) quedan en `rechazadas` como (estudiante, motivo), sin afectar
+        a las demás.
+        """
+        vistos = set()
+        for solicitud in solicitudes:
+            estudiante = solicitud.get('estudiante')
+            try:
+                if estudiante in vistos:
+                    raise ValueError("estudiante repetido; se conserva su primera solicitud")
+                vistos.add(estudiante)
+                bloqueada, propios, desconocidas = self._preparar_solicitud(solicitud)
+            except (ValueError, TypeError) as e:
+                self.rechazadas.append((estudiante, str(e)))
+                continue
+            except Exception as e:
+                # Una solicitud con una forma imprevista no debe detener la asignación de la cohorte
+                self.rechazadas.append((estudiante, f"{type(e).__name__}: {e}"))
+                continue
+            self.ocupado[estudiante] = bloqueada
+            self.asignaciones[estudiante] = {}
+            self.sin_asignar += [(estudiante, codigo, "materia desconocida") for codigo in desconocidas]
+            for codigo, candidatos in propios.items():
+                self.candidatos[(estudiante, codigo)] = candidatos
+
+    def _preparar_solicitud(self, solicitud):
+        """(máscara de bloqueos, {codigo: candidatos}, códigos desconocidos); ValueError si está mal formada."""
+        if 'error' in solicitud:
+            raise ValueError(solicitud['error'])
+        codigos = solicitud.get('codigos') or []
+        if not isinstance(codigos, list):
+            raise ValueError("'codigos' debe ser una lista de códigos")
+        rankings = solicitud.get('grupos_preferidos') or {}
+        if not isinstance(rankings, dict) or not all(
+                isinstance(ranking, list) and all(isinstance(r, (str, int)) for r in ranking)
+                for ranking in rankings.values()):
+            raise ValueError("'grupos_preferidos' debe ser {codigo: [id_grupo o nombre_grupo, ...]}")
+        bloqueada = logica.mascara_bloqueos(leer_bloqueo(b) for b in solicitud.get('bloqueos') or [])
+        propios = {}
+        desconocidas = []
+        for codigo in dict.fromkeys(codigos):
+            materia = self.catalogo.get(codigo)
+            if materia is None:
+                desconocidas.append(codigo)
+                continue
+            propios[codigo] = _grupos_candidatos(materia, rankings.get(codigo), bloqueada)
+        _podar_por_consistencia(propios)
+        return bloqueada, propios, desconocidas
+
+    def _orden_materias(self):
+        """Materias ordenadas por presión: demanda sobre cupos totales."""
+        demanda = {}
+        for (_, codigo) in self.candidatos:
+            demanda[codigo] = demanda.get(codigo, 0) + 1
+
+        def presion(codigo):
+            cupos = [self.libres[g['id']] for g in self.catalogo[codigo]['grupos']]
+            if not cupos or any(c is None for c in cupos):
+                return 0 if cupos else INFINITO
+            return demanda[codigo] / max(1, sum(cupos))
+
+        return sorted(demanda, key=lambda codigo: (-presion(codigo), codigo))
+
+    def _asignar_materia(self, codigo, estudiantes):
+        """Resuelve el transporte de costo mínimo de una materia y aplica el resultado."""
+        clases = {}
+        for estudiante in estudiantes:
+            admisibles = tuple(
+                (grupo['id'], costo) for grupo, costo in self.candidatos[(estudiante, codigo)]
+                if not grupo['mascara'] & self.ocupado[estudiante]
+            )
+            clases.setdefault(admisibles, []).append(estudiante)
+
+        grupos = {grupo['id']: grupo for grupo in self.catalogo[codigo]['grupos']}
+        nodo_grupo = {id_grupo: 2 + len(clases) + i for i, id_grupo in enumerate(grupos)}
+        red = RedFlujo(2 + len(clases) + len(grupos))
+        fuente, sumidero = 0, 1
+        aristas = []
+        for i, (admisibles, miembros) in enumerate(clases.items()):
+            nodo_clase = 2 + i
+            red.agregar_arista(fuente, nodo_clase, len(miembros), 0)
+            for id_grupo, costo in admisibles:
+                aristas.append((i, id_grupo, costo, red.agregar_arista(nodo_clase, nodo_grupo[id_grupo], len(miembros), costo)))
+        for id_grupo, nodo in nodo_grupo.items():
+            libres = self.libres[id_grupo]
+            red.agregar_arista(nodo, sumidero, len(estudiantes) if libres is None else libres, 0)
+        red.resolver(fuente, sumidero)
+
+        miembros_por_clase = [deque(miembros) for miembros in clases.values()]
+        for i, id_grupo, costo, arista in aristas:
+            for _ in range(red.flujo(arista)):
+                self._asignar(miembros_por_clase[i].popleft(), codigo, grupos[id_grupo], costo)
+        return [estudiante for miembros in miembros_por_clase for estudiante in miembros]
+
+    def _reparar(self, estudiante, codigo):
+        """Busca un cupo libre o libera uno moviendo a otro estudiante del grupo."""
+        candidatos = [(g, c) for g, c in self.candidatos[(estudiante, codigo)]
+                      if not g['mascara'] & self.ocupado[estudiante]]
+        for grupo, costo in candidatos:
+            if self._hay_cupo(grupo['id']):
+                self._asignar(estudiante, codigo, grupo, costo)
+                return True
+        # El intercambio sólo es posible si la materia conserva algún cupo libre
+        if not any(self._hay_cupo(g['id']) for g in self.catalogo[codigo]['grupos']):
+            return False
+        for grupo, costo in candidatos:
+            for otro in list(self.miembros[grupo['id']]):
+                if self.asignaciones[otro].get(codigo, (None,))[0] is not grupo:
+                    continue
+                ocupado_otro = self.ocupado[otro] & ~grupo['mascara']
+                for alternativo, costo_alternativo in self.candidatos[(otro, codigo)]:
+                    if (alternativo is not grupo and self._hay_cupo(alternativo['id'])
+                            and not alternativo['mascara'] & ocupado_otro):
+                        self._liberar(otro, codigo)
+                        self._asignar(otro, codigo, alternativo, costo_alternativo)
+                        self._asignar(estudiante, codigo, grupo, costo)
+                        return True
+        return False
+
+    def resolver(self):
+        """Ejecuta la asignación completa y devuelve un resumen."""
+        pendientes = []
+        for codigo in self._orden_materias():
+            estudiantes = [e for (e, c) in self.candidatos if c == codigo]
+            pendientes += [(e, codigo) for e in self._asignar_materia(codigo, estudiantes)]
+
+        for estudiante, codigo in pendientes:
+            if not self._reparar(estudiante, codigo):
+                motivo = "sin grupos compatibles" if not self.candidatos[(estudiante, codigo)] else "sin cupo compatible"
+                self.sin_asignar.append((estudiante, codigo, motivo))
+
+        return {
+            'asignaciones': {
+                estudiante: {codigo: grupo['id'] for codigo, (grupo, _) in asignadas.items()}
+                for estudiante, asignadas in self.asignaciones.items()
+            },
+            'sin_asignar': self.sin_asignar,
+            'rechazadas': self.rechazadas,
+            'costo_total': self.costo_total,
+            'ocupacion': {id_grupo: len(miembros) for id_grupo, miembros in self.miembros.items() if miembros}
+        }
+
+
+def asignar_cohorte(catalogo, solicitudes):
+    """Atajo: asigna grupos a todas las `solicitudes` sobre el `catalogo` compilado."""
+    asignador = AsignadorCohorte(catalogo)
+    asignador.cargar(solicitudes)
+    return asignador.resolver()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asigna grupos a una cohorte respetando cupos y cruces.")
+    parser.add_argument("entrada", help="Archivo .csv o .jsonl con las solicitudes")
+    parser.add_argument("-o", "--salida", help="Archivo .jsonl con la asignación (por defecto, la salida estándar)")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        catalogo = logica.compilar_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+    finally:
+        conn.close()
+
+    inicio = time.perf_counter()
+    resultado = asignar_cohorte(catalogo, leer_solicitudes(args.entrada))
+    duracion = time.perf_counter() - inicio
+
+    sin_asignar = {}
+    for estudiante, codigo, motivo in resultado['sin_asignar']:
+        sin_asignar.setdefault(estudiante, []).append({'codigo': codigo, 'motivo': motivo})
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        for estudiante in dict.fromkeys(list(resultado['asignaciones']) + list(sin_asignar)):
+            registro = {
+                'estudiante': estudiante,
+                'grupos': resultado['asignaciones'].get(estudiante, {}),
+                'sin_asignar': sin_asignar.get(estudiante, [])
+            }
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        for estudiante, motivo in resultado['rechazadas']:
+            salida.write(json.dumps({'estudiante': estudiante, 'estado': 'error', 'error': motivo},
+                                    ensure_ascii=False) + "\n")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    asignadas = sum(len(g) for g in resultado['asignaciones'].values())
+    print(f"{len(resultado['asignaciones'])} estudiantes, {asignadas} materias asignadas, "
+          f"{len(resultado['sin_asignar'])} sin asignar, {len(resultado['rechazadas'])} solicitudes rechazadas, "
+          f"costo de preferencia {resultado['costo_total']} "
+          f"({duracion:.2f} s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
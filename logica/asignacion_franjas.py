@@ -0,0 +1,445 @@
+# PROYECTO_RAIZ/logica/asignacion_franjas.py
+#
+# Construcción del horario académico: asigna día, hora y salón a cada sesión
+# de cada grupo.
+#
+#     python -m logica.asignacion_franjas --config franjas.json --salones inventario.csv
+#     python -m logica.asignacion_franjas --config franjas.json --aplicar
+#
+# --aplicar se niega a guardar un horario que viole una restricción dura
+# (choques de salón o docente, docente no disponible, sesión sin salón) salvo
+# que se pase también --forzar. La ocupación se cuenta en bloques de 30
+# minutos, pero cada sesión se guarda con su duración real.
+#
+# El archivo de configuración (JSON, todo opcional) trae:
+#     "cohortes": {"Semestre 1": [codigo, ...], ...}   materias que una misma cohorte cursa a la vez
+#     "disponibilidad": {docente: ["Lunes 07:00-13:00", ...]}  si falta, el docente está siempre disponible
+#
+# Restricciones duras: un salón o un docente no pueden tener dos sesiones a la
+# vez, el salón debe tener capacidad para los cupos del grupo y el docente debe
+# estar disponible. Blandas: materias de la misma cohorte no deben cruzarse y
+# los docentes deben tener pocas horas muertas. Se resuelve con recocido
+# simulado con evaluación incremental del costo, en varios arranques
+# independientes repartidos entre procesos.
+
+import sys
+import os
+import json
+import math
+import time
+import random
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+from logica.auditoria import sesiones_desde_catalogo, VALORES_SIN_ASIGNAR
+from logica.asignacion_salones import leer_inventario, inventario_desde_db
+from logica.batch import leer_bloqueo
+
+PESO_DURO = 1000
+PESO_COHORTE = 50
+PESO_HUECO = 1
+ITERACIONES = 200_000
+HORA_DESDE = "07:00"
+HORA_HASTA = "21:00"
+PASO_BLOQUES = 2  # Las clases empiezan en punto
+# Claves de desglosar_costo que no pueden ser distintas de cero al aplicar
+RESTRICCIONES_DURAS = ('choques_salon', 'choques_docente', 'bloques_no_disponibles', 'sin_salon')
+
+B = logica.BLOQUES_POR_DIA
+
+
+def _bloque(hora):
+    return (logica.hora_a_minutos(hora) - logica.HORA_INICIO_JORNADA * 60) // logica.MINUTOS_POR_BLOQUE
+
+
+def _hora(bloque, minutos=0):
+    """Hora del inicio del bloque, más `minutos`."""
+    minutos += logica.HORA_INICIO_JORNADA * 60 + bloque * logica.MINUTOS_POR_BLOQUE
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def _pares(n):
+    return n * (n - 1) // 2
+
+
+def preparar_problema(sesiones, inventario, cohortes=None, disponibilidad=None, dias=5,
+                      desde=HORA_DESDE, hasta=HORA_HASTA, paso=PASO_BLOQUES):
+    """
+    Traduce las sesiones a un problema de índices compacto (y serializable para
+    enviarlo a los procesos trabajadores). `cohortes` es {nombre: [codigo, ...]};
+    `disponibilidad` es {docente: [franja, ...]} con franjas como en logica.batch.
+    Lanza ValueError si la ventana `desde`-`hasta` se sale de la jornada de
+    las máscaras o si alguna sesión es más larga que la ventana.
+    """
+    salones = sorted(inventario)
+    capacidad = [math.inf if inventario[s] is None else inventario[s] for s in salones]
+    indice_salon = {logica.normalizar_texto(s): i for i, s in enumerate(salones)}
+
+    docentes = {}
+    for sesion in sesiones:
+        clave = logica.normalizar_texto(sesion['docente'] or '')
+        if clave not in VALORES_SIN_ASIGNAR:
+            docentes.setdefault(clave, len(docentes))
+
+    disponible = [[logica.MASCARA_DIA] * dias for _ in docentes]
+    for docente, franjas in (disponibilidad or {}).items():
+        t = docentes.get(logica.normalizar_texto(docente))
+        if t is None:
+            continue
+        disponible[t] = [0] * dias
+        for franja in franjas:
+            dia, inicio, fin = leer_bloqueo(franja)
+            d = logica.indice_dia(dia)
+            if d < dias:
+                disponible[t][d] |= (logica.mascara_franja(dia, inicio, fin) >> (d * B)) & logica.MASCARA_DIA
+
+    cohortes_de_materia = defaultdict(list)
+    for k, codigos in enumerate((cohortes or {}).values()):
+        for codigo in codigos:
+            cohortes_de_materia[codigo].append(k)
+    materias = {}
+
+    primero, limite = _bloque(desde), _bloque(hasta)
+    if primero < 0 or limite > B:
+        raise ValueError(f"La ventana {desde}-{hasta} debe estar dentro de la jornada ({_hora(0)}-{_hora(B)})")
+    if limite <= primero:
+        raise ValueError(f"La ventana {desde}-{hasta} termina antes de empezar")
+    problema = {
+        'salones': salones,
+        'capacidad': capacidad,
+        'num_docentes': len(docentes),
+        'disponible': disponible,
+        'num_cohortes': len(cohortes or {}),
+        'dias': dias,
+        'sesiones': []
+    }
+    no_caben = []
+    for sesion in sesiones:
+        duracion = -(-(sesion['fin'] - sesion['inicio']) // logica.MINUTOS_POR_BLOQUE)
+        requerido = sesion['cupos'] or 0
+        inicios = list(range(primero, limite - duracion + 1, paso))
+        if not inicios:
+            no_caben.append(sesion['id_sesion'])
+            continue
+        posibles = [r for r in range(len(salones)) if capacidad[r] >= requerido]
+        bloque_actual = (sesion['inicio'] - logica.HORA_INICIO_JORNADA * 60) // logica.MINUTOS_POR_BLOQUE
+        problema['sesiones'].append({
+            'id_sesion': sesion['id_sesion'],
+            'duracion': duracion,
+            'minutos': sesion['fin'] - sesion['inicio'],
+            'docente': docentes.get(logica.normalizar_texto(sesion['docente'] or ''), -1),
+            'materia': materias.setdefault(sesion['codigo'], len(materias)),
+            'cohortes': cohortes_de_materia.get(sesion['codigo'], []),
+            'inicios': inicios,
+            'salones': posibles,
+            # Posición actual, si está dentro del dominio, para arrancar desde ella
+            'actual': (sesion['dia'], bloque_actual,
+                       indice_salon.get(logica.normalizar_texto(sesion['salon'] or ''), -1))
+        })
+    if no_caben:
+        raise ValueError(f"{len(no_caben)} sesiones no caben entre {desde} y {hasta} "
+                         f"(IDs {', '.join(map(str, no_caben[:10]))}{', ...' if len(no_caben) > 10 else ''})")
+    return problema
+
+
+class Recocido:
+    """Estado del horario con contadores por celda (recurso, día, bloque) para evaluar cada movimiento en O(duración)."""
+
+    def __init__(self, problema, semilla=None, desde_actual=True, asignacion=None):
+        self.p = problema
+        self.rng = random.Random(semilla)
+        dias = problema['dias']
+        self.sesiones = problema['sesiones']
+        self.ocup_salon = [0] * (len(problema['salones']) * dias * B)
+        self.ocup_docente = [0] * (problema['num_docentes'] * dias * B)
+        self.ocup_cohorte = [0] * (problema['num_cohortes'] * dias * B)
+        self.ocup_cohorte_materia = defaultdict(int)
+        self.costo = 0
+        self.dia = [0] * len(self.sesiones)
+        self.inicio = [0] * len(self.sesiones)
+        self.salon = [-1] * len(self.sesiones)
+
+        for i, s in enumerate(self.sesiones):
+            if asignacion is not None:
+                # Asignación dada tal cual, aunque no sea válida (para evaluarla)
+                dia, inicio, salon = asignacion[i]
+            else:
+                dia, inicio, salon = s['actual']
+                if not (desde_actual and dia < dias and inicio in s['inicios']):
+                    dia = self.rng.randrange(dias)
+                    inicio = self.rng.choice(s['inicios'])
+                if not (desde_actual and salon in s['salones']):
+                    salon = self.rng.choice(s['salones']) if s['salones'] else -1
+            self.costo += self._delta_poner(i, dia, inicio, salon, aplicar=True)
+
+    # --- Evaluación incremental ---
+    def _huecos(self, t, d):
+        base = (t * self.p['dias'] + d) * B
+        ocupados = [b for b in range(B) if self.ocup_docente[base + b]]
+        return (ocupados[-1] - ocupados[0] + 1 - len(ocupados)) if ocupados else 0
+
+    def _delta_poner(self, i, dia, inicio, salon, aplicar):
+        """Costo de poner (o con signo negativo, de quitar) la sesión i; si `aplicar`, actualiza los contadores."""
+        s = self.sesiones[i]
+        dias = self.p['dias']
+        delta = 0
+        t = s['docente']
+        huecos_antes = self._huecos(t, dia) if t >= 0 else 0
+        for b in range(inicio, inicio + s['duracion']):
+            if salon >= 0:
+                celda = (salon * dias + dia) * B + b
+                delta += PESO_DURO * self.ocup_salon[celda]
+                if aplicar:
+                    self.ocup_salon[celda] += 1
+            if t >= 0:
+                celda = (t * dias + dia) * B + b
+                delta += PESO_DURO * self.ocup_docente[celda]
+                if aplicar:
+                    self.ocup_docente[celda] += 1
+            for k in s['cohortes']:
+                celda = (k * dias + dia) * B + b
+                clave = (celda, s['materia'])
+                delta += PESO_COHORTE * (self.ocup_cohorte[celda] - self.ocup_cohorte_materia[clave])
+                if aplicar:
+                    self.ocup_cohorte[celda] += 1
+                    self.ocup_cohorte_materia[clave] += 1
+        if salon < 0:
+            delta += PESO_DURO * s['duracion']
+        if t >= 0:
+            mascara = ((1 << s['duracion']) - 1) << inicio
+            delta += PESO_DURO * bin(mascara & ~self.p['disponible'][t][dia]).count("1")
+            if aplicar:
+                delta += PESO_HUECO * (self._huecos(t, dia) - huecos_antes)
+            else:
+                # Huecos como si la sesión estuviera puesta, sin tocar los contadores
+                base = (t * dias + dia) * B
+                ocupados = [b for b in range(B) if self.ocup_docente[base + b] or inicio <= b < inicio + s['duracion']]
+                huecos = ocupados[-1] - ocupados[0] + 1 - len(ocupados)
+                delta += PESO_HUECO * (huecos - huecos_antes)
+        if aplicar:
+            self.dia[i], self.inicio[i], self.salon[i] = dia, inicio, salon
+        return delta
+
+    def _quitar(self, i):
+        """Quita la sesión i y devuelve el costo que se ahorra (positivo)."""
+        s = self.sesiones[i]
+        dias = self.p['dias']
+        dia, inicio, salon, t = self.dia[i], self.inicio[i], self.salon[i], s['docente']
+        huecos_antes = self._huecos(t, dia) if t >= 0 else 0
+        ahorro = 0
+        for b in range(inicio, inicio + s['duracion']):
+            if salon >= 0:
+                celda = (salon * dias + dia) * B + b
+                self.ocup_salon[celda] -= 1
+                ahorro += PESO_DURO * self.ocup_salon[celda]
+            if t >= 0:
+                celda = (t * dias + dia) * B + b
+                self.ocup_docente[celda] -= 1
+                ahorro += PESO_DURO * self.ocup_docente[celda]
+            for k in s['cohortes']:
+                celda = (k * dias + dia) * B + b
+                clave = (celda, s['materia'])
+                self.ocup_cohorte[celda] -= 1
+                self.ocup_cohorte_materia[clave] -= 1
+                ahorro += PESO_COHORTE * (self.ocup_cohorte[celda] - self.ocup_cohorte_materia[clave])
+        if salon < 0:
+            ahorro += PESO_DURO * s['duracion']
+        if t >= 0:
+            mascara = ((1 << s['duracion']) - 1) << inicio
+            ahorro += PESO_DURO * bin(mascara & ~self.p['disponible'][t][dia]).count("1")
+            ahorro += PESO_HUECO * (huecos_antes - self._huecos(t, dia))
+        return ahorro
+
+    def costo_total(self):
+        """Recalcula el costo desde cero (para verificar la evaluación incremental)."""
+        dias = self.p['dias']
+        costo = PESO_DURO * (sum(_pares(n) for n in self.ocup_salon) + sum(_pares(n) for n in self.ocup_docente))
+        costo += PESO_COHORTE * (sum(_pares(n) for n in self.ocup_cohorte)
+                                 - sum(_pares(n) for n in self.ocup_cohorte_materia.values()))
+        for i, s in enumerate(self.sesiones):
+            if self.salon[i] < 0:
+                costo += PESO_DURO * s['duracion']
+            if s['docente'] >= 0:
+                mascara = ((1 << s['duracion']) - 1) << self.inicio[i]
+                costo += PESO_DURO * bin(mascara & ~self.p['disponible'][s['docente']][self.dia[i]]).count("1")
+        costo += PESO_HUECO * sum(self._huecos(t, d) for t in range(self.p['num_docentes']) for d in range(dias))
+        return costo
+
+    # --- Búsqueda ---
+    def _vecino(self, i):
+        s = self.sesiones[i]
+        if self.rng.random() < 0.3 and len(s['salones']) > 1:
+            return self.dia[i], self.inicio[i], self.rng.choice(s['salones'])
+        salon = self.salon[i] if self.rng.random() < 0.5 or not s['salones'] else self.rng.choice(s['salones'])
+        return self.rng.randrange(self.p['dias']), self.rng.choice(s['inicios']), salon
+
+    def resolver(self, iteraciones=ITERACIONES, temperatura_inicial=None, temperatura_final=0.05):
+        """Recocido simulado; devuelve (mejor costo, [(dia, inicio, salon), ...])."""
+        n = len(self.sesiones)
+        mejor_costo = self.costo
+        mejor = list(zip(self.dia, self.inicio, self.salon))
+        if n == 0:
+            return mejor_costo, mejor
+        if temperatura_inicial is None:
+            temperatura_inicial = 2.0 * PESO_COHORTE
+        enfriamiento = (temperatura_final / temperatura_inicial) ** (1.0 / max(1, iteraciones))
+        temperatura = temperatura_inicial
+        for _ in range(iteraciones):
+            i = self.rng.randrange(n)
+            dia, inicio, salon = self._vecino(i)
+            anterior = (self.dia[i], self.inicio[i], self.salon[i])
+            if (dia, inicio, salon) == anterior:
+                continue
+            ahorro = self._quitar(i)
+            delta = self._delta_poner(i, dia, inicio, salon, aplicar=False) - ahorro
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperatura):
+                self._delta_poner(i, dia, inicio, salon, aplicar=True)
+                self.costo += delta
+                if self.costo < mejor_costo:
+                    mejor_costo = self.costo
+                    mejor = list(zip(self.dia, self.inicio, self.salon))
+            else:
+                self._delta_poner(i, *anterior, aplicar=True)
+            temperatura *= enfriamiento
+        return mejor_costo, mejor
+
+
+def _arranque(argumentos):
+    problema, semilla, iteraciones, desde_actual = argumentos
+    return Recocido(problema, semilla, desde_actual).resolver(iteraciones)
+
+
+def resolver_multiarranque(problema, arranques=4, iteraciones=ITERACIONES, procesos=None, semilla=None):
+    """
+    Corre `arranques` recocidos independientes (el primero parte del horario
+    actual, los demás de uno aleatorio) y devuelve el mejor (costo, asignación).
+    """
+    base = random.Random(semilla)
+    trabajos = [(problema, base.randrange(2 ** 32), iteraciones, k == 0) for k in range(arranques)]
+    if procesos == 1:
+        resultados = list(map(_arranque, trabajos))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_arranque, trabajos))
+    return min(resultados, key=lambda resultado: resultado[0])
+
+
+def describir_solucion(problema, asignacion):
+    """
+    Filas (id_sesion, dia_semana, hora_inicio, hora_fin, salon) listas para
+    db_manager, con la duración real de cada sesión (no la redondeada a bloques).
+    """
+    filas = []
+    for s, (dia, inicio, salon) in zip(problema['sesiones'], asignacion):
+        filas.append((s['id_sesion'], logica.DIAS_SEMANA[dia], _hora(inicio), _hora(inicio, s['minutos']),
+                      problema['salones'][salon] if salon >= 0 else None))
+    return filas
+
+
+def desglosar_costo(problema, asignacion):
+    """
+    Cuenta las violaciones de una asignación, en bloques de 30 minutos: choques
+    de salón y de docente, bloques fuera de la disponibilidad del docente,
+    cruces de cohorte y huecos de los docentes.
+    """
+    estado = Recocido(problema, asignacion=asignacion)
+    choques_salon = sum(_pares(n) for n in estado.ocup_salon)
+    choques_docente = sum(_pares(n) for n in estado.ocup_docente)
+    cohortes = (sum(_pares(n) for n in estado.ocup_cohorte)
+                - sum(_pares(n) for n in estado.ocup_cohorte_materia.values()))
+    huecos = sum(estado._huecos(t, d) for t in range(problema['num_docentes']) for d in range(problema['dias']))
+    indisponible = sum(
+        bin((((1 << s['duracion']) - 1) << inicio) & ~problema['disponible'][s['docente']][dia]).count("1")
+        for s, (dia, inicio, _) in zip(problema['sesiones'], asignacion) if s['docente'] >= 0)
+    sin_salon = sum(1 for _, _, salon in asignacion if salon < 0)
+    return {'costo': estado.costo, 'choques_salon': choques_salon, 'choques_docente': choques_docente,
+            'bloques_no_disponibles': indisponible, 'sin_salon': sin_salon,
+            'cruces_cohorte': cohortes, 'huecos_docentes': huecos}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asigna día, hora y salón a todas las sesiones.")
+    parser.add_argument("--config", help="JSON con 'cohortes' y 'disponibilidad' de docentes")
+    parser.add_argument("--salones", help="Inventario de salones (.csv con salon,capacidad o .json)")
+    parser.add_argument("--incluir-sabado", action="store_true")
+    parser.add_argument("--desde", default=HORA_DESDE)
+    parser.add_argument("--hasta", default=HORA_HASTA)
+    parser.add_argument("--arranques", type=int, default=4)
+    parser.add_argument("--iteraciones", type=int, default=ITERACIONES)
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("-o", "--salida", help="Archivo .json con el horario propuesto")
+    parser.add_argument("--aplicar", action="store_true", help="Guarda el horario en la base de datos")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Con --aplicar, guarda el horario aunque viole restricciones duras")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+
+    configuracion = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as archivo:
+            configuracion = json.load(archivo)
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        sesiones = sesiones_desde_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+        inventario = leer_inventario(args.salones) if args.salones else inventario_desde_db(conn, sesiones)
+        try:
+            problema = preparar_problema(sesiones, inventario, configuracion.get('cohortes'),
+                                         configuracion.get('disponibilidad'), 6 if args.incluir_sabado else 5,
+                                         args.desde, args.hasta)
+        except ValueError as e:
+            print(f"No se puede armar el problema: {e}")
+            return 1
+
+        actual = [s['actual'] for s in problema['sesiones']]
+        inicio = time.perf_counter()
+        costo, asignacion = resolver_multiarranque(problema, args.arranques, args.iteraciones,
+                                                   args.procesos, args.semilla)
+        duracion = time.perf_counter() - inicio
+        print(f"{len(sesiones)} sesiones, {len(inventario)} salones, {args.arranques} arranques en {duracion:.2f} s")
+        # Igual que Recocido al arrancar desde el horario actual: solo se evalúa si
+        # cada sesión cae en un día y un inicio del dominio (--desde/--hasta)
+        fuera = sum(1 for s, (d, b, _) in zip(problema['sesiones'], actual)
+                    if not (d < problema['dias'] and b in s['inicios']))
+        if fuera:
+            print(f"Horario actual:   {fuera} sesiones fuera de los días u horas configurados, no se desglosa")
+        else:
+            print(f"Horario actual:   {desglosar_costo(problema, actual)}")
+        propuesto = desglosar_costo(problema, asignacion)
+        print(f"Horario propuesto: {propuesto}")
+
+        filas = describir_solucion(problema, asignacion)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as archivo:
+                json.dump([dict(zip(('id_sesion', 'dia_semana', 'hora_inicio', 'hora_fin', 'salon'), fila))
+                           for fila in filas], archivo, ensure_ascii=False, indent=2)
+        if args.aplicar:
+            violadas = {clave: propuesto[clave] for clave in RESTRICCIONES_DURAS if propuesto[clave]}
+            if violadas and not args.forzar:
+                print(f"No se aplica: el horario propuesto viola restricciones duras {violadas}. "
+                      "Use --forzar para guardarlo de todos modos.")
+                return 1
+            actualizadas = db_manager.actualizar_franjas_sesiones(conn, filas)
+            if actualizadas is None:
+                return 1
+            print(f"{actualizadas} sesiones actualizadas en la base de datos.")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# PROYECTO_RAIZ/logica/asignacion_salones.py
+#
+# Asignación de salones para todas las sesiones del periodo:
+#
+#     python -m logica.asignacion_salones --salones inventario.csv            # solo muestra los cambios
+#     python -m logica.asignacion_salones --salones inventario.csv --aplicar  # y los guarda
+#
+# El inventario es un CSV con columnas salon y capacidad, o un JSON
+# {salon: capacidad}; una capacidad vacía significa sin límite. Sin inventario
+# se usan los salones de la tabla Salones con su capacidad o, si está vacía,
+# los que ya aparecen en las sesiones, sin límite de capacidad.
+#
+# Primero se colorea el grafo de intervalos de cada día (sesiones por hora de
+# inicio, cada una al salón libre que mejor le sirve) y después una búsqueda
+# local mueve e intercambia sesiones para que cada grupo use los menos salones
+# posibles y cambie lo menos posible respecto al salón que ya tenía.
+
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+from collections import Counter, defaultdict
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+from logica.auditoria import sesiones_desde_catalogo, auditar, VALORES_SIN_ASIGNAR
+
+INFINITO = float("inf")
+# Costo de que un grupo use un salón más y de que una sesión cambie de salón
+PESO_SALON_EXTRA = 2
+PESO_CAMBIO = 1
+MAX_PASADAS = 20
+
+
+def leer_inventario(ruta):
+    """Lee el inventario de salones ({salon: capacidad o None}) de un CSV o JSON."""
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if ruta.lower().endswith(".json"):
+            datos = json.load(archivo)
+            if isinstance(datos, list):
+                datos = {fila['salon']: fila.get('capacidad') for fila in datos}
+        else:
+            datos = {fila['salon']: fila.get('capacidad') for fila in csv.DictReader(archivo)}
+    return {salon.strip(): (int(capacidad) if capacidad not in (None, "") else None)
+            for salon, capacidad in datos.items() if salon and salon.strip()}
+
+
+def inventario_desde_sesiones(sesiones):
+    """Inventario implícito: los salones que ya usan las sesiones, sin límite de capacidad."""
+    inventario = {}
+    for sesion in sesiones:
+        salon = (sesion['salon'] or '').strip()
+        if logica.normalizar_texto(salon) not in VALORES_SIN_ASIGNAR:
+            inventario.setdefault(salon, None)
+    return inventario
+
+
+def inventario_desde_db(conn, sesiones):
+    """Inventario de la tabla Salones con su capacidad; si está vacía, el implícito de las sesiones."""
+    inventario = {nombre.strip(): capacidad for _, nombre, capacidad in db_manager.obtener_todos_los_salones(conn)
+                  if logica.normalizar_texto(nombre.strip()) not in VALORES_SIN_ASIGNAR}
+    return inventario or inventario_desde_sesiones(sesiones)
+
+
+class AsignadorSalones:
+    """Asigna un salón a cada sesión sin cruces, respetando capacidades."""
+
+    def __init__(self, sesiones, inventario, peso_salon_extra=PESO_SALON_EXTRA, peso_cambio=PESO_CAMBIO):
+        self.peso_salon_extra = peso_salon_extra
+        self.peso_cambio = peso_cambio
+        # Salones de menor a mayor capacidad: el primero libre que cabe es el de mejor ajuste
+        self.salones = sorted(inventario, key=lambda s: (inventario[s] is None, inventario[s] or 0, s))
+        self.capacidad = [INFINITO if inventario[s] is None else inventario[s] for s in self.salones]
+        indice_salon = {logica.normalizar_texto(s): i for i, s in enumerate(self.salones)}
+
+        self.sesiones = [s for s in sesiones if s['fin'] > s['inicio']]
+        self.original = [indice_salon.get(logica.normalizar_texto(s['salon'] or '')) for s in self.sesiones]
+        self.requerido = [s['cupos'] or 0 for s in self.sesiones]
+        # Ocupación por salón y día como máscara de minutos: un cruce es un AND distinto de cero
+        self.mascara = [((1 << (s['fin'] - s['inicio'])) - 1) << s['inicio'] for s in self.sesiones]
+        self.ocupacion = [defaultdict(int) for _ in self.salones]
+        self.ocupantes = [defaultdict(list) for _ in self.salones]
+        self.asignado = [None] * len(self.sesiones)
+        self.sesiones_grupo = defaultdict(list)
+        for i, sesion in enumerate(self.sesiones):
+            self.sesiones_grupo[sesion['id_grupo']].append(i)
+
+    # --- Operaciones básicas ---
+    def _cabe(self, i, salon):
+        return self.capacidad[salon] >= self.requerido[i]
+
+    def _libre(self, i, salon, ignorar=()):
+        dia = self.sesiones[i]['dia']
+        ocupado = self.ocupacion[salon][dia]
+        for j in ignorar:
+            if self.asignado[j] == salon and self.sesiones[j]['dia'] == dia:
+                ocupado &= ~self.mascara[j]
+        return not ocupado & self.mascara[i]
+
+    def _poner(self, i, salon):
+        dia = self.sesiones[i]['dia']
+        self.asignado[i] = salon
+        self.ocupacion[salon][dia] |= self.mascara[i]
+        self.ocupantes[salon][dia].append(i)
+
+    def _quitar(self, i):
+        salon = self.asignado[i]
+        dia = self.sesiones[i]['dia']
+        self.asignado[i] = None
+        self.ocupacion[salon][dia] &= ~self.mascara[i]
+        self.ocupantes[salon][dia].remove(i)
+
+    def _bloqueadores(self, i, salon):
+        """Sesiones que hoy ocupan `salon` y se cruzan con la sesión i."""
+        return [j for j in self.ocupantes[salon][self.sesiones[i]['dia']] if self.mascara[j] & self.mascara[i]]
+
+    def _costo_grupo(self, id_grupo):
+        indices = self.sesiones_grupo[id_grupo]
+        salones = {self.asignado[i] for i in indices if self.asignado[i] is not None}
+        cambios = sum(1 for i in indices if self.asignado[i] != self.original[i])
+        return self.peso_salon_extra * max(0, len(salones) - 1) + self.peso_cambio * cambios
+
+    def _preferidos(self, i, solo_grupo=False):
+        """
+        Salones en orden de preferencia: el original, los que ya usa el grupo y,
+        salvo con `solo_grupo`, todos los demás por mejor ajuste.
+        """
+        grupo = Counter(self.asignado[j] for j in self.sesiones_grupo[self.sesiones[i]['id_grupo']]
+                        if self.asignado[j] is not None)
+        orden = []
+        if self.original[i] is not None:
+            orden.append(self.original[i])
+        orden.extend(salon for salon, _ in grupo.most_common())
+        if not solo_grupo:
+            orden.extend(range(len(self.salones)))
+        return list(dict.fromkeys(orden))
+
+    # --- Fases ---
+    def _colorear(self):
+        """Coloreo voraz del grafo de intervalos, sesiones por día y hora de inicio."""
+        orden = sorted(range(len(self.sesiones)), key=lambda i: (
+            self.sesiones[i]['dia'], self.sesiones[i]['inicio'], -self.sesiones[i]['fin'], -self.requerido[i]))
+        for i in orden:
+            for salon in self._preferidos(i):
+                if self._cabe(i, salon) and self._libre(i, salon):
+                    self._poner(i, salon)
+                    break
+
+    def _reubicar(self, i, excluir):
+        """Mueve la sesión i a otro salón libre donde quepa; devuelve si pudo."""
+        for salon in self._preferidos(i):
+            if salon != excluir and self._cabe(i, salon) and self._libre(i, salon):
+                self._quitar(i)
+                self._poner(i, salon)
+                return True
+        return False
+
+    def _reparar(self):
+        """Ubica las sesiones sin salón desalojando a las que puedan irse a otro."""
+        for i in range(len(self.sesiones)):
+            if self.asignado[i] is not None:
+                continue
+            for salon in self._preferidos(i):
+                if not self._cabe(i, salon):
+                    continue
+                bloqueadores = self._bloqueadores(i, salon)
+                movidos = []
+                for j in bloqueadores:
+                    anterior = self.asignado[j]
+                    if not self._reubicar(j, salon):
+                        break
+                    movidos.append((j, anterior))
+                else:
+                    self._poner(i, salon)
+                    break
+                for j, anterior in reversed(movidos):
+                    self._quitar(j)
+                    self._poner(j, anterior)
+
+    def _mejorar(self, max_pasadas):
+        """
+        Búsqueda local: mover o intercambiar sesiones mientras baje el costo. Solo
+        el salón original o uno que ya use el grupo pueden bajar el costo, así
+        que son los únicos candidatos.
+        """
+        for _ in range(max_pasadas):
+            mejoro = False
+            for indices in self.sesiones_grupo.values():
+                for i in indices:
+                    actual = self.asignado[i]
+                    if actual is None:
+                        continue
+                    for salon in self._preferidos(i, solo_grupo=True):
+                        if salon == actual or not self._cabe(i, salon):
+                            continue
+                        if self._intentar_mover(i, salon):
+                            mejoro = True
+                            break
+            if not mejoro:
+                break
+
+    def _intentar_mover(self, i, salon):
+        """Mueve i a `salon` (intercambiando con un único bloqueador si hace falta) si baja el costo."""
+        anterior = self.asignado[i]
+        bloqueadores = self._bloqueadores(i, salon)
+        if len(bloqueadores) > 1:
+            return False
+        j = bloqueadores[0] if bloqueadores else None
+        if j is not None and not (self._cabe(j, anterior) and self._libre(j, anterior, ignorar=(i,))):
+            return False
+
+        grupos = {self.sesiones[i]['id_grupo']}
+        if j is not None:
+            grupos.add(self.sesiones[j]['id_grupo'])
+        antes = sum(self._costo_grupo(g) for g in grupos)
+        self._quitar(i)
+        if j is not None:
+            self._quitar(j)
+        self._poner(i, salon)
+        if j is not None:
+            self._poner(j, anterior)
+        if sum(self._costo_grupo(g) for g in grupos) < antes:
+            return True
+        # Sin mejora: se deshace
+        self._quitar(i)
+        if j is not None:
+            self._quitar(j)
+            self._poner(j, salon)
+        self._poner(i, anterior)
+        return False
+
+    def resolver(self, max_pasadas=MAX_PASADAS):
+        """
+        Devuelve {'asignaciones': {id_sesion: salon}, 'cambios': [...],
+        'sin_asignar': [id_sesion, ...], 'costo': int}.
+        """
+        self._colorear()
+        self._reparar()
+        self._mejorar(max_pasadas)
+
+        asignaciones = {}
+        cambios = []
+        sin_asignar = []
+        for i, sesion in enumerate(self.sesiones):
+            if self.asignado[i] is None:
+                sin_asignar.append(sesion['id_sesion'])
+                continue
+            salon = self.salones[self.asignado[i]]
+            asignaciones[sesion['id_sesion']] = salon
+            if self.asignado[i] != self.original[i]:
+                cambios.append({
+                    'id_sesion': sesion['id_sesion'],
+                    'grupo': f"{sesion['materia']} - {sesion['nombre_grupo']}",
+                    'dia': logica.DIAS_SEMANA[sesion['dia']],
+                    'inicio': sesion['inicio'],
+                    'fin': sesion['fin'],
+                    'salon_anterior': sesion['salon'],
+                    'salon_nuevo': salon
+                })
+        return {
+            'asignaciones': asignaciones,
+            'cambios': cambios,
+            'sin_asignar': sin_asignar,
+            'costo': sum(self._costo_grupo(g) for g in self.sesiones_grupo)
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asigna salones a las sesiones sin cruces y respetando capacidades.")
+    parser.add_argument("--salones", help="Inventario de salones (.csv con salon,capacidad o .json)")
+    parser.add_argument("--aplicar", action="store_true", help="Guarda la asignación en la base de datos")
+    parser.add_argument("-o", "--salida", help="Archivo .json con los cambios propuestos")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        sesiones = sesiones_desde_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+        inventario = leer_inventario(args.salones) if args.salones else inventario_desde_db(conn, sesiones)
+
+        inicio = time.perf_counter()
+        resultado = AsignadorSalones(sesiones, inventario).resolver()
+        duracion = time.perf_counter() - inicio
+
+        cruces_antes = len(auditar(sesiones, ('salon',)))
+        # Se audita lo que --aplicar guardaría: solo se escriben los cambios, así
+        # que las sesiones sin salón posible conservan el que ya tienen
+        nuevas = [dict(s, salon=resultado['asignaciones'].get(s['id_sesion'], s['salon'])) for s in sesiones]
+        cruces_despues = len(auditar(nuevas, ('salon',)))
+        print(f"{len(sesiones)} sesiones, {len(inventario)} salones, resuelto en {duracion:.2f} s")
+        print(f"Cruces de salón: {cruces_antes} -> {cruces_despues}; sesiones que cambian de salón: "
+              f"{len(resultado['cambios'])}; sin salón posible (conservan el actual): {len(resultado['sin_asignar'])}")
+        for cambio in resultado['cambios'][:30]:
+            print(f"  sesión {cambio['id_sesion']} {cambio['grupo']} {cambio['dia']}: "
+                  f"{cambio['salon_anterior']} -> {cambio['salon_nuevo']}")
+        if len(resultado['cambios']) > 30:
+            print(f"  ... y {len(resultado['cambios']) - 30} más")
+
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+        if args.aplicar:
+            actualizadas = db_manager.actualizar_salones_sesiones(
+                conn, ((c['id_sesion'], c['salon_nuevo']) for c in resultado['cambios']))
+            if actualizadas is None:
+                return 1
+            print(f"{actualizadas} sesiones actualizadas en la base de datos.")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# PROYECTO_RAIZ/logica/auditoria.py
+#
+# Auditoría de cruces de salones y docentes en todo el catálogo:
+#
+#     python -m logica.auditoria                   # reporte en texto
+#     python -m logica.auditoria -o cruces.csv     # o .json
+#
+# Las sesiones se indexan por (recurso, día) y en cada índice un barrido por
+# hora de inicio encuentra todos los pares que se solapan en O(n log n + k),
+# donde k es el número de cruces reportados.
+
+import sys
+import os
+import csv
+import json
+import heapq
+import logging
+import argparse
+from collections import defaultdict
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+
+RECURSOS = ('salon', 'docente')
+# Valores de salón o docente que no identifican a nadie y no se auditan
+VALORES_SIN_ASIGNAR = {'', 'n/a', 'na', 'por asignar', 'sin asignar'}
+
+
+def sesiones_desde_catalogo(filas):
+    """
+    Convierte las filas de `db_manager.obtener_sesiones_catalogo` en
+    diccionarios de sesión con la hora en minutos; las filas sin sesión o con
+    día u hora inválidos se omiten con una advertencia.
+    """
+    sesiones = []
+    for (codigo, nombre, _, id_grupo, nombre_grupo, cupos, id_sesion, tipo_sesion,
+         dia, hora_inicio, hora_fin, docente, salon) in filas:
+        if id_sesion is None:
+            continue
+        try:
+            inicio = logica.hora_a_minutos(hora_inicio)
+            fin = logica.hora_a_minutos(hora_fin)
+            indice = logica.indice_dia(dia)
+        except (ValueError, AttributeError) as e:
+            logging.warning(f"Sesión {id_sesion} omitida en la auditoría: {e}")
+            continue
+        sesiones.append({
+            'id_sesion': id_sesion,
+            'id_grupo': id_grupo,
+            'codigo': codigo,
+            'materia': nombre,
+            'nombre_grupo': nombre_grupo,
+            'cupos': cupos,
+            'tipo_sesion': tipo_sesion,
+            'dia': indice,
+            'inicio': inicio,
+            'fin': fin,
+            'docente': docente,
+            'salon': salon
+        })
+    return sesiones
+
+
+def construir_indices(sesiones, recursos=RECURSOS):
+    """
+    Índice de intervalos por recurso: {recurso: {(nombre_normalizado, dia):
+    [(inicio, fin, sesion), ...]}}, cada lista ordenada por hora de inicio.
+    """
+    indices = {recurso: defaultdict(list) for recurso in recursos}
+    for sesion in sesiones:
+        if sesion['fin'] <= sesion['inicio']:
+            continue
+        for recurso in recursos:
+            clave = logica.normalizar_texto(sesion[recurso] or '')
+            if clave not in VALORES_SIN_ASIGNAR:
+                indices[recurso][(clave, sesion['dia'])].append((sesion['inicio'], sesion['fin'], sesion))
+    for indice in indices.values():
+        for intervalos in indice.values():
+            intervalos.sort(key=lambda intervalo: (intervalo[0], intervalo[1]))
+    return indices
+
+
+def barrer_solapamientos(intervalos):
+    """
+    Barrido sobre intervalos [inicio, fin) ordenados por inicio: genera cada par
+    (a, b) de sesiones de grupos distintos que se solapan. Los intervalos
+    activos se guardan en un montículo por hora de fin.
+    """
+    activos = []
+    for orden, (inicio, fin, sesion) in enumerate(intervalos):
+        while activos and activos[0][0] <= inicio:
+            heapq.heappop(activos)
+        for _, _, otra in activos:
+            if otra['id_grupo'] != sesion['id_grupo']:
+                yield otra, sesion
+        heapq.heappush(activos, (fin, orden, sesion))
+
+
+def auditar(sesiones, recursos=RECURSOS):
+    """Devuelve la lista de cruces de todo el catálogo, ordenada por recurso, día y hora."""
+    cruces = []
+    for recurso, indice in construir_indices(sesiones, recursos).items():
+        for (_, dia), intervalos in indice.items():
+            for a, b in barrer_solapamientos(intervalos):
+                cruces.append({
+                    'recurso': recurso,
+                    'nombre': a[recurso],
+                    'dia': logica.DIAS_SEMANA[dia],
+                    'inicio': _minutos_a_hora(max(a['inicio'], b['inicio'])),
+                    'fin': _minutos_a_hora(min(a['fin'], b['fin'])),
+                    'sesion_a': a['id_sesion'],
+                    'grupo_a': f"{a['materia']} - {a['nombre_grupo']}",
+                    'sesion_b': b['id_sesion'],
+                    'grupo_b': f"{b['materia']} - {b['nombre_grupo']}"
+                })
+    cruces.sort(key=lambda c: (c['recurso'], logica.normalizar_texto(c['nombre']),
+                               logica.indice_dia(c['dia']), c['inicio'], c['sesion_a'], c['sesion_b']))
+    return cruces
+
+
+def _minutos_a_hora(minutos):
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def imprimir_reporte(cruces, salida=sys.stdout):
+    """Reporte legible agrupado por recurso."""
+    if not cruces:
+        print("No se encontraron cruces de salones ni de docentes.", file=salida)
+        return
+    actual = None
+    for cruce in cruces:
+        if (cruce['recurso'], cruce['nombre']) != actual:
+            actual = (cruce['recurso'], cruce['nombre'])
+            etiqueta = "Salón" if cruce['recurso'] == 'salon' else "Docente"
+            print(f"\n{etiqueta}: {cruce['nombre']}", file=salida)
+        print(f"  {cruce['dia']} {cruce['inicio']}-{cruce['fin']}: "
+              f"{cruce['grupo_a']} (sesión {cruce['sesion_a']}) <-> "
+              f"{cruce['grupo_b']} (sesión {cruce['sesion_b']})", file=salida)
+    por_recurso = defaultdict(int)
+    for cruce in cruces:
+        por_recurso[cruce['recurso']] += 1
+    resumen = ", ".join(f"{cantidad} de {recurso}" for recurso, cantidad in sorted(por_recurso.items()))
+    print(f"\nTotal: {len(cruces)} cruces ({resumen}).", file=salida)
+
+
+def exportar_cruces(cruces, ruta):
+    """Escribe los cruces en CSV o JSON según la extensión de `ruta`."""
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        if ruta.lower().endswith(".json"):
+            json.dump(cruces, archivo, ensure_ascii=False, indent=2)
+        else:
+            campos = ['recurso', 'nombre', 'dia', 'inicio', 'fin', 'sesion_a', 'grupo_a', 'sesion_b', 'grupo_b']
+            escritor = csv.DictWriter(archivo, fieldnames=campos)
+            escritor.writeheader()
+            escritor.writerows(cruces)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detecta salones y docentes con sesiones que se cruzan.")
+    parser.add_argument("-o", "--salida", help="Archivo .csv o .json con los cruces (por defecto, reporte en texto)")
+    parser.add_argument("--recurso", choices=RECURSOS, action="append",
+                        help="Auditar solo este recurso (se puede repetir)")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        sesiones = sesiones_desde_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+    finally:
+        conn.close()
+
+    cruces = auditar(sesiones, tuple(args.recurso or RECURSOS))
+    if args.salida:
+        exportar_cruces(cruces, args.salida)
+        print(f"{len(cruces)} cruces escritos en {args.salida}", file=sys.stderr)
+    else:
+        imprimir_reporte(cruces)
+    return 2 if cruces else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# PROYECTO_RAIZ/logica/batch.py
+#
+# Generación de horarios por lotes, sin interfaz gráfica:
+#
+#     python -m logica.batch solicitudes.jsonl -o horarios.jsonl --procesos 4
+#
+# Cada línea JSONL es {"estudiante": ..., "codigos": [...], "preferencias": {...},
+# "bloqueos": [["Lunes", "07:00", "09:00"], ...]}. En CSV las columnas son
+# estudiante, codigos, turno, minimizar_huecos y bloqueos; las listas van
+# separadas por ';' y cada bloqueo se escribe como "Lunes 07:00-09:00".
+
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+from logica.memoria_compartida import CatalogoCompartido, catalogo_de_trabajador
+
+PERCENTILES_REPORTADOS = (50, 90, 95, 99)
+
+# Catálogo compilado del proceso trabajador; se recibe una sola vez al iniciar el pool
+_catalogo = None
+
+
+def leer_bloqueo(bloqueo):
+    """Acepta ["Lunes", "07:00", "09:00"] o "Lunes 07:00-09:00"; ValueError con cualquier otra forma."""
+    if isinstance(bloqueo, str):
+        try:
+            dia, franja = bloqueo.rsplit(" ", 1)
+            hora_inicio, hora_fin = franja.split("-")
+        except ValueError:
+            raise ValueError(f"Bloqueo inválido {bloqueo!r}: se espera \"Lunes 07:00-09:00\"") from None
+        return dia.strip(), hora_inicio.strip(), hora_fin.strip()
+    if not isinstance(bloqueo, (list, tuple)) or len(bloqueo) != 3 or not all(isinstance(v, str) for v in bloqueo):
+        raise ValueError(f"Bloqueo inválido {bloqueo!r}: se espera [\"Lunes\", \"07:00\", \"09:00\"]")
+    dia, hora_inicio, hora_fin = bloqueo
+    return dia, hora_inicio, hora_fin
+
+
+def _leer_booleano(valor, defecto=True):
+    if valor is None or valor == "":
+        return defecto
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in ("1", "si", "sí", "true", "verdadero", "x")
+
+
+def _separar(valor):
+    return [parte.strip() for parte in (valor or "").split(";") if parte.strip()]
+
+
+def leer_solicitudes(ruta):
+    """Lee las solicitudes de un archivo CSV o JSONL y las normaliza a diccionarios."""
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if ruta.lower().endswith(".csv"):
+            for numero, fila in enumerate(csv.DictReader(archivo), start=1):
+                yield {
+                    'estudiante': fila.get('estudiante') or f"fila-{numero}",
+                    'codigos': _separar(fila.get('codigos')),
+                    'preferencias': {
+                        'turno': (fila.get('turno') or 'cualquiera').strip().lower(),
+                        'minimizar_huecos': _leer_booleano(fila.get('minimizar_huecos'))
+                    },
+                    'bloqueos': _separar(fila.get('bloqueos'))
+                }
+        else:
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    solicitud = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    solicitud = {'error': f"JSON inválido: {e}"}
+                if not isinstance(solicitud, dict):
+                    solicitud = {'error': f"Se esperaba un objeto JSON, no {type(solicitud).__name__}"}
+                solicitud.setdefault('estudiante', f"linea-{numero}")
+                yield solicitud
+
+
+def _inicializar_trabajador(catalogo):
+    global _catalogo
+    _catalogo = catalogo
+
+
+def _adjuntar_trabajador(nombre):
+    _inicializar_trabajador(catalogo_de_trabajador(nombre))
+
+
+def resolver_solicitud(solicitud, catalogo=None, max_resultados=1):
+    """Resuelve una solicitud y devuelve el registro que se escribe en el JSONL de salida."""
+    catalogo = catalogo if catalogo is not None else _catalogo
+    inicio = time.perf_counter()
+    resultado = {'estudiante': solicitud.get('estudiante')}
+    try:
+        if 'error' in solicitud:
+            raise ValueError(solicitud['error'])
+        preferencias = dict(solicitud.get('preferencias') or {})
+        preferencias['minimizar_huecos'] = _leer_booleano(preferencias.get('minimizar_huecos'))
+        codigos = solicitud.get('codigos') or []
+        if isinstance(codigos, str):
+            raise ValueError("'codigos' debe ser una lista de códigos, no un texto")
+        bloqueos = [leer_bloqueo(b) for b in solicitud.get('bloqueos') or []]
+        horarios = logica.generar_horarios(catalogo, codigos, preferencias, bloqueos, max_resultados)
+        resultado['estado'] = 'ok' if horarios else 'sin_solucion'
+        resultado['horarios'] = [
+            {
+                'grupos': [
+                    {'codigo': codigo, 'nombre_grupo': grupo['nombre'], 'id_grupo': grupo['id']}
+                    for codigo, grupo in horario['grupos'].items()
+                ],
+                'dias': horario['dias'],
+                'huecos': horario['huecos'],
+                'creditos': horario['creditos']
+            }
+            for horario in horarios
+        ]
+    except (ValueError, TypeError) as e:
+        resultado['estado'] = 'error'
+        resultado['error'] = str(e)
+    except Exception as e:
+        # Una solicitud con una forma imprevista no debe tumbar el lote (pool.map se detendría)
+        resultado['estado'] = 'error'
+        resultado['error'] = f"{type(e).__name__}: {e}"
+    resultado['latencia_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+    return resultado
+
+
+def _resolver_en_trabajador(argumentos):
+    solicitud, max_resultados = argumentos
+    return resolver_solicitud(solicitud, max_resultados=max_resultados)
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    rango = max(1, -(-p * len(valores_ordenados) // 100))
+    return valores_ordenados[rango - 1]
+
+
+def procesar_lote(catalogo, solicitudes, salida, procesos=None, max_resultados=1, tamano_bloque=16):
+    """
+    Resuelve todas las solicitudes y escribe cada resultado en `salida` en
+    cuanto está listo (en el orden de entrada). Devuelve las latencias en ms.
+    """
+    latencias = []
+    trabajos = ((solicitud, max_resultados) for solicitud in solicitudes)
+    if procesos == 1:
+        _inicializar_trabajador(catalogo)
+        resultados = map(_resolver_en_trabajador, trabajos)
+        pool = compartido = None
+    else:
+        # Los trabajadores reciben solo el nombre del bloque compartido, no una copia del catálogo
+        compartido = CatalogoCompartido.publicar(catalogo)
+        pool = ProcessPoolExecutor(max_workers=procesos, initializer=_adjuntar_trabajador,
+                                   initargs=(compartido.nombre,))
+        resultados = pool.map(_resolver_en_trabajador, trabajos, chunksize=tamano_bloque)
+    try:
+        for resultado in resultados:
+            latencias.append(resultado['latencia_ms'])
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            salida.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            compartido.cerrar()
+    return latencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera horarios por lotes para una cohorte de estudiantes.")
+    parser.add_argument("entrada", help="Archivo .csv o .jsonl con las solicitudes")
+    parser.add_argument("-o", "--salida", help="Archivo .jsonl de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (por defecto, uno por núcleo)")
+    parser.add_argument("--max-resultados", type=int, default=1, help="Horarios alternativos por estudiante")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        catalogo = logica.compilar_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+    finally:
+        conn.close()
+
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    inicio = time.perf_counter()
+    try:
+        latencias = procesar_lote(catalogo, leer_solicitudes(args.entrada), salida,
+                                  args.procesos, args.max_resultados)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    rendimiento = len(latencias) / duracion if duracion > 0 else 0.0
+    print(f"{len(latencias)} solicitudes en {duracion:.2f} s ({rendimiento:.1f} solicitudes/s)", file=sys.stderr)
+    if latencias:
+        resumen = ", ".join(f"p{p} {percentil(latencias, p):.2f}" for p in PERCENTILES_REPORTADOS)
+        print(f"Latencia (ms): {resumen}, máx {latencias[-1]:.2f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
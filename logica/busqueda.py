@@ -0,0 +1,354 @@
+# PROYECTO_RAIZ/logica/busqueda.py
+#
+# Búsqueda de materias para la barra lateral, sin distinguir tildes ni
+# mayúsculas, sobre el código, el nombre y los docentes, salones y días de sus
+# sesiones ("miercoles", "jojoa", "A407"). Los textos se pliegan y se parten en
+# palabras; cada palabra del vocabulario guarda en arreglos de numpy las
+# materias donde aparece y el peso del campo, y un índice de trigramas sobre
+# el vocabulario encuentra las palabras que contienen cada término. Puntuar y
+# ordenar las materias son operaciones vectorizadas.
+#
+# Las facetas (día, tipo de sesión, docente, créditos y turno) se cuentan
+# sobre bitsets precalculados por valor, uno por grupo y bit: el conteo de una
+# búsqueda es el AND con el bitset de los grupos de sus materias y un popcount.
+#
+#     python -m logica.busqueda miercoles jojoa      # busca en database/horarios.db
+#     python -m logica.busqueda --benchmark 20000    # tiempos en un catálogo sintético
+
+import sys
+import os
+import re
+import time
+import logging
+import argparse
+import statistics
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from logica import logica
+from logica import catalogo as catalogo_compacto
+
+# Peso en el ranking de cada campo: código, nombre, docente, salón y día
+_PESOS = (8, 6, 3, 2, 1)
+CONSULTAS_EN_CACHE = 128
+FACETAS = ('dia', 'tipo', 'docente', 'creditos', 'turno')
+# Facetas que se muestran en su orden natural; las demás, de más a menos grupos
+_FACETAS_ORDENADAS = ('dia', 'creditos', 'turno')
+_PALABRA = re.compile(r"\w+")
+
+
+def _terminos(texto):
+    return tuple(dict.fromkeys(_PALABRA.findall(logica.normalizar_texto(texto))))
+
+
+def _nombre_dia(dia):
+    """Nombre canónico del día ("miercoles" -> "Miércoles"); el original si no se reconoce."""
+    try:
+        return logica.DIAS_SEMANA[logica.indice_dia(dia)]
+    except ValueError:
+        return dia
+
+
+def _empaquetar_bits(seleccion):
+    """Arreglo (o matriz, por filas) de booleanos como bitsets de palabras de 64 bits."""
+    relleno = -seleccion.shape[-1] % 64
+    if relleno:
+        seleccion = np.concatenate([seleccion, np.zeros(seleccion.shape[:-1] + (relleno,), dtype=bool)], axis=-1)
+    return np.packbits(seleccion, axis=-1, bitorder="little").view(np.uint64)
+
+
+def _contar_bits(bitsets):
+    """Bits en uno por fila de una matriz de bitsets (sin np.bitwise_count, que exige NumPy 2)."""
+    return np.unpackbits(np.ascontiguousarray(bitsets).view(np.uint8), axis=-1).sum(axis=-1)
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _acumular_maximo(destino, indices, valores):
+    """
+    destino[indices] = max(destino[indices], valores) con índices repetidos.
+    Los pesos son pocos enteros pequeños, así que se asigna nivel por nivel:
+    es mucho más rápido que np.maximum.at.
+    """
+    for valor in np.flatnonzero(np.bincount(valores)):
+        seleccion = indices[valores == valor]
+        destino[seleccion] = np.maximum(destino[seleccion], valor)
+
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda sobre un `logica.catalogo.Catalogo`. `buscar` devuelve
+    las materias en las que cada término aparece dentro de alguna palabra, de
+    mayor a menor puntaje: por cada término cuenta el campo de mayor peso en
+    que aparece, el doble si empieza la palabra y el cuádruple si es el campo
+    entero (un código exacto, por ejemplo). Las consultas y los puntajes de
+    cada término quedan en caché: al borrar y volver a escribir, o al agregar
+    un término, no se recalcula lo ya visto.
+    """
+
+    def __init__(self, catalogo):
+        self._materias = list(catalogo)
+        plegados = {}
+        entradas = {}  # palabra -> {materia: (peso, es el campo entero)}
+        for i, materia in enumerate(self._materias):
+            sesiones = [sesion for grupo in materia.grupos for sesion in grupo.sesiones]
+            campos = [(materia.codigo,), (materia.nombre,)] + [
+                dict.fromkeys(getattr(sesion, atributo) for sesion in sesiones)
+                for atributo in ('docente', 'salon', 'dia')]
+            for peso, valores in zip(_PESOS, campos):
+                for valor in valores:
+                    if not valor:
+                        continue
+                    palabras = plegados.get(valor)
+                    if palabras is None:
+                        palabras = plegados[valor] = _PALABRA.findall(logica.normalizar_texto(valor))
+                    for palabra in palabras:
+                        por_materia = entradas.setdefault(palabra, {})
+                        anterior = por_materia.get(i)
+                        actual = (peso, len(palabras) == 1)
+                        if anterior is None or actual > anterior:
+                            por_materia[i] = actual
+        # Entradas (materia, peso, es el campo entero) de todas las palabras en
+        # arreglos planos; las de la palabra j van de _inicio_palabra[j] a _inicio_palabra[j + 1]
+        self._vocabulario = list(entradas)
+        self._posicion_palabra = {palabra: j for j, palabra in enumerate(self._vocabulario)}
+        materias, pesos, enteras, inicios = [], [], [], [0]
+        self._ngramas = {}  # fragmentos de 1 a 3 letras -> palabras que los contienen
+        for j, palabra in enumerate(self._vocabulario):
+            por_materia = entradas[palabra]
+            materias.extend(por_materia)
+            for peso, entera in por_materia.values():
+                pesos.append(peso)
+                enteras.append(entera)
+            inicios.append(len(materias))
+            for n in (1, 2, 3):
+                for k in range(len(palabra) - n + 1):
+                    self._ngramas.setdefault(palabra[k:k + n], set()).add(j)
+        self._materia_entrada = np.array(materias, dtype=np.int32)
+        self._peso_entrada = np.array(pesos, dtype=np.int32)
+        self._entera_entrada = np.array(enteras, dtype=bool)
+        self._inicio_palabra = np.array(inicios, dtype=np.int64)
+        self._consultas = OrderedDict()
+        self._puntajes = OrderedDict()
+        # La primera tecla es la consulta más amplia: sus puntajes se calculan de antemano
+        self._puntajes_letra = {letra: self._calcular_puntaje(letra) for letra in self._ngramas if len(letra) == 1}
+        self._conteos = OrderedDict()
+        self._construir_facetas()
+
+    def __len__(self):
+        return len(self._materias)
+
+    def buscar(self, texto, limite=None):
+        """Materias que coinciden con `texto`, ordenadas por relevancia (todas si está vacío)."""
+        terminos = _terminos(texto)
+        if not terminos:
+            return self._materias[:limite]
+        return [self._materias[i] for i in self._ids(terminos)[:limite].tolist()]
+
+    def facetas(self, texto):
+        """
+        Conteo de grupos por día, tipo de sesión, docente, créditos y turno
+        entre las materias que coinciden con `texto`: {faceta: [(valor, grupos)]},
+        sin los valores en cero. Un grupo cuenta en cada día, tipo y docente de
+        sus sesiones. Queda en caché por búsqueda.
+        """
+        terminos = _terminos(texto)
+        conteos = self._conteos.get(terminos)
+        if conteos is not None:
+            self._conteos.move_to_end(terminos)
+            return conteos
+        if terminos:
+            coinciden = np.zeros(len(self._materias), dtype=bool)
+            coinciden[self._ids(terminos)] = True
+            seleccion = coinciden[self._materia_grupo]
+        else:
+            seleccion = np.ones(len(self._materia_grupo), dtype=bool)
+        bits = _empaquetar_bits(seleccion)
+        conteos = {}
+        for faceta, (valores, bitsets) in self._bitsets.items():
+            cuentas = _contar_bits(bitsets & bits).tolist()
+            pares = [(valor, n) for valor, n in zip(valores, cuentas) if n]
+            if faceta not in _FACETAS_ORDENADAS:
+                pares.sort(key=lambda par: -par[1])
+            conteos[faceta] = pares
+        self._conteos[terminos] = conteos
+        if len(self._conteos) > CONSULTAS_EN_CACHE:
+            self._conteos.popitem(last=False)
+        return conteos
+
+    def _ids(self, terminos):
+        ids = self._consultas.get(terminos)
+        if ids is None:
+            ids = self._resolver(terminos)
+            self._consultas[terminos] = ids
+            if len(self._consultas) > CONSULTAS_EN_CACHE:
+                self._consultas.popitem(last=False)
+        else:
+            self._consultas.move_to_end(terminos)
+        return ids
+
+    def _construir_facetas(self):
+        """Un bitset sobre los grupos por cada valor de cada faceta."""
+        grupos = [(i, grupo) for i, materia in enumerate(self._materias) for grupo in materia.grupos]
+        self._materia_grupo = np.array([i for i, _ in grupos], dtype=np.int64)
+        miembros = {faceta: {} for faceta in FACETAS}
+        for g, (i, grupo) in enumerate(grupos):
+            valores = {'dia': set(), 'tipo': set(), 'docente': set(), 'turno': set(),
+                       'creditos': {self._materias[i].creditos}}
+            for sesion in grupo.sesiones:
+                valores['dia'].add(_nombre_dia(sesion.dia))
+                valores['tipo'].add(sesion.tipo)
+                valores['docente'].add(sesion.docente)
+                valores['turno'].add('tarde' if logica.hora_a_minutos(sesion.hora_inicio) >= logica.INICIO_TARDE else 'mañana')
+            if len(valores['turno']) > 1:
+                valores['turno'] = {'mixto'}
+            for faceta, conjunto in valores.items():
+                for valor in conjunto:
+                    if valor is not None:
+                        miembros[faceta].setdefault(valor, []).append(g)
+        orden_dia = {dia: i for i, dia in enumerate(logica.DIAS_SEMANA)}
+        claves_orden = {
+            'dia': lambda dia: (orden_dia.get(dia, len(orden_dia)), dia),
+            'turno': ('mañana', 'tarde', 'mixto').index,
+            'creditos': lambda creditos: creditos,
+        }
+        self._bitsets = {}
+        for faceta in FACETAS:
+            valores = sorted(miembros[faceta], key=claves_orden.get(faceta, str))
+            seleccion = np.zeros((len(valores), len(grupos)), dtype=bool)
+            for fila, valor in enumerate(valores):
+                seleccion[fila, miembros[faceta][valor]] = True
+            self._bitsets[faceta] = (valores, _empaquetar_bits(seleccion))
+
+    def _palabras_con(self, termino):
+        """Índices de las palabras del vocabulario que contienen `termino`."""
+        if len(termino) <= 3:
+            return list(self._ngramas.get(termino, ()))
+        conjuntos = sorted((self._ngramas.get(t, frozenset()) for t in _trigramas(termino)), key=len)
+        return [j for j in conjuntos[0].intersection(*conjuntos[1:]) if termino in self._vocabulario[j]]
+
+    def _puntaje(self, termino):
+        """Puntaje de cada materia para un término (0 si no aparece), en caché por término."""
+        if len(termino) == 1:
+            return self._puntajes_letra.get(termino, np.zeros(len(self._materias), dtype=np.int32))
+        puntaje = self._puntajes.get(termino)
+        if puntaje is None:
+            puntaje = self._puntajes[termino] = self._calcular_puntaje(termino)
+            if len(self._puntajes) > CONSULTAS_EN_CACHE:
+                self._puntajes.popitem(last=False)
+        else:
+            self._puntajes.move_to_end(termino)
+        return puntaje
+
+    def _calcular_puntaje(self, termino):
+        puntaje = np.zeros(len(self._materias), dtype=np.int32)
+        palabras = self._palabras_con(termino)
+        if not palabras:
+            return puntaje
+        # Entradas de todas las palabras que contienen el término, con el
+        # doble de peso en las que lo tienen como prefijo
+        inicio = self._inicio_palabra[palabras]
+        largo = self._inicio_palabra[np.array(palabras) + 1] - inicio
+        entradas = np.arange(largo.sum()) + np.repeat(inicio - (np.cumsum(largo) - largo), largo)
+        factor = np.repeat([2 if self._vocabulario[j].startswith(termino) else 1 for j in palabras], largo)
+        _acumular_maximo(puntaje, self._materia_entrada[entradas], self._peso_entrada[entradas] * factor)
+        # La palabra idéntica al término vale el cuádruple donde es el campo entero
+        j = self._posicion_palabra.get(termino)
+        if j is not None:
+            entradas = slice(self._inicio_palabra[j], self._inicio_palabra[j + 1])
+            enteras = self._entera_entrada[entradas]
+            _acumular_maximo(puntaje, self._materia_entrada[entradas][enteras], self._peso_entrada[entradas][enteras] * 4)
+        return puntaje
+
+    def _resolver(self, terminos):
+        total = np.zeros(len(self._materias), dtype=np.int32)
+        coinciden = np.ones(len(self._materias), dtype=bool)
+        for termino in terminos:
+            puntaje = self._puntaje(termino)
+            coinciden &= puntaje > 0
+            total += puntaje
+        ids = np.flatnonzero(coinciden)
+        # Mayor puntaje primero; a igual puntaje, el orden del catálogo
+        return ids[np.argsort(-total[ids], kind="stable")]
+
+
+def _medir(indice, consultas, repeticiones=50):
+    """
+    Por consulta, la mediana en ms con las cachés vacías, la de sus facetas
+    (con la búsqueda ya resuelta) y la de la tecla más lenta al escribirla
+    letra por letra.
+    """
+    tiempos = {}
+    for consulta in consultas:
+        frias, facetas, peores = [], [], []
+        for _ in range(repeticiones):
+            indice._consultas.clear()
+            indice._puntajes.clear()
+            indice._conteos.clear()
+            inicio = time.perf_counter()
+            resultados = indice.buscar(consulta)
+            frias.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            indice.facetas(consulta)
+            facetas.append(time.perf_counter() - inicio)
+            indice._consultas.clear()
+            indice._puntajes.clear()
+            peor = 0.0
+            for n in range(1, len(consulta) + 1):
+                inicio = time.perf_counter()
+                indice.buscar(consulta[:n])
+                peor = max(peor, time.perf_counter() - inicio)
+            peores.append(peor)
+        tiempos[consulta] = (1000 * statistics.median(frias), 1000 * statistics.median(facetas),
+                             1000 * statistics.median(peores), len(resultados))
+    return tiempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca materias por código, nombre, docente, salón o día.")
+    parser.add_argument("texto", nargs="*", help="Texto a buscar")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    parser.add_argument("--benchmark", type=int, default=None, metavar="SESIONES",
+                        help="Mide consultas típicas sobre un catálogo sintético de SESIONES sesiones")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    if args.benchmark:
+        conn = catalogo_compacto.base_sintetica(args.benchmark)
+        try:
+            catalogo = catalogo_compacto.cargar_catalogo(conn)
+        finally:
+            conn.close()
+        inicio = time.perf_counter()
+        indice = IndiceBusqueda(catalogo)
+        print(f"Índice de {len(indice)} materias ({args.benchmark} sesiones) construido en "
+              f"{1000 * (time.perf_counter() - inicio):.1f} ms")
+        consultas = args.texto or ["1234", "sintetica 12", "docente 0042", "a041", "miercoles", "materia"]
+        print(f"  {'consulta':20} {'en frío':>11} {'facetas':>11} {'peor tecla':>11}")
+        for consulta, (fria, facetas, peor_tecla, encontradas) in _medir(indice, consultas).items():
+            print(f"  {consulta!r:20} {fria:8.3f} ms {facetas:8.3f} ms {peor_tecla:8.3f} ms  ({encontradas} materias)")
+        return 0
+
+    catalogo = catalogo_compacto.cargar_catalogo_rapido(args.db)
+    if catalogo is None:
+        return 1
+    inicio = time.perf_counter()
+    materias = IndiceBusqueda(catalogo).buscar(" ".join(args.texto))
+    for materia in materias:
+        print(f"{materia.codigo:>8}  {materia.nombre}")
+    print(f"{len(materias)} materias ({1000 * (time.perf_counter() - inicio):.1f} ms con la construcción del índice)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
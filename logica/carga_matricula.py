@@ -0,0 +1,180 @@
+# PROYECTO_RAIZ/logica/carga_matricula.py
+#
+# Prueba de carga de la matrícula concurrente:
+#
+#     python -m logica.carga_matricula --procesos 4 --hilos 50 --intentos 20
+#
+# Trabaja sobre una copia temporal de la base de datos (la original no se toca):
+# cada hilo es un estudiante con su propia conexión que intenta matricular
+# grupos al azar y cancelar algunos. Al final se verifica que ningún grupo
+# vendió más cupos de los que tenía y se reportan transacciones por segundo y
+# tiempo de espera por el bloqueo de escritura.
+
+import sys
+import os
+import time
+import logging
+import random
+import shutil
+import sqlite3
+import tempfile
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import matricula
+from logica.batch import percentil, PERCENTILES_REPORTADOS
+
+
+def preparar_base(ruta_origen, ruta_destino, cupos):
+    """Copia la base de datos, fija `cupos` en todos los grupos y limpia matrículas previas."""
+    shutil.copyfile(ruta_origen, ruta_destino)
+    conn = matricula.abrir_conexion_matricula(ruta_destino)
+    try:
+        conn.execute("BEGIN")
+        conn.execute("UPDATE GruposMateria SET cupos = ?", (cupos,))
+        conn.execute("DELETE FROM Matriculas")
+        conn.execute("DELETE FROM ListaEspera")
+        conn.execute("DELETE FROM OcupacionEstudiantes")
+        conn.execute("COMMIT")
+        return [fila[0] for fila in conn.execute(
+            "SELECT DISTINCT id_grupo_materia_fk FROM SesionesClase ORDER BY id_grupo_materia_fk")]
+    finally:
+        conn.close()
+
+
+def _simular_estudiante(ruta_db, id_estudiante, grupos, intentos, prob_cancelar, semilla, resultado):
+    rng = random.Random(semilla)
+    conn = matricula.abrir_conexion_matricula(ruta_db)
+    metricas = {}
+    estados = Counter()
+    esperas = []
+    matriculados = []
+    try:
+        for _ in range(intentos):
+            antes = metricas.get('espera_bloqueo_s', 0.0)
+            try:
+                if matriculados and rng.random() < prob_cancelar:
+                    id_grupo = matriculados.pop(rng.randrange(len(matriculados)))
+                    estado, _ = matricula.cancelar_matricula(conn, id_estudiante, id_grupo, metricas)
+                else:
+                    id_grupo = rng.choice(grupos)
+                    estado = matricula.matricular(conn, id_estudiante, id_grupo, metricas=metricas)
+                    if estado == matricula.MATRICULADO:
+                        matriculados.append(id_grupo)
+            except sqlite3.Error as e:
+                estado = f"error: {e}"
+            estados[estado] += 1
+            esperas.append((metricas.get('espera_bloqueo_s', 0.0) - antes) * 1000)
+    finally:
+        conn.close()
+    resultado.append((estados, esperas, metricas.get('transacciones', 0)))
+
+
+def ejecutar_proceso(ruta_db, numero_proceso, hilos, grupos, intentos, prob_cancelar, semilla):
+    """Lanza `hilos` estudiantes concurrentes en este proceso; devuelve (estados, esperas_ms, transacciones)."""
+    resultado = []
+    trabajadores = [
+        threading.Thread(target=_simular_estudiante, args=(
+            ruta_db, f"P{numero_proceso}-E{h}", grupos, intentos, prob_cancelar,
+            semilla * 1_000_003 + numero_proceso * 1009 + h, resultado))
+        for h in range(hilos)
+    ]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+
+    estados = Counter()
+    esperas = []
+    transacciones = 0
+    for estados_hilo, esperas_hilo, transacciones_hilo in resultado:
+        estados.update(estados_hilo)
+        esperas.extend(esperas_hilo)
+        transacciones += transacciones_hilo
+    return estados, esperas, transacciones
+
+
+def verificar_cupos(ruta_db, cupos_iniciales):
+    """Devuelve los grupos cuyo cupo restante más sus matrículas no suma `cupos_iniciales`."""
+    conn = db_manager.crear_conexion(ruta_db)
+    try:
+        return conn.execute("""
+            SELECT G.id_grupo_materia, G.cupos, COUNT(M.id_matricula)
+            FROM GruposMateria AS G
+            LEFT JOIN Matriculas AS M ON M.id_grupo_materia_fk = G.id_grupo_materia
+            GROUP BY G.id_grupo_materia
+            HAVING G.cupos < 0 OR G.cupos + COUNT(M.id_matricula) != ?
+        """, (cupos_iniciales,)).fetchall()
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la matrícula concurrente sobre SQLite.")
+    parser.add_argument("--procesos", type=int, default=2)
+    parser.add_argument("--hilos", type=int, default=50, help="Estudiantes concurrentes por proceso")
+    parser.add_argument("--intentos", type=int, default=20, help="Operaciones por estudiante")
+    parser.add_argument("--cupos", type=int, default=5, help="Cupos iniciales de cada grupo")
+    parser.add_argument("--prob-cancelar", type=float, default=0.1)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--db", default=None, help="Base de datos de origen (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+    # Cada hilo abre su conexión: se omiten los mensajes INFO de db_manager
+    logging.disable(logging.INFO)
+    # La migración se revisa una sola vez, antes de copiar la base y lanzar los hilos
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    conn.close()
+
+    directorio = tempfile.mkdtemp(prefix="carga_matricula_")
+    ruta_db = os.path.join(directorio, "horarios.db")
+    try:
+        grupos = preparar_base(args.db or db_manager.DATABASE_PATH, ruta_db, args.cupos)
+        estados = Counter()
+        esperas = []
+        transacciones = 0
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+            futuros = [
+                pool.submit(ejecutar_proceso, ruta_db, p, args.hilos, grupos, args.intentos,
+                            args.prob_cancelar, args.semilla)
+                for p in range(args.procesos)
+            ]
+            for futuro in futuros:
+                estados_proceso, esperas_proceso, transacciones_proceso = futuro.result()
+                estados.update(estados_proceso)
+                esperas.extend(esperas_proceso)
+                transacciones += transacciones_proceso
+        duracion = time.perf_counter() - inicio
+        invalidos = verificar_cupos(ruta_db, args.cupos)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    esperas.sort()
+    print(f"{args.procesos} procesos x {args.hilos} hilos, {sum(estados.values())} operaciones en {duracion:.2f} s")
+    print(f"Transacciones confirmadas: {transacciones} ({transacciones / duracion:.1f}/s)")
+    if esperas:
+        resumen = ", ".join(f"p{p} {percentil(esperas, p):.2f}" for p in PERCENTILES_REPORTADOS)
+        print(f"Espera por bloqueo (ms): media {sum(esperas) / len(esperas):.2f}, {resumen}, máx {esperas[-1]:.2f}")
+    for estado, cantidad in estados.most_common():
+        print(f"  {estado}: {cantidad}")
+    if invalidos:
+        print(f"ERROR: {len(invalidos)} grupos con cupos inconsistentes, p. ej. {invalidos[:5]}")
+        return 1
+    print("Cupos consistentes en todos los grupos.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,449 @@
+# PROYECTO_RAIZ/logica/catalogo.py
+#
+# Catálogo compacto en memoria para las interfaces: Materia, Grupo y Sesion
+# con __slots__, IDs enteros (posición en las listas del catálogo) y textos
+# internados, de modo que un docente, un salón, un día o una hora repetidos en
+# miles de sesiones son un único objeto. Cada sesión apunta a su grupo y cada
+# grupo a su materia, así que una celda del horario guarda solo la sesión.
+#
+# Al arrancar, `cargar_catalogo_rapido` lo lee de una instantánea binaria y
+# solo consulta SQLite cuando la base cambió desde la última vez.
+#
+#     python -m logica.catalogo --benchmark 10000                 # memoria contra los dicts anidados
+#     python -m logica.catalogo --benchmark 10000 --instantanea   # tiempo de carga SQLite vs. instantánea
+
+import sys
+import os
+import gc
+import mmap
+import time
+import struct
+import sqlite3
+import tempfile
+import random
+import hashlib
+import logging
+import argparse
+import tracemalloc
+from array import array
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+
+
+class Materia:
+    __slots__ = ('id', 'codigo', 'nombre', 'creditos', 'grupos')
+
+    def __init__(self, id, codigo, nombre, creditos):
+        self.id = id
+        self.codigo = codigo
+        self.nombre = nombre
+        self.creditos = creditos
+        self.grupos = []
+
+    def __repr__(self):
+        return f"Materia({self.codigo!r}, {self.nombre!r})"
+
+
+class Grupo:
+    __slots__ = ('id', 'id_db', 'materia', 'nombre', 'cupos', 'sesiones')
+
+    def __init__(self, id, id_db, materia, nombre, cupos):
+        self.id = id
+        self.id_db = id_db
+        self.materia = materia
+        self.nombre = nombre
+        self.cupos = cupos
+        self.sesiones = []
+
+    @property
+    def docente(self):
+        """Docente de la primera sesión, como lo mostraba la interfaz."""
+        return self.sesiones[0].docente if self.sesiones else None
+
+    def __repr__(self):
+        return f"Grupo({self.materia.codigo!r}, {self.nombre!r}, id_db={self.id_db})"
+
+
+class Sesion:
+    __slots__ = ('id', 'id_db', 'grupo', 'tipo', 'dia', 'hora_inicio', 'hora_fin', 'docente', 'salon')
+
+    def __init__(self, id, id_db, grupo, tipo, dia, hora_inicio, hora_fin, docente, salon):
+        self.id = id
+        self.id_db = id_db
+        self.grupo = grupo
+        self.tipo = tipo
+        self.dia = dia
+        self.hora_inicio = hora_inicio
+        self.hora_fin = hora_fin
+        self.docente = docente
+        self.salon = salon
+
+    def __repr__(self):
+        return f"Sesion({self.id_db}, {self.dia!r}, {self.hora_inicio!r}-{self.hora_fin!r})"
+
+
+class Catalogo:
+    """Materias, grupos y sesiones indexados por su ID entero; materias también por código."""
+    __slots__ = ('materias', 'grupos', 'sesiones', '_por_codigo')
+
+    def __init__(self):
+        self.materias = []
+        self.grupos = []
+        self.sesiones = []
+        self._por_codigo = {}
+
+    def __len__(self):
+        return len(self.materias)
+
+    def __iter__(self):
+        return iter(self.materias)
+
+    def materia(self, codigo):
+        """La materia con ese código, o None."""
+        return self._por_codigo.get(codigo)
+
+
+def _internar(texto):
+    return sys.intern(texto) if isinstance(texto, str) else texto
+
+
+def catalogo_desde_filas(filas):
+    """
+    Construye el catálogo a partir de las filas de
+    `db_manager.obtener_sesiones_catalogo`, conservando su orden. Las materias
+    sin grupos y los grupos sin sesiones quedan con la lista vacía.
+    """
+    catalogo = Catalogo()
+    grupos_por_id = {}
+    for (codigo, nombre, creditos, id_grupo, nombre_grupo, cupos, id_sesion, tipo_sesion,
+         dia, hora_inicio, hora_fin, docente, salon) in filas:
+        materia = catalogo._por_codigo.get(codigo)
+        if materia is None:
+            materia = Materia(len(catalogo.materias), _internar(codigo), nombre, creditos or 0)
+            catalogo.materias.append(materia)
+            catalogo._por_codigo[materia.codigo] = materia
+        if id_grupo is None:
+            continue
+        grupo = grupos_por_id.get(id_grupo)
+        if grupo is None:
+            grupo = Grupo(len(catalogo.grupos), id_grupo, materia, _internar(nombre_grupo), cupos)
+            catalogo.grupos.append(grupo)
+            materia.grupos.append(grupo)
+            grupos_por_id[id_grupo] = grupo
+        if id_sesion is None:
+            continue
+        sesion = Sesion(len(catalogo.sesiones), id_sesion, grupo, _internar(tipo_sesion), _internar(dia),
+                        _internar(hora_inicio), _internar(hora_fin), _internar(docente), _internar(salon))
+        catalogo.sesiones.append(sesion)
+        grupo.sesiones.append(sesion)
+    return catalogo
+
+
+def cargar_catalogo(conn):
+    """Carga el catálogo compacto con una sola consulta a la base de datos."""
+    return catalogo_desde_filas(db_manager.obtener_sesiones_catalogo(conn))
+
+
+# --- Instantánea binaria ---
+# Archivo junto a la base (horarios.db.catalogo) con el catálogo empaquetado
+# con struct: encabezado, tabla de textos y tres arreglos de registros de
+# tamaño fijo que apuntan a los textos por índice. Se invalida con una huella
+# de la base tomada del encabezado del archivo SQLite (contador de cambios y
+# cookie del esquema) y del tamaño y mtime de la base y de su -wal, sin abrir
+# una conexión; `PRAGMA data_version` no sirve aquí porque solo distingue
+# cambios dentro de una misma conexión. El formato 2 descarta las instantáneas
+# vacías que se guardaban cuando la consulta del catálogo fallaba.
+FORMATO_INSTANTANEA = 2
+_MAGIA = b"CATH"
+_ENCABEZADO = struct.Struct("<4sH32s5I")      # magia, formato, huella, textos, bytes de textos, materias, grupos, sesiones
+_MATERIA = struct.Struct("<IIi")              # codigo, nombre, creditos
+_GRUPO = struct.Struct("<qIIi")               # id_db, materia, nombre, cupos
+_SESION = struct.Struct("<qI6I")              # id_db, grupo, tipo, dia, hora_inicio, hora_fin, docente, salon
+_SIN_TEXTO = 0xFFFFFFFF
+_SIN_CUPOS = -1
+
+
+def ruta_instantanea(ruta_db=None):
+    return (ruta_db or db_manager.DATABASE_PATH) + ".catalogo"
+
+
+def huella_base(ruta_db=None):
+    """
+    Huella de 32 bytes que cambia cuando cambian los datos o el esquema de la
+    base; None si el archivo no existe.
+    """
+    ruta_db = ruta_db or db_manager.DATABASE_PATH
+    try:
+        with open(ruta_db, "rb") as archivo:
+            encabezado = archivo.read(100)
+        partes = [FORMATO_INSTANTANEA, encabezado[24:28].hex(), encabezado[40:44].hex()]
+        for ruta in (ruta_db, ruta_db + "-wal"):
+            if os.path.exists(ruta):
+                estado = os.stat(ruta)
+                partes += [estado.st_size, estado.st_mtime_ns]
+    except OSError:
+        return None
+    return hashlib.sha256(repr(partes).encode()).digest()
+
+
+def guardar_instantanea(catalogo, ruta, huella):
+    """Escribe el catálogo en `ruta` (de forma atómica, vía un archivo temporal)."""
+    textos = {}
+
+    def indice(texto):
+        if texto is None:
+            return _SIN_TEXTO
+        return textos.setdefault(texto, len(textos))
+
+    materias = b"".join(_MATERIA.pack(indice(m.codigo), indice(m.nombre), m.creditos)
+                        for m in catalogo.materias)
+    grupos = b"".join(_GRUPO.pack(g.id_db, g.materia.id, indice(g.nombre), _SIN_CUPOS if g.cupos is None else g.cupos)
+                      for g in catalogo.grupos)
+    sesiones = b"".join(_SESION.pack(s.id_db, s.grupo.id, indice(s.tipo), indice(s.dia), indice(s.hora_inicio),
+                                     indice(s.hora_fin), indice(s.docente), indice(s.salon))
+                        for s in catalogo.sesiones)
+    codificados = [texto.encode("utf-8") for texto in textos]
+    longitudes = array("I", map(len, codificados)).tobytes()
+    datos_textos = b"".join(codificados)
+    encabezado = _ENCABEZADO.pack(_MAGIA, FORMATO_INSTANTANEA, huella, len(codificados), len(datos_textos),
+                                  len(catalogo.materias), len(catalogo.grupos), len(catalogo.sesiones))
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(encabezado + longitudes + datos_textos + materias + grupos + sesiones)
+    os.replace(temporal, ruta)
+
+
+def leer_instantanea(ruta, huella=None):
+    """
+    Carga el catálogo de la instantánea en `ruta`. Devuelve None si no existe,
+    es de otro formato, está incompleta o su huella no coincide con `huella`.
+    """
+    try:
+        with open(ruta, "rb") as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            if len(datos) < _ENCABEZADO.size:
+                return None
+            magia, formato, huella_guardada, num_textos, bytes_textos, num_materias, num_grupos, num_sesiones = \
+                _ENCABEZADO.unpack_from(datos)
+            if magia != _MAGIA or formato != FORMATO_INSTANTANEA or (huella is not None and huella_guardada != huella):
+                return None
+            posicion = _ENCABEZADO.size
+            tamanos = (4 * num_textos, bytes_textos, _MATERIA.size * num_materias,
+                       _GRUPO.size * num_grupos, _SESION.size * num_sesiones)
+            if len(datos) != posicion + sum(tamanos):
+                return None
+            secciones = []
+            for tamano in tamanos:
+                secciones.append(datos[posicion:posicion + tamano])
+                posicion += tamano
+    except (OSError, ValueError, struct.error):
+        return None
+    longitudes, datos_textos, materias, grupos, sesiones = secciones
+
+    textos = []
+    inicio = 0
+    for longitud in array("I", longitudes):
+        textos.append(sys.intern(datos_textos[inicio:inicio + longitud].decode("utf-8")))
+        inicio += longitud
+    textos = tuple(textos)
+
+    def texto(i):
+        return None if i == _SIN_TEXTO else textos[i]
+
+    catalogo = Catalogo()
+    for codigo, nombre, creditos in _MATERIA.iter_unpack(materias):
+        materia = Materia(len(catalogo.materias), textos[codigo], textos[nombre], creditos)
+        catalogo.materias.append(materia)
+        catalogo._por_codigo[materia.codigo] = materia
+    for id_db, id_materia, nombre, cupos in _GRUPO.iter_unpack(grupos):
+        materia = catalogo.materias[id_materia]
+        grupo = Grupo(len(catalogo.grupos), id_db, materia, texto(nombre), None if cupos == _SIN_CUPOS else cupos)
+        catalogo.grupos.append(grupo)
+        materia.grupos.append(grupo)
+    for id_db, id_grupo, tipo, dia, hora_inicio, hora_fin, docente, salon in _SESION.iter_unpack(sesiones):
+        grupo = catalogo.grupos[id_grupo]
+        sesion = Sesion(len(catalogo.sesiones), id_db, grupo, texto(tipo), texto(dia),
+                        texto(hora_inicio), texto(hora_fin), texto(docente), texto(salon))
+        catalogo.sesiones.append(sesion)
+        grupo.sesiones.append(sesion)
+    return catalogo
+
+
+def cargar_catalogo_rapido(ruta_db=None, conn=None):
+    """
+    Carga el catálogo desde la instantánea de la base si está vigente; si no,
+    lo reconstruye desde SQLite (con `conn` o una conexión nueva) y reescribe
+    la instantánea. Si la consulta falla se propaga el sqlite3.Error y la
+    instantánea no se toca; un error al escribirla solo se registra.
+    """
+    ruta_db = ruta_db or db_manager.DATABASE_PATH
+    ruta = ruta_instantanea(ruta_db)
+    huella = huella_base(ruta_db)
+    if huella is not None:
+        catalogo = leer_instantanea(ruta, huella)
+        if catalogo is not None:
+            return catalogo
+
+    conexion = conn or db_manager.crear_conexion_migrada(ruta_db)
+    if not conexion:
+        return None
+    try:
+        # La huella se toma antes de leer: si la base cambia mientras tanto,
+        # la instantánea queda vieja y se reconstruye en el próximo arranque
+        huella = huella_base(ruta_db)
+        catalogo = cargar_catalogo(conexion)
+    finally:
+        if conn is None:
+            conexion.close()
+    # Solo se llega aquí si la consulta terminó bien: un catálogo vacío es una base vacía
+    if huella is not None:
+        try:
+            guardar_instantanea(catalogo, ruta, huella)
+        except OSError as e:
+            logging.warning(f"No se pudo guardar la instantánea del catálogo en {ruta}: {e}")
+    return catalogo
+
+
+# --- Benchmark de memoria ---
+def base_sintetica(num_sesiones, semilla=0, sesiones_por_grupo=2, grupos_por_materia=4,
+                   num_docentes=300, num_salones=80):
+    """Base de datos en memoria con un catálogo sintético de `num_sesiones` sesiones."""
+    azar = random.Random(semilla)
+    conn = db_manager.crear_conexion(":memory:")
+    db_manager.crear_tablas(conn)
+    docentes = [(f"DOCENTE {i:04d} APELLIDO NOMBRE",) for i in range(num_docentes)]
+    salones = [(f"Aula A{i:03d} (BLOQUE TECNOLOGICO)",) for i in range(num_salones)]
+    conn.executemany("INSERT INTO Docentes(nombre) VALUES(?)", docentes)
+    conn.executemany("INSERT INTO Salones(nombre) VALUES(?)", salones)
+    por_materia = sesiones_por_grupo * grupos_por_materia
+    num_materias = -(-num_sesiones // por_materia)
+    conn.executemany("INSERT INTO Materias(codigo_materia, nombre_materia, creditos) VALUES(?,?,3)",
+                     ((f"{1000 + m}", f"MATERIA SINTETICA {m}") for m in range(num_materias)))
+    grupos = []
+    sesiones = []
+    for id_sesion in range(num_sesiones):
+        id_grupo = id_sesion // sesiones_por_grupo + 1
+        if id_sesion % sesiones_por_grupo == 0:
+            grupos.append((id_grupo, f"{1000 + id_sesion // por_materia}",
+                           f"Grupo {(id_grupo - 1) % grupos_por_materia + 1}"))
+            docente = azar.randrange(num_docentes) + 1
+        hora = azar.randrange(7, 19)
+        sesiones.append((id_grupo, "TEORICA" if azar.random() < 0.6 else "PRACTICA",
+                         azar.choice(logica.DIAS_SEMANA[:5]), f"{hora:02d}:00", f"{hora + 2:02d}:00",
+                         docente, azar.randrange(num_salones) + 1))
+    conn.executemany("INSERT INTO GruposMateria(id_grupo_materia, codigo_materia_fk, nombre_grupo, cupos) VALUES(?,?,?,30)",
+                     grupos)
+    conn.executemany("""INSERT INTO SesionesClase(id_grupo_materia_fk, tipo_sesion, dia_semana, hora_inicio, hora_fin,
+                                                  id_docente_fk, id_salon_fk) VALUES(?,?,?,?,?,?,?)""", sesiones)
+    conn.commit()
+    return conn
+
+
+def catalogo_dicts(filas):
+    """Representación anterior de la interfaz: dicts anidados y un dict de siete claves por sesión."""
+    materias_data = {}
+    for (codigo, nombre, creditos, id_grupo, nombre_grupo, cupos, id_sesion, tipo_sesion,
+         dia, hora_inicio, hora_fin, docente, salon) in filas:
+        materia = materias_data.setdefault(codigo, {'nombre': nombre, 'creditos': creditos or 0, 'grupos': {}})
+        if id_sesion is None:
+            continue
+        horario = {'dia_semana': dia, 'hora_inicio': hora_inicio, 'hora_fin': hora_fin, 'nombre_grupo': nombre_grupo,
+                   'docente': docente, 'salon': salon, 'tipo_sesion': tipo_sesion}
+        grupo = materia['grupos'].setdefault(nombre_grupo, {'sesiones': [], 'docente': docente})
+        grupo['sesiones'].append(horario)
+    return materias_data
+
+
+def medir_memoria(construir, conn):
+    """
+    Bytes que quedan en memoria tras leer el catálogo de `conn`, construir la
+    representación y liberar las filas.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        filas = db_manager.obtener_sesiones_catalogo(conn)
+        representacion = construir(filas)
+        del filas
+        gc.collect()
+        actual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del representacion
+    return actual
+
+
+def medir_instantanea(ruta_db, repeticiones=5):
+    """Mejor tiempo (s) de carga desde SQLite y desde la instantánea vigente."""
+    conn = db_manager.crear_conexion_migrada(ruta_db)
+    if conn is None:
+        return None
+    try:
+        desde_sqlite = min(_cronometrar(cargar_catalogo, conn) for _ in range(repeticiones))
+    finally:
+        conn.close()
+    cargar_catalogo_rapido(ruta_db)
+    desde_instantanea = min(_cronometrar(leer_instantanea, ruta_instantanea(ruta_db), huella_base(ruta_db))
+                            for _ in range(repeticiones))
+    return desde_sqlite, desde_instantanea
+
+
+def _cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide la memoria y el tiempo de carga del catálogo compacto.")
+    parser.add_argument("--benchmark", type=int, default=10000, metavar="SESIONES",
+                        help="Número de sesiones del catálogo sintético (por defecto 10000)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--instantanea", action="store_true",
+                        help="Mide la carga desde SQLite contra la instantánea binaria")
+    parser.add_argument("--db", default=None,
+                        help="Con --instantanea, base a medir (por defecto, una sintética de --benchmark sesiones)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    if args.instantanea:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta_db = args.db
+            if ruta_db is None:
+                ruta_db = os.path.join(directorio, "sintetica.db")
+                memoria = base_sintetica(args.benchmark, args.semilla)
+                destino = sqlite3.connect(ruta_db)
+                memoria.backup(destino)
+                destino.close()
+                memoria.close()
+            tiempos = medir_instantanea(ruta_db)
+        if tiempos is None:
+            return 1
+        desde_sqlite, desde_instantanea = tiempos
+        print(f"Carga del catálogo de {ruta_db if args.db else f'{args.benchmark} sesiones'}")
+        print(f"  desde SQLite:       {1000 * desde_sqlite:8.1f} ms")
+        print(f"  desde instantánea:  {1000 * desde_instantanea:8.1f} ms")
+        return 0
+
+    conn = base_sintetica(args.benchmark, args.semilla)
+    try:
+        anterior = medir_memoria(catalogo_dicts, conn)
+        compacto = medir_memoria(catalogo_desde_filas, conn)
+    finally:
+        conn.close()
+    print(f"Catálogo de {args.benchmark} sesiones")
+    print(f"  dicts anidados:     {anterior / 1024:10.1f} KiB ({anterior / args.benchmark:6.1f} B por sesión)")
+    print(f"  catálogo compacto:  {compacto / 1024:10.1f} KiB ({compacto / args.benchmark:6.1f} B por sesión)")
+    print(f"  reducción:          {100 * (1 - compacto / anterior):9.1f} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
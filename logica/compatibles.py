@@ -0,0 +1,123 @@
+# PROYECTO_RAIZ/logica/compatibles.py
+#
+# "¿Qué cabe ahora?" para el armado manual del horario: a partir de la máscara
+# de ocupación de un EstadoHorario (la misma de logica.mascara_franja) calcula,
+# tras cada alta o baja, en una sola pasada vectorizada qué grupos del
+# catálogo todavía caben. Las máscaras de todos los grupos están en una matriz
+# de numpy con una fila por palabra de 64 bits y una columna por grupo; un grupo
+# cabe si el AND de su columna con la ocupación es cero (las palabras en que el
+# horario está libre ni se miran) y su materia no está ya en el horario.
+#
+#     python -m logica.compatibles --benchmark 200000   # tiempo por alta en un catálogo sintético
+
+import sys
+import os
+import time
+import random
+import logging
+import argparse
+import statistics
+
+import numpy as np
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from logica import logica
+from logica import catalogo as catalogo_compacto
+from logica.estado_horario import EstadoHorario, mascara_grupo
+
+_PALABRAS = -(-logica.BYTES_MASCARA // 8)
+
+
+class BuscadorCompatibles:
+    """
+    Grupos del catálogo que caben en un EstadoHorario. `compatibles` devuelve
+    un arreglo booleano indexado por el ID del grupo, recalculado solo si el
+    estado cambió de versión.
+    """
+
+    def __init__(self, catalogo):
+        self.catalogo = catalogo
+        grupos = catalogo.grupos
+        crudo = bytearray(len(grupos) * _PALABRAS * 8)
+        self._validos = np.ones(len(grupos), dtype=bool)
+        for grupo in grupos:
+            try:
+                mascara = mascara_grupo(grupo)
+            except ValueError as e:
+                logging.warning(f"Grupo {grupo.nombre} de {grupo.materia.codigo} nunca cabe: {e}")
+                self._validos[grupo.id] = False
+                continue
+            inicio = grupo.id * _PALABRAS * 8
+            crudo[inicio:inicio + _PALABRAS * 8] = mascara.to_bytes(_PALABRAS * 8, "little")
+        self._mascaras = np.ascontiguousarray(np.frombuffer(crudo, dtype="<u8").reshape(len(grupos), _PALABRAS).T)
+        self._materia_grupo = np.array([grupo.materia.id for grupo in grupos], dtype=np.int64)
+        self._estado = None
+        self._version = None
+        self._compatibles = None
+
+    def compatibles(self, estado):
+        """Arreglo booleano por ID de grupo: True si el grupo cabe en el horario del estado."""
+        if self._estado is not estado or self._version != estado.version:
+            choques = np.zeros(len(self._validos), dtype=np.uint64)
+            for p in range(_PALABRAS):
+                palabra = (estado.ocupacion >> (64 * p)) & 0xFFFFFFFFFFFFFFFF
+                if palabra:
+                    choques |= self._mascaras[p] & np.uint64(palabra)
+            libres = (choques == 0) & self._validos
+            if estado.materias:
+                inscritas = np.zeros(len(self.catalogo.materias), dtype=bool)
+                inscritas[list(estado.materias)] = True
+                libres &= ~inscritas[self._materia_grupo]
+            libres.flags.writeable = False
+            self._estado, self._version, self._compatibles = estado, estado.version, libres
+        return self._compatibles
+
+    def cabe(self, grupo, estado):
+        return bool(self.compatibles(estado)[grupo.id])
+
+    def materias_compatibles(self, estado):
+        """Arreglo booleano por ID de materia: True si alguno de sus grupos cabe."""
+        return np.bincount(self._materia_grupo, weights=self.compatibles(estado),
+                           minlength=len(self.catalogo.materias)) > 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el cálculo de los grupos que caben en un horario.")
+    parser.add_argument("--benchmark", type=int, default=20000, metavar="SESIONES",
+                        help="Número de sesiones del catálogo sintético (por defecto 20000)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    conn = catalogo_compacto.base_sintetica(args.benchmark, args.semilla)
+    try:
+        catalogo = catalogo_compacto.cargar_catalogo(conn)
+    finally:
+        conn.close()
+    inicio = time.perf_counter()
+    buscador = BuscadorCompatibles(catalogo)
+    print(f"{len(catalogo.grupos)} grupos indexados en {1000 * (time.perf_counter() - inicio):.1f} ms")
+
+    azar = random.Random(args.semilla)
+    estado = EstadoHorario()
+    tiempos = []
+    while True:
+        inicio = time.perf_counter()
+        caben = np.flatnonzero(buscador.compatibles(estado))
+        tiempos.append(time.perf_counter() - inicio)
+        if not len(caben):
+            break
+        estado.agregar(catalogo.grupos[int(caben[azar.randrange(len(caben))])])
+    print(f"  {len(tiempos) - 1} grupos agregados hasta llenar el horario")
+    print(f"  por alta: mediana {1000 * statistics.median(tiempos):.3f} ms, máximo {1000 * max(tiempos):.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
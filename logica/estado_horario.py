@@ -0,0 +1,217 @@
+# PROYECTO_RAIZ/logica/estado_horario.py
+#
+# Estado del horario que se arma a mano, sin depender de Tk: las celdas de la
+# grilla ocupadas ({(dia, "HH:MM"): Sesion}, una por hora como las pinta la
+# interfaz), la máscara de ocupación de logica.mascara_franja, el índice grupo
+# -> celdas, los créditos y las materias inscritas. Agregar o quitar un grupo
+# solo toca sus propias celdas; nada recorre el horario completo.
+#
+#     python -m logica.estado_horario --benchmark 20000   # altas y bajas contra recorrer las celdas
+
+import sys
+import os
+import time
+import random
+from datetime import datetime, timedelta
+import logging
+import argparse
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from logica import logica
+from logica import catalogo as catalogo_compacto
+
+
+def mascara_grupo(grupo):
+    """Máscara de ocupación de las sesiones de un grupo del catálogo compacto (ValueError si alguna no es válida)."""
+    mascara = 0
+    for sesion in grupo.sesiones:
+        mascara |= logica.mascara_franja(sesion.dia, sesion.hora_inicio, sesion.hora_fin)
+    return mascara
+
+
+def celdas_grupo(grupo):
+    """Celdas ((dia, "HH:MM"), sesion) de la grilla que ocupa el grupo: una por hora desde el inicio de cada sesión."""
+    celdas = []
+    for sesion in grupo.sesiones:
+        minuto = logica.hora_a_minutos(sesion.hora_inicio)
+        fin = logica.hora_a_minutos(sesion.hora_fin)
+        while minuto < fin:
+            celdas.append(((sesion.dia, f"{minuto // 60:02d}:{minuto % 60:02d}"), sesion))
+            minuto += 60
+    return celdas
+
+
+class EstadoHorario:
+    """
+    Grupos elegidos para el horario. Un grupo entra solo si no choca con lo
+    ya elegido (ni en la máscara ni en las celdas) y su materia no está, así
+    que sus bloques nunca se comparten y quitarlo es restar su máscara.
+    `version` aumenta con cada cambio.
+    """
+
+    def __init__(self):
+        self.celdas = {}  # {(dia, hora): Sesion}
+        self.materias = {}  # {id de la materia: grupo}
+        self.ocupacion = 0
+        self.creditos = 0
+        self.version = 0
+        self._grupos = {}  # {id del grupo: (grupo, máscara, celdas)}
+        self._franjas = {}  # {id del grupo: (máscara o None si no es válida, {celda: sesion})}
+
+    def __len__(self):
+        return len(self._grupos)
+
+    def __contains__(self, grupo):
+        return grupo.id in self._grupos
+
+    def grupos(self):
+        return [grupo for grupo, _, _ in self._grupos.values()]
+
+    def grupo_en(self, dia, hora):
+        """Grupo que ocupa la celda, o None."""
+        sesion = self.celdas.get((dia, hora))
+        return sesion.grupo if sesion is not None else None
+
+    def _franjas_de(self, grupo):
+        franjas = self._franjas.get(grupo.id)
+        if franjas is None:
+            try:
+                mascara = mascara_grupo(grupo)
+            except ValueError as e:
+                logging.warning(f"Grupo {grupo.nombre} de {grupo.materia.codigo} no se puede agregar: {e}")
+                mascara = None
+            franjas = self._franjas[grupo.id] = (mascara, dict(celdas_grupo(grupo)))
+        return franjas
+
+    def conflictos(self, grupo):
+        """[(dia, hora, sesion ya asignada)] de las celdas del grupo que están ocupadas."""
+        return [(dia, hora, self.celdas[(dia, hora)]) for dia, hora in self._franjas_de(grupo)[1]
+                if (dia, hora) in self.celdas]
+
+    def cabe(self, grupo):
+        """True si el grupo puede agregarse tal como está el horario."""
+        if grupo.id in self._grupos or grupo.materia.id in self.materias:
+            return False
+        mascara, celdas = self._franjas_de(grupo)
+        return mascara is not None and not mascara & self.ocupacion and self.celdas.keys().isdisjoint(celdas)
+
+    def agregar(self, grupo):
+        """Agrega el grupo; False (sin cambiar nada) si no cabe."""
+        if not self.cabe(grupo):
+            return False
+        mascara, celdas = self._franjas_de(grupo)
+        self.celdas.update(celdas)
+        self._grupos[grupo.id] = (grupo, mascara, list(celdas))
+        self.materias[grupo.materia.id] = grupo
+        self.ocupacion |= mascara
+        self.creditos += grupo.materia.creditos
+        self.version += 1
+        return True
+
+    def quitar(self, grupo):
+        """Quita el grupo; False si no estaba."""
+        entrada = self._grupos.pop(grupo.id, None)
+        if entrada is None:
+            return False
+        _, mascara, celdas = entrada
+        for celda in celdas:
+            del self.celdas[celda]
+        del self.materias[grupo.materia.id]
+        self.ocupacion &= ~mascara
+        self.creditos -= grupo.materia.creditos
+        self.version += 1
+        return True
+
+    def quitar_en(self, dia, hora):
+        """Quita el grupo que ocupa la celda y lo devuelve (None si estaba libre)."""
+        grupo = self.grupo_en(dia, hora)
+        if grupo is not None:
+            self.quitar(grupo)
+        return grupo
+
+    def limpiar(self):
+        self.celdas.clear()
+        self.materias.clear()
+        self._grupos.clear()
+        self.ocupacion = 0
+        self.creditos = 0
+        self.version += 1
+
+
+def _agregar_recorriendo(celdas, grupo):
+    """Alta como la hacía la interfaz: valida y ocupa hora por hora y vuelve a contar las materias."""
+    for ocupar in (False, True):
+        for sesion in grupo.sesiones:
+            hora = datetime.strptime(sesion.hora_inicio, "%H:%M")
+            fin = datetime.strptime(sesion.hora_fin, "%H:%M")
+            while hora < fin:
+                celda = (sesion.dia, hora.strftime("%H:%M"))
+                if ocupar:
+                    celdas[celda] = sesion
+                elif celda in celdas:
+                    return None
+                hora += timedelta(hours=1)
+    return len({sesion.grupo.materia.id for sesion in celdas.values()})
+
+
+def _quitar_recorriendo(celdas, grupo):
+    """Baja como la hacía la interfaz: recorre todas las celdas buscando las del grupo."""
+    for celda in [celda for celda, sesion in celdas.items() if sesion.grupo is grupo]:
+        del celdas[celda]
+    return len({sesion.grupo.materia.id for sesion in celdas.values()})
+
+
+def _cronometrar(operacion, grupos):
+    inicio = time.perf_counter()
+    for grupo in grupos:
+        operacion(grupo)
+    return 1e6 * (time.perf_counter() - inicio) / len(grupos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide altas y bajas de grupos en el estado del horario.")
+    parser.add_argument("--benchmark", type=int, default=20000, metavar="SESIONES",
+                        help="Número de sesiones del catálogo sintético (por defecto 20000)")
+    parser.add_argument("--operaciones", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    conn = catalogo_compacto.base_sintetica(args.benchmark, args.semilla)
+    try:
+        catalogo = catalogo_compacto.cargar_catalogo(conn)
+    finally:
+        conn.close()
+
+    azar = random.Random(args.semilla)
+    estado = EstadoHorario()
+    for grupo in azar.sample(catalogo.grupos, len(catalogo.grupos)):
+        estado.agregar(grupo)
+    elegidos = estado.grupos()
+    print(f"Horario con {len(elegidos)} grupos y {len(estado.celdas)} celdas ocupadas")
+
+    # Cada vuelta quita y vuelve a poner todos los grupos, en otro orden
+    vueltas = max(1, args.operaciones // len(elegidos))
+    secuencia = [grupo for _ in range(vueltas) for grupo in azar.sample(elegidos, len(elegidos))]
+    celdas = dict(estado.celdas)
+    tiempos = {'baja': [0.0, 0.0], 'alta': [0.0, 0.0]}
+    for inicio in range(0, len(secuencia), len(elegidos)):
+        vuelta = secuencia[inicio:inicio + len(elegidos)]
+        tiempos['baja'][0] += _cronometrar(lambda g: (estado.quitar(g), len(estado.materias)), vuelta)
+        tiempos['alta'][0] += _cronometrar(lambda g: (estado.agregar(g), len(estado.materias)), vuelta)
+        tiempos['baja'][1] += _cronometrar(lambda g: _quitar_recorriendo(celdas, g), vuelta)
+        tiempos['alta'][1] += _cronometrar(lambda g: _agregar_recorriendo(celdas, g), vuelta)
+    print(f"  {'':6} {'incremental':>14} {'recorriendo':>14}")
+    for operacion, (incremental, recorriendo) in tiempos.items():
+        print(f"  {operacion:6} {incremental / vueltas:11.2f} µs {recorriendo / vueltas:11.2f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# PROYECTO_RAIZ/logica/logica.py
+
+import heapq
+import logging
+import unicodedata
+
+# Configuración de la jornada: cada día ocupa un carril de 32 bits en la máscara
+# de ocupación (bloques de 30 minutos entre las 06:00 y las 22:00).
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+HORA_INICIO_JORNADA = 6
+MINUTOS_POR_BLOQUE = 30
+BLOQUES_POR_DIA = 32
+MASCARA_DIA = (1 << BLOQUES_POR_DIA) - 1
+BYTES_MASCARA = len(DIAS_SEMANA) * BLOQUES_POR_DIA // 8
+INICIO_TARDE = 13 * 60  # Igual que en la interfaz: la tarde empieza a las 13:00
+
+LIMITE_COMBINACIONES = 20000
+
+
+def normalizar_texto(texto):
+    """Pasa el texto a minúsculas y le quita las tildes ("Miércoles" -> "miercoles")."""
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold().strip()
+
+
+_INDICE_DIAS = {normalizar_texto(dia): i for i, dia in enumerate(DIAS_SEMANA)}
+
+
+def indice_dia(dia):
+    """Devuelve el índice (0 = Lunes) de un nombre de día, con o sin tildes."""
+    try:
+        return _INDICE_DIAS[normalizar_texto(dia)]
+    except KeyError:
+        raise ValueError(f"Día de la semana desconocido: {dia}") from None
+
+
+def hora_a_minutos(hora):
+    """Convierte una cadena 'HH:MM' a minutos desde la medianoche."""
+    h, m = map(int, hora.split(":"))
+    return h * 60 + m
+
+
+def mascara_franja(dia, hora_inicio, hora_fin):
+    """Máscara de ocupación de la franja [hora_inicio, hora_fin) del día indicado."""
+    inicio = hora_a_minutos(hora_inicio) - HORA_INICIO_JORNADA * 60
+    fin = hora_a_minutos(hora_fin) - HORA_INICIO_JORNADA * 60
+    if inicio < 0 or fin > BLOQUES_POR_DIA * MINUTOS_POR_BLOQUE or fin <= inicio:
+        raise ValueError(f"Franja fuera de la jornada: {dia} {hora_inicio}-{hora_fin}")
+    primer_bloque = inicio // MINUTOS_POR_BLOQUE
+    ultimo_bloque = -(-fin // MINUTOS_POR_BLOQUE)
+    bits = ((1 << (ultimo_bloque - primer_bloque)) - 1) << primer_bloque
+    return bits << (indice_dia(dia) * BLOQUES_POR_DIA)
+
+
+def estadisticas_mascara(mascara):
+    """Devuelve (días con clase, bloques libres entre clases) de una máscara de ocupación."""
+    dias = huecos = 0
+    for d in range(len(DIAS_SEMANA)):
+        carril = (mascara >> (d * BLOQUES_POR_DIA)) & MASCARA_DIA
+        if carril:
+            dias += 1
+            primero = (carril & -carril).bit_length() - 1
+            ultimo = carril.bit_length() - 1
+            huecos += (ultimo - primero + 1) - bin(carril).count("1")
+    return dias, huecos
+
+
+def compilar_catalogo(filas):
+    """
+    Compila las filas de `db_manager.obtener_sesiones_catalogo` en un catálogo:
+    {codigo: {'nombre', 'creditos', 'grupos': [grupo, ...]}}, donde cada grupo
+    lleva su máscara de ocupación precalculada y sus sesiones con las mismas
+    claves que `db_manager.obtener_horarios_de_materia`.
+    """
+    catalogo = {}
+    grupos_por_id = {}
+    invalidos = set()
+    for (codigo, nombre, creditos, id_grupo, nombre_grupo, cupos,
+         id_sesion, tipo_sesion, dia, hora_inicio, hora_fin, docente, salon) in filas:
+        materia = catalogo.get(codigo)
+        if materia is None:
+            materia = catalogo[codigo] = {'nombre': nombre, 'creditos': creditos or 0, 'grupos': []}
+        if id_grupo is None:
+            continue
+        grupo = grupos_por_id.get(id_grupo)
+        if grupo is None:
+            grupo = grupos_por_id[id_grupo] = {
+                'id': id_grupo,
+                'codigo': codigo,
+                'nombre': nombre_grupo,
+                'cupos': cupos,
+                'docente': docente or 'N/A',
+                'mascara': 0,
+                'turno': None,
+                'sesiones': []
+            }
+            materia['grupos'].append(grupo)
+        if id_sesion is None:
+            continue
+        try:
+            grupo['mascara'] |= mascara_franja(dia, hora_inicio, hora_fin)
+        except ValueError as e:
+            logging.warning(f"Grupo {nombre_grupo} de {codigo} descartado: {e}")
+            invalidos.add(id_grupo)
+            continue
+        turno = 'tarde' if hora_a_minutos(hora_inicio) >= INICIO_TARDE else 'mañana'
+        grupo['turno'] = turno if grupo['turno'] in (None, turno) else 'mixto'
+        grupo['sesiones'].append({
+            'id_sesion': id_sesion,
+            'dia_semana': dia,
+            'hora_inicio': hora_inicio,
+            'hora_fin': hora_fin,
+            'nombre_grupo': nombre_grupo,
+            'docente': docente,
+            'salon': salon,
+            'tipo_sesion': tipo_sesion
+        })
+
+    for materia in catalogo.values():
+        materia['grupos'] = [g for g in materia['grupos'] if g['sesiones'] and g['id'] not in invalidos]
+    return catalogo
+
+
+def mascara_bloqueos(bloqueos):
+    """Une las franjas (dia, hora_inicio, hora_fin) que el estudiante no tiene disponibles."""
+    mascara = 0
+    for dia, hora_inicio, hora_fin in bloqueos:
+        mascara |= mascara_franja(dia, hora_inicio, hora_fin)
+    return mascara
+
+
+def generar_horarios(catalogo, codigos, preferencias=None, bloqueos=(), max_resultados=5,
+                     limite_combinaciones=LIMITE_COMBINACIONES):
+    """
+    Genera los mejores horarios sin cruces para las materias `codigos`.
+
+    `preferencias` admite 'turno' ('cualquiera', 'mañana' o 'tarde') y
+    'minimizar_huecos' (por defecto True); `bloqueos` es una lista de franjas
+    (dia, hora_inicio, hora_fin) en las que no puede haber clase. Devuelve una
+    lista (mejor primero) de diccionarios con 'grupos' ({codigo: grupo}),
+    'mascara', 'dias', 'huecos' y 'creditos'; vacía si no hay combinación.
+    Se exploran como mucho `limite_combinaciones` horarios completos.
+    """
+    preferencias = preferencias or {}
+    turno = preferencias.get('turno', 'cualquiera')
+    minimizar_huecos = preferencias.get('minimizar_huecos', True)
+    bloqueada = mascara_bloqueos(bloqueos)
+
+    dominios = []
+    for codigo in dict.fromkeys(codigos):
+        materia = catalogo.get(codigo)
+        if materia is None:
+            raise ValueError(f"Materia desconocida: {codigo}")
+        # Grupos con la misma máscara son intercambiables: basta con el primero
+        grupos = {}
+        for g in materia['grupos']:
+            if not g['mascara'] & bloqueada and (turno == 'cualquiera' or g['turno'] == turno):
+                grupos.setdefault(g['mascara'], g)
+        if not grupos:
+            return []
+        dominios.append((codigo, list(grupos.values())))
+    # Primero las materias con menos grupos: los cruces se detectan antes
+    dominios.sort(key=lambda d: len(d[1]))
+
+    mejores = []
+    completos = 0
+    elegidos = [None] * len(dominios)
+
+    def buscar(nivel, ocupado):
+        nonlocal completos
+        if nivel == len(dominios):
+            completos += 1
+            dias, huecos = estadisticas_mascara(ocupado)
+            costo = (huecos if minimizar_huecos else 0, dias)
+            entrada = ((-costo[0], -costo[1], -completos), ocupado, tuple(elegidos))
+            if len(mejores) < max_resultados:
+                heapq.heappush(mejores, entrada)
+            elif entrada[0] > mejores[0][0]:
+                heapq.heapreplace(mejores, entrada)
+            return completos >= limite_combinaciones
+        for grupo in dominios[nivel][1]:
+            if not grupo['mascara'] & ocupado:
+                elegidos[nivel] = grupo
+                if buscar(nivel + 1, ocupado | grupo['mascara']):
+                    return True
+        return False
+
+    buscar(0, 0)
+
+    resultados = []
+    for _, ocupado, grupos in sorted(mejores, reverse=True):
+        dias, huecos = estadisticas_mascara(ocupado)
+        resultados.append({
+            'grupos': {g['codigo']: g for g in grupos},
+            'mascara': ocupado,
+            'dias': dias,
+            'huecos': huecos,
+            'creditos': sum(catalogo[g['codigo']]['creditos'] for g in grupos)
+        })
+    return resultados
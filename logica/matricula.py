@@ -0,0 +1,251 @@
+# PROYECTO_RAIZ/logica/matricula.py
+#
+# Matrícula de estudiantes en grupos sobre db_manager. Cada operación corre en
+# una transacción BEGIN IMMEDIATE: el cupo se descuenta con un UPDATE
+# condicionado y los cruces se verifican contra la máscara de ocupación del
+# estudiante dentro de la misma transacción, así que dos procesos nunca pueden
+# vender el mismo cupo ni matricular grupos que se cruzan.
+
+import sys
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+
+MATRICULADO = "matriculado"
+EN_LISTA_ESPERA = "lista_espera"
+YA_MATRICULADO = "ya_matriculado"
+CONFLICTO_HORARIO = "conflicto"
+SIN_CUPO = "sin_cupo"
+GRUPO_INEXISTENTE = "grupo_inexistente"
+GRUPO_INVALIDO = "grupo_invalido"  # alguna sesión cae fuera de la jornada (o en domingo)
+CANCELADO = "cancelado"
+NO_MATRICULADO = "no_matriculado"
+
+
+def crear_tablas_matricula(conn):
+    """Crea las tablas de matrícula, lista de espera y ocupación por estudiante."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Matriculas (
+                id_matricula INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_estudiante TEXT NOT NULL,
+                id_grupo_materia_fk INTEGER NOT NULL,
+                fecha_registro TEXT,
+                UNIQUE (id_estudiante, id_grupo_materia_fk),
+                FOREIGN KEY (id_grupo_materia_fk) REFERENCES GruposMateria (id_grupo_materia) ON DELETE CASCADE ON UPDATE CASCADE
+            );
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ListaEspera (
+                id_espera INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_estudiante TEXT NOT NULL,
+                id_grupo_materia_fk INTEGER NOT NULL,
+                fecha_registro TEXT,
+                UNIQUE (id_estudiante, id_grupo_materia_fk),
+                FOREIGN KEY (id_grupo_materia_fk) REFERENCES GruposMateria (id_grupo_materia) ON DELETE CASCADE ON UPDATE CASCADE
+            );
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS OcupacionEstudiantes (
+                id_estudiante TEXT PRIMARY KEY,
+                mascara BLOB NOT NULL
+            );
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lista_espera_grupo ON ListaEspera (id_grupo_materia_fk, id_espera);")
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error al crear las tablas de matrícula: {e}")
+
+
+@contextmanager
+def _transaccion_inmediata(conn, metricas=None):
+    """
+    Abre una transacción BEGIN IMMEDIATE (reserva el bloqueo de escritura al
+    inicio) y la confirma o revierte al salir. Si se pasa `metricas`, acumula
+    el tiempo esperado por el bloqueo y las transacciones confirmadas. Lanza
+    sqlite3.ProgrammingError si la conexión ya tiene una transacción abierta:
+    confirmarla aquí se llevaría cambios pendientes de quien llama.
+    """
+    if conn.in_transaction:
+        raise sqlite3.ProgrammingError("La matrícula necesita su propia transacción; "
+                                       "confirma o revierte la transacción pendiente de la conexión")
+    inicio = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    if metricas is not None:
+        metricas['espera_bloqueo_s'] = metricas.get('espera_bloqueo_s', 0.0) + time.perf_counter() - inicio
+    try:
+        yield conn.cursor()
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    if metricas is not None:
+        metricas['transacciones'] = metricas.get('transacciones', 0) + 1
+
+
+def _mascara_grupo(cursor, id_grupo):
+    """Máscara de ocupación de las sesiones del grupo; None si alguna no es una franja válida."""
+    cursor.execute("SELECT dia_semana, hora_inicio, hora_fin FROM SesionesClase WHERE id_grupo_materia_fk = ?",
+                   (id_grupo,))
+    mascara = 0
+    try:
+        for dia, hora_inicio, hora_fin in cursor.fetchall():
+            mascara |= logica.mascara_franja(dia, hora_inicio, hora_fin)
+    except ValueError:
+        return None
+    return mascara
+
+
+def _mascara_estudiante(cursor, id_estudiante):
+    cursor.execute("SELECT mascara FROM OcupacionEstudiantes WHERE id_estudiante = ?", (id_estudiante,))
+    fila = cursor.fetchone()
+    return int.from_bytes(fila[0], "little") if fila else 0
+
+
+def _guardar_mascara_estudiante(cursor, id_estudiante, mascara):
+    cursor.execute("INSERT OR REPLACE INTO OcupacionEstudiantes (id_estudiante, mascara) VALUES (?, ?)",
+                   (id_estudiante, mascara.to_bytes(logica.BYTES_MASCARA, "little")))
+
+
+def _inscribir(cursor, id_estudiante, id_grupo, codigo_materia, cupos, mascara_grupo):
+    """Inscribe dentro de la transacción abierta; devuelve el estado resultante."""
+    cursor.execute("""
+        SELECT 1 FROM Matriculas AS M
+        JOIN GruposMateria AS G ON G.id_grupo_materia = M.id_grupo_materia_fk
+        WHERE M.id_estudiante = ? AND G.codigo_materia_fk = ?
+    """, (id_estudiante, codigo_materia))
+    if cursor.fetchone():
+        return YA_MATRICULADO
+
+    mascara_estudiante = _mascara_estudiante(cursor, id_estudiante)
+    if mascara_estudiante & mascara_grupo:
+        return CONFLICTO_HORARIO
+
+    if cupos is not None:
+        cursor.execute("UPDATE GruposMateria SET cupos = cupos - 1 WHERE id_grupo_materia = ? AND cupos > 0",
+                       (id_grupo,))
+        if cursor.rowcount == 0:
+            return SIN_CUPO
+
+    fecha = datetime.now().isoformat(timespec="seconds")
+    cursor.execute("INSERT INTO Matriculas (id_estudiante, id_grupo_materia_fk, fecha_registro) VALUES (?, ?, ?)",
+                   (id_estudiante, id_grupo, fecha))
+    _guardar_mascara_estudiante(cursor, id_estudiante, mascara_estudiante | mascara_grupo)
+    cursor.execute("DELETE FROM ListaEspera WHERE id_estudiante = ? AND id_grupo_materia_fk = ?",
+                   (id_estudiante, id_grupo))
+    return MATRICULADO
+
+
+def matricular(conn, id_estudiante, id_grupo, lista_espera=True, metricas=None):
+    """
+    Matricula a un estudiante en un grupo. Devuelve MATRICULADO,
+    EN_LISTA_ESPERA (sin cupo y `lista_espera` activo), SIN_CUPO,
+    CONFLICTO_HORARIO, YA_MATRICULADO, GRUPO_INEXISTENTE o GRUPO_INVALIDO
+    (alguna sesión del grupo está fuera de la jornada).
+    """
+    with _transaccion_inmediata(conn, metricas) as cursor:
+        cursor.execute("SELECT codigo_materia_fk, cupos FROM GruposMateria WHERE id_grupo_materia = ?", (id_grupo,))
+        grupo = cursor.fetchone()
+        if grupo is None:
+            return GRUPO_INEXISTENTE
+        codigo_materia, cupos = grupo
+        mascara_grupo = _mascara_grupo(cursor, id_grupo)
+        if mascara_grupo is None:
+            return GRUPO_INVALIDO
+        estado = _inscribir(cursor, id_estudiante, id_grupo, codigo_materia, cupos, mascara_grupo)
+        if estado == SIN_CUPO and lista_espera:
+            cursor.execute("""
+                INSERT OR IGNORE INTO ListaEspera (id_estudiante, id_grupo_materia_fk, fecha_registro)
+                VALUES (?, ?, ?)
+            """, (id_estudiante, id_grupo, datetime.now().isoformat(timespec="seconds")))
+            estado = EN_LISTA_ESPERA
+        return estado
+
+
+def cancelar_matricula(conn, id_estudiante, id_grupo, metricas=None):
+    """
+    Cancela una matrícula, devuelve el cupo y, en la misma transacción, lo
+    entrega al primer estudiante de la lista de espera que no tenga cruces.
+    Devuelve (estado, id_estudiante_promovido o None); el estado es
+    GRUPO_INVALIDO, sin cancelar nada, si el horario del grupo no es válido.
+    """
+    with _transaccion_inmediata(conn, metricas) as cursor:
+        mascara_grupo = _mascara_grupo(cursor, id_grupo)
+        if mascara_grupo is None:
+            return GRUPO_INVALIDO, None
+        cursor.execute("DELETE FROM Matriculas WHERE id_estudiante = ? AND id_grupo_materia_fk = ?",
+                       (id_estudiante, id_grupo))
+        if cursor.rowcount == 0:
+            return NO_MATRICULADO, None
+
+        _guardar_mascara_estudiante(cursor, id_estudiante,
+                                    _mascara_estudiante(cursor, id_estudiante) & ~mascara_grupo)
+        cursor.execute("UPDATE GruposMateria SET cupos = cupos + 1 WHERE id_grupo_materia = ? AND cupos IS NOT NULL",
+                       (id_grupo,))
+
+        cursor.execute("SELECT codigo_materia_fk, cupos FROM GruposMateria WHERE id_grupo_materia = ?", (id_grupo,))
+        codigo_materia, cupos = cursor.fetchone()
+        cursor.execute("SELECT id_estudiante FROM ListaEspera WHERE id_grupo_materia_fk = ? ORDER BY id_espera",
+                       (id_grupo,))
+        for (candidato,) in cursor.fetchall():
+            if _inscribir(cursor, candidato, id_grupo, codigo_materia, cupos, mascara_grupo) == MATRICULADO:
+                return CANCELADO, candidato
+        return CANCELADO, None
+
+
+def obtener_matriculas_estudiante(conn, id_estudiante):
+    """Obtiene los grupos en los que está matriculado un estudiante."""
+    sql = """
+        SELECT G.id_grupo_materia, G.codigo_materia_fk, G.nombre_grupo
+        FROM Matriculas AS M
+        JOIN GruposMateria AS G ON G.id_grupo_materia = M.id_grupo_materia_fk
+        WHERE M.id_estudiante = ?
+        ORDER BY G.codigo_materia_fk
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, (id_estudiante,))
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error al obtener las matrículas del estudiante {id_estudiante}: {e}")
+        return []
+
+
+def obtener_lista_espera(conn, id_grupo):
+    """Obtiene los estudiantes en lista de espera de un grupo, en orden de llegada."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id_estudiante FROM ListaEspera WHERE id_grupo_materia_fk = ? ORDER BY id_espera",
+                       (id_grupo,))
+        return [fila[0] for fila in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"Error al obtener la lista de espera del grupo {id_grupo}: {e}")
+        return []
+
+
+def abrir_conexion_matricula(ruta_db=None, espera_maxima_s=30.0):
+    """
+    Conexión preparada para matrícula concurrente: modo WAL, sin transacciones
+    implícitas y con espera de bloqueo de `espera_maxima_s` segundos.
+    """
+    conn = db_manager.crear_conexion(ruta_db)
+    if conn is None:
+        return None
+    conn.isolation_level = None
+    conn.execute(f"PRAGMA busy_timeout = {int(espera_maxima_s * 1000)};")
+    conn.execute("PRAGMA journal_mode = WAL;")
+    crear_tablas_matricula(conn)
+    return conn
@@ -0,0 +1,262 @@
+# PROYECTO_RAIZ/logica/memoria_compartida.py
+#
+# Catálogo compilado (logica.compilar_catalogo) publicado en un bloque de
+# multiprocessing.shared_memory para los procesos trabajadores del lote y de la
+# simulación: el proceso principal lo publica una vez y cada trabajador recibe
+# solo el nombre del bloque, en lugar de una copia serializada del catálogo.
+#
+# Disposición del bloque (little-endian, secciones alineadas a 8 bytes):
+#     encabezado   magia, formato, bytes por máscara, materias, grupos, textos
+#                  y el desplazamiento de cada sección
+#     materias     creditos int32, codigo (índice de texto) int32,
+#                  inicio_grupos int32[materias + 1] (los grupos de la materia
+#                  m son inicio_grupos[m]:inicio_grupos[m + 1])
+#     grupos       id int64, materia int32, cupos int32 (-1 = sin definir),
+#                  nombre (índice de texto) int32, turno uint8,
+#                  mascara uint8[grupos * bytes por máscara]
+#     textos       inicio int32[textos + 1] y los bytes UTF-8
+#
+# Los trabajadores se adjuntan sin copiar (las secciones son memoryview sobre
+# el bloque) y siguen adjuntos mientras viven: VistaCatalogo arma a pedido, desde
+# esas vistas, solo las materias que consulta el solucionador y guarda las
+# últimas MATERIAS_EN_CACHE, así que cada trabajador no tiene su propia copia
+# del catálogo completo.
+
+import sys
+import os
+import atexit
+import struct
+from collections.abc import Mapping
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from logica import logica
+
+FORMATO_BLOQUE = 1
+_MAGIA = b"CATM"
+# magia, formato, bytes por máscara, materias, grupos, textos y 11 desplazamientos
+_ENCABEZADO = struct.Struct("<4sHHIII11Q")
+_SECCIONES = ('creditos', 'codigo_materia', 'inicio_grupos', 'ids_grupos', 'grupo_materia', 'cupos',
+              'nombre_grupo', 'turnos', 'mascaras', 'inicio_textos', 'textos')
+_TIPOS = {'creditos': 'i', 'codigo_materia': 'i', 'inicio_grupos': 'i', 'ids_grupos': 'q', 'grupo_materia': 'i',
+          'cupos': 'i', 'nombre_grupo': 'i', 'turnos': 'B', 'mascaras': 'B', 'inicio_textos': 'i', 'textos': 'B'}
+TURNOS = ('mañana', 'tarde', 'mixto')
+_SIN_TURNO = 255
+_SIN_CUPOS = -1
+MATERIAS_EN_CACHE = 256  # materias ya armadas que conserva cada VistaCatalogo
+
+
+def _alinear(posicion):
+    return (posicion + 7) & ~7
+
+
+def _empaquetar(catalogo):
+    """Secciones del bloque como bytes, en el orden de _SECCIONES."""
+    textos = {}
+
+    def indice(texto):
+        return textos.setdefault(texto, len(textos))
+
+    codigos = list(catalogo)
+    creditos, codigo_materia, inicio_grupos = [], [], [0]
+    ids_grupos, grupo_materia, cupos, nombre_grupo, turnos, mascaras = [], [], [], [], [], []
+    for m, codigo in enumerate(codigos):
+        materia = catalogo[codigo]
+        creditos.append(materia['creditos'])
+        codigo_materia.append(indice(codigo))
+        for grupo in materia['grupos']:
+            ids_grupos.append(grupo['id'])
+            grupo_materia.append(m)
+            cupos.append(_SIN_CUPOS if grupo['cupos'] is None else grupo['cupos'])
+            nombre_grupo.append(indice(grupo['nombre']))
+            turnos.append(TURNOS.index(grupo['turno']) if grupo['turno'] in TURNOS else _SIN_TURNO)
+            mascaras.append(grupo['mascara'].to_bytes(logica.BYTES_MASCARA, "little"))
+        inicio_grupos.append(len(ids_grupos))
+    codificados = [texto.encode("utf-8") for texto in textos]
+    inicio_textos = [0]
+    for texto in codificados:
+        inicio_textos.append(inicio_textos[-1] + len(texto))
+
+    def arreglo(tipo, valores):
+        return struct.pack(f"<{len(valores)}{tipo}", *valores)
+
+    return (len(codigos), len(ids_grupos), len(codificados), [
+        arreglo('i', creditos), arreglo('i', codigo_materia), arreglo('i', inicio_grupos),
+        arreglo('q', ids_grupos), arreglo('i', grupo_materia), arreglo('i', cupos),
+        arreglo('i', nombre_grupo), bytes(turnos), b"".join(mascaras),
+        arreglo('i', inicio_textos), b"".join(codificados)
+    ])
+
+
+class CatalogoCompartido:
+    """
+    Catálogo compilado en memoria compartida. El proceso que lo publica es su
+    dueño y lo elimina al cerrarlo (o al salir); los trabajadores se adjuntan
+    por nombre y solo liberan su vista.
+    """
+
+    def __init__(self, memoria, propietario):
+        self._memoria = memoria
+        self.propietario = propietario
+        magia, formato, bytes_mascara, self.num_materias, self.num_grupos, self.num_textos, *desplazamientos = \
+            _ENCABEZADO.unpack_from(memoria.buf)
+        if magia != _MAGIA or formato != FORMATO_BLOQUE or bytes_mascara != logica.BYTES_MASCARA:
+            raise ValueError(f"El bloque {memoria.name} no contiene un catálogo compatible")
+        self._vistas = {}
+        for seccion, inicio in zip(_SECCIONES, desplazamientos):
+            if seccion == 'textos':
+                tamano = self._vistas['inicio_textos'][self.num_textos]
+            else:
+                tamano = self._tamano_seccion(seccion)
+            vista = memoria.buf[inicio:inicio + tamano]
+            self._vistas[seccion] = vista if _TIPOS[seccion] == 'B' else vista.cast(_TIPOS[seccion])
+        if propietario:
+            atexit.register(self.cerrar)
+
+    def _tamano_seccion(self, seccion):
+        elementos = {
+            'creditos': self.num_materias, 'codigo_materia': self.num_materias,
+            'inicio_grupos': self.num_materias + 1, 'ids_grupos': self.num_grupos,
+            'grupo_materia': self.num_grupos, 'cupos': self.num_grupos, 'nombre_grupo': self.num_grupos,
+            'turnos': self.num_grupos, 'mascaras': self.num_grupos * logica.BYTES_MASCARA,
+            'inicio_textos': self.num_textos + 1,
+        }[seccion]
+        return elementos * struct.calcsize(_TIPOS[seccion])
+
+    @classmethod
+    def publicar(cls, catalogo, nombre=None):
+        """Copia el catálogo compilado a un bloque nuevo y devuelve su dueño."""
+        num_materias, num_grupos, num_textos, secciones = _empaquetar(catalogo)
+        desplazamientos = []
+        posicion = _alinear(_ENCABEZADO.size)
+        for datos in secciones:
+            desplazamientos.append(posicion)
+            posicion = _alinear(posicion + len(datos))
+        memoria = shared_memory.SharedMemory(name=nombre, create=True, size=max(posicion, 1))
+        try:
+            _ENCABEZADO.pack_into(memoria.buf, 0, _MAGIA, FORMATO_BLOQUE, logica.BYTES_MASCARA,
+                                  num_materias, num_grupos, num_textos, *desplazamientos)
+            for inicio, datos in zip(desplazamientos, secciones):
+                memoria.buf[inicio:inicio + len(datos)] = datos
+            return cls(memoria, propietario=True)
+        except BaseException:
+            memoria.close()
+            memoria.unlink()
+            raise
+
+    @classmethod
+    def adjuntar(cls, nombre):
+        """Se adjunta, sin copiar, a un bloque publicado por otro proceso."""
+        if sys.version_info >= (3, 13):
+            memoria = shared_memory.SharedMemory(name=nombre, track=False)
+        else:
+            memoria = shared_memory.SharedMemory(name=nombre)
+        return cls(memoria, propietario=False)
+
+    @property
+    def nombre(self):
+        return self._memoria.name
+
+    def vista(self, seccion):
+        """Sección del bloque como memoryview tipada (sin copiar): 'creditos', 'grupo_materia', 'cupos'..."""
+        return self._vistas[seccion]
+
+    def texto(self, indice):
+        inicio_textos = self._vistas['inicio_textos']
+        return str(self._vistas['textos'][inicio_textos[indice]:inicio_textos[indice + 1]], "utf-8")
+
+    def mascara(self, indice):
+        """Máscara de ocupación del grupo en la posición `indice`, como entero."""
+        inicio = indice * logica.BYTES_MASCARA
+        return int.from_bytes(self._vistas['mascaras'][inicio:inicio + logica.BYTES_MASCARA], "little")
+
+    def codigo(self, m):
+        """Código de la materia en la posición `m`."""
+        return sys.intern(self.texto(self._vistas['codigo_materia'][m]))
+
+    def materia(self, m):
+        """
+        Materia en la posición `m` con la forma de `logica.compilar_catalogo`
+        ({'creditos', 'grupos'}); los grupos traen id, codigo, nombre, cupos,
+        mascara y turno, sin sus sesiones.
+        """
+        codigo = self.codigo(m)
+        inicio_grupos = self._vistas['inicio_grupos']
+        grupos = []
+        for g in range(inicio_grupos[m], inicio_grupos[m + 1]):
+            cupos = self._vistas['cupos'][g]
+            turno = self._vistas['turnos'][g]
+            grupos.append({
+                'id': self._vistas['ids_grupos'][g],
+                'codigo': codigo,
+                'nombre': sys.intern(self.texto(self._vistas['nombre_grupo'][g])),
+                'cupos': None if cupos == _SIN_CUPOS else cupos,
+                'mascara': self.mascara(g),
+                'turno': None if turno == _SIN_TURNO else TURNOS[turno]
+            })
+        return {'creditos': self._vistas['creditos'][m], 'grupos': grupos}
+
+    def materializar(self):
+        """Catálogo completo como dict, con la forma de `logica.compilar_catalogo`."""
+        return {self.codigo(m): self.materia(m) for m in range(self.num_materias)}
+
+    def cerrar(self):
+        """Libera las vistas y el bloque; el dueño además lo elimina del sistema."""
+        if self._memoria is None:
+            return
+        for vista in self._vistas.values():
+            vista.release()
+        self._vistas = {}
+        self._memoria.close()
+        if self.propietario:
+            atexit.unregister(self.cerrar)
+            try:
+                self._memoria.unlink()
+            except FileNotFoundError:
+                pass
+        self._memoria = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class VistaCatalogo(Mapping):
+    """
+    Catálogo de solo lectura sobre un CatalogoCompartido, con la interfaz de
+    dict que usan `logica.generar_horarios` y el simulador de demanda. Cada
+    materia se arma desde el bloque la primera vez que se pide y se guardan
+    las últimas MATERIAS_EN_CACHE.
+    """
+
+    def __init__(self, compartido, materias_en_cache=MATERIAS_EN_CACHE):
+        self.compartido = compartido
+        self._posiciones = {compartido.codigo(m): m for m in range(compartido.num_materias)}
+        self._materia = lru_cache(maxsize=materias_en_cache)(compartido.materia)
+
+    def __getitem__(self, codigo):
+        return self._materia(self._posiciones[codigo])
+
+    def __iter__(self):
+        return iter(self._posiciones)
+
+    def __len__(self):
+        return len(self._posiciones)
+
+
+def catalogo_de_trabajador(nombre):
+    """
+    Para el inicializador de un trabajador: se adjunta al bloque y devuelve una
+    VistaCatalogo sobre él. El trabajador queda adjunto hasta terminar; el
+    bloque lo elimina el proceso que lo publicó.
+    """
+    return VistaCatalogo(CatalogoCompartido.adjuntar(nombre))
@@ -0,0 +1,329 @@
+# PROYECTO_RAIZ/logica/plan_estudios.py
+
+import sys
+import os
+import argparse
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+
+CREDITOS_MAXIMOS_POR_PERIODO = 18
+LIMITE_NODOS_BUSQUEDA = 200_000
+
+
+def _bits(mascara):
+    """Itera los índices de los bits encendidos de una máscara."""
+    while mascara:
+        bajo = mascara & -mascara
+        yield bajo.bit_length() - 1
+        mascara ^= bajo
+
+
+class GrafoPrerrequisitos:
+    """
+    Grafo de prerrequisitos del pensum.
+
+    Cada materia recibe un índice entero y su cierre transitivo (todas las
+    materias que deben estar aprobadas antes de verla) se precalcula como un
+    bitset, de modo que verificar si una materia es elegible es una sola
+    operación AND contra la máscara de materias aprobadas.
+    """
+
+    def __init__(self, codigos, prerrequisitos, creditos=None):
+        creditos = creditos or {}
+        self.codigos = list(codigos)
+        self.indice = {codigo: i for i, codigo in enumerate(self.codigos)}
+        self.creditos = [int(creditos.get(codigo) or 0) for codigo in self.codigos]
+
+        n = len(self.codigos)
+        self.directos = [0] * n
+        self.dependientes = [0] * n
+        for codigo_materia, codigo_prerrequisito in prerrequisitos:
+            if codigo_materia not in self.indice or codigo_prerrequisito not in self.indice:
+                raise ValueError(f"Prerrequisito con materia desconocida: {codigo_prerrequisito} -> {codigo_materia}")
+            materia = self.indice[codigo_materia]
+            requisito = self.indice[codigo_prerrequisito]
+            self.directos[materia] |= 1 << requisito
+            self.dependientes[requisito] |= 1 << materia
+
+        self.orden_topologico = self._ordenar_topologicamente()
+        self.cierre = [0] * n
+        for i in self.orden_topologico:
+            cierre = self.directos[i]
+            for requisito in _bits(self.directos[i]):
+                cierre |= self.cierre[requisito]
+            self.cierre[i] = cierre
+
+    def _ordenar_topologicamente(self):
+        """Orden de Kahn; lanza ValueError si los prerrequisitos forman un ciclo."""
+        pendientes = [bin(d).count("1") for d in self.directos]
+        cola = [i for i, grado in enumerate(pendientes) if grado == 0]
+        orden = []
+        while cola:
+            i = cola.pop()
+            orden.append(i)
+            for dependiente in _bits(self.dependientes[i]):
+                pendientes[dependiente] -= 1
+                if pendientes[dependiente] == 0:
+                    cola.append(dependiente)
+        if len(orden) != len(self.codigos):
+            en_ciclo = [self.codigos[i] for i, grado in enumerate(pendientes) if grado > 0]
+            raise ValueError(f"Los prerrequisitos forman un ciclo entre: {', '.join(en_ciclo)}")
+        return orden
+
+    def mascara(self, codigos):
+        """Convierte una colección de códigos en su máscara de bits."""
+        mascara = 0
+        for codigo in codigos:
+            mascara |= 1 << self.indice[codigo]
+        return mascara
+
+    def codigos_de(self, mascara):
+        """Convierte una máscara de bits en la lista de códigos que representa."""
+        return [self.codigos[i] for i in _bits(mascara)]
+
+    def es_elegible(self, codigo, aprobadas):
+        """Indica si `codigo` puede cursarse dada la máscara de materias aprobadas."""
+        return self.cierre[self.indice[codigo]] & ~aprobadas == 0
+
+    def elegibles(self, aprobadas, candidatas):
+        """Máscara de las materias de `candidatas` con todos sus prerrequisitos aprobados."""
+        resultado = 0
+        for i in _bits(candidatas):
+            if self.cierre[i] & ~aprobadas == 0:
+                resultado |= 1 << i
+        return resultado
+
+
+class _LimiteAlcanzado(Exception):
+    """Se agotó el presupuesto de nodos de la búsqueda exacta."""
+
+
+class PlanificadorGraduacion:
+    """
+    Busca la secuencia de periodos más corta hasta completar el pensum.
+
+    La búsqueda es una profundización iterativa sobre el número de periodos:
+    el estado es la máscara de materias aprobadas y se memoriza, para cada
+    máscara, el mayor número de periodos con el que ya se demostró que no se
+    alcanza la meta. Se poda con la ruta crítica de prerrequisitos y con los
+    límites de créditos/materias, y sólo se exploran cargas maximales (añadir
+    una materia elegible nunca empeora el plan). Cada estado visitado y cada
+    carga generada cuentan contra `limite_nodos`; si se agota, se devuelve el
+    mejor plan encontrado, como mínimo el voraz.
+    """
+
+    def __init__(self, grafo, max_creditos=CREDITOS_MAXIMOS_POR_PERIODO, max_materias=None,
+                 limite_nodos=LIMITE_NODOS_BUSQUEDA):
+        if max_creditos is None and max_materias is None:
+            raise ValueError("Se requiere un límite de créditos o de materias por periodo.")
+        self.grafo = grafo
+        self.max_creditos = max_creditos
+        self.max_materias = max_materias
+        self.limite_nodos = limite_nodos
+        self.nodos_explorados = 0
+        self.es_optimo = False
+
+    def planificar(self, aprobadas=(), objetivo=None):
+        """
+        Devuelve una lista de periodos, cada uno con los códigos a cursar.
+
+        `aprobadas` son los códigos ya cursados y `objetivo` las materias que
+        se desean completar (por defecto, todo el pensum); los prerrequisitos
+        del objetivo se incluyen automáticamente.
+        """
+        g = self.grafo
+        hechas = g.mascara(c for c in aprobadas if c in g.indice)
+        if objetivo is None:
+            meta = (1 << len(g.codigos)) - 1
+        else:
+            meta = g.mascara(objetivo)
+            for i in list(_bits(meta)):
+                meta |= g.cierre[i]
+        pendientes = meta & ~hechas
+
+        for i in _bits(pendientes):
+            if self.max_creditos is not None and g.creditos[i] > self.max_creditos:
+                raise ValueError(f"La materia {g.codigos[i]} supera el límite de {self.max_creditos} créditos por periodo.")
+
+        self._meta = meta
+        self._altura = self._calcular_alturas(pendientes)
+        self._prioridad = sorted(range(len(g.codigos)), key=lambda i: (-self._altura[i], -g.creditos[i], i))
+        self._fallidos = {}
+        self.nodos_explorados = 0
+        self.es_optimo = False
+
+        mejor = self._plan_voraz(hechas)
+        try:
+            for periodos in range(self._cota_inferior(pendientes), len(mejor)):
+                plan = self._buscar(hechas, periodos)
+                if plan is not None:
+                    mejor = plan
+                    break
+            self.es_optimo = True
+        except _LimiteAlcanzado:
+            pass
+        return [g.codigos_de(periodo) for periodo in mejor]
+
+    def _calcular_alturas(self, pendientes):
+        """Longitud de la cadena de prerrequisitos pendientes que arranca en cada materia."""
+        g = self.grafo
+        altura = [0] * len(g.codigos)
+        for i in reversed(g.orden_topologico):
+            if pendientes >> i & 1:
+                altura[i] = 1 + max((altura[d] for d in _bits(g.dependientes[i] & pendientes)), default=0)
+        return altura
+
+    def _cota_inferior(self, pendientes):
+        """Número mínimo de periodos necesarios para cursar `pendientes`."""
+        if not pendientes:
+            return 0
+        g = self.grafo
+        cota = max(self._altura[i] for i in _bits(pendientes))
+        if self.max_materias:
+            cantidad = bin(pendientes).count("1")
+            cota = max(cota, -(-cantidad // self.max_materias))
+        if self.max_creditos:
+            creditos = sum(g.creditos[i] for i in _bits(pendientes))
+            cota = max(cota, -(-creditos // self.max_creditos))
+        return cota
+
+    def _es_factible(self, pendientes, periodos):
+        """
+        Razonamiento energético: las materias cuya cadena pendiente mide más de
+        `periodos - t` deben verse en los primeros `t` periodos, así que deben
+        caber en `t` cargas completas.
+        """
+        g = self.grafo
+        cantidad_por_altura = [0] * (periodos + 1)
+        creditos_por_altura = [0] * (periodos + 1)
+        for i in _bits(pendientes):
+            altura = self._altura[i]
+            if altura > periodos:
+                return False
+            cantidad_por_altura[altura] += 1
+            creditos_por_altura[altura] += g.creditos[i]
+        cantidad = creditos = 0
+        for t in range(1, periodos):
+            cantidad += cantidad_por_altura[periodos - t + 1]
+            creditos += creditos_por_altura[periodos - t + 1]
+            if self.max_materias is not None and cantidad > t * self.max_materias:
+                return False
+            if self.max_creditos is not None and creditos > t * self.max_creditos:
+                return False
+        return True
+
+    def _contar_nodo(self):
+        self.nodos_explorados += 1
+        if self.nodos_explorados > self.limite_nodos:
+            raise _LimiteAlcanzado()
+
+    def _cabe(self, i, creditos, cantidad):
+        if self.max_materias is not None and cantidad + 1 > self.max_materias:
+            return False
+        if self.max_creditos is not None and creditos + self.grafo.creditos[i] > self.max_creditos:
+            return False
+        return True
+
+    def _cargas_maximales(self, elegibles, forzadas, contar=True):
+        """
+        Genera las cargas de un periodo a las que no se les puede añadir otra
+        materia elegible; con `contar` cada carga cuenta contra limite_nodos.
+        """
+        orden = [i for i in self._prioridad if forzadas >> i & 1]
+        orden += [i for i in self._prioridad if elegibles >> i & 1 and not forzadas >> i & 1]
+        creditos_de = self.grafo.creditos
+
+        def generar(pos, carga, creditos, cantidad, excluidas):
+            if pos == len(orden):
+                if contar:
+                    self._contar_nodo()
+                if not any(self._cabe(i, creditos, cantidad) for i in excluidas):
+                    yield carga
+                return
+            i = orden[pos]
+            if self._cabe(i, creditos, cantidad):
+                yield from generar(pos + 1, carga | 1 << i, creditos + creditos_de[i], cantidad + 1, excluidas)
+            if not forzadas >> i & 1:
+                yield from generar(pos + 1, carga, creditos, cantidad, excluidas + (i,))
+
+        return generar(0, 0, 0, 0, ())
+
+    def _plan_voraz(self, hechas):
+        """Plan por listas de prioridad (ruta crítica primero); sirve de cota superior y no gasta nodos."""
+        plan = []
+        while self._meta & ~hechas:
+            elegibles = self.grafo.elegibles(hechas, self._meta & ~hechas)
+            carga = next(self._cargas_maximales(elegibles, 0, contar=False))
+            plan.append(carga)
+            hechas |= carga
+        return plan
+
+    def _buscar(self, hechas, periodos):
+        """Devuelve un plan de a lo sumo `periodos` periodos desde `hechas`, o None."""
+        pendientes = self._meta & ~hechas
+        if not pendientes:
+            return []
+        if self._fallidos.get(hechas, 0) >= periodos:
+            return None
+        if self._cota_inferior(pendientes) > periodos or not self._es_factible(pendientes, periodos):
+            self._fallidos[hechas] = periodos
+            return None
+
+        self._contar_nodo()
+
+        elegibles = self.grafo.elegibles(hechas, pendientes)
+        # Una materia cuya cadena pendiente ocupa todos los periodos restantes debe verse ya
+        forzadas = 0
+        for i in _bits(elegibles):
+            if self._altura[i] >= periodos:
+                forzadas |= 1 << i
+
+        for carga in self._cargas_maximales(elegibles, forzadas):
+            resto = self._buscar(hechas | carga, periodos - 1)
+            if resto is not None:
+                return [carga] + resto
+
+        self._fallidos[hechas] = periodos
+        return None
+
+
+def cargar_grafo(conn):
+    """Construye el grafo de prerrequisitos a partir de la base de datos (sin tocar su esquema)."""
+    materias = db_manager.obtener_todas_las_materias_simple(conn)
+    creditos = {codigo: creditos for codigo, _, creditos in materias}
+    return GrafoPrerrequisitos(creditos.keys(), db_manager.obtener_prerrequisitos(conn), creditos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planifica los periodos restantes hasta la graduación.")
+    parser.add_argument("--max-creditos", type=int, default=CREDITOS_MAXIMOS_POR_PERIODO)
+    parser.add_argument("--max-materias", type=int, default=None)
+    parser.add_argument("--limite-nodos", type=int, default=LIMITE_NODOS_BUSQUEDA)
+    args = parser.parse_args()
+
+    conn = db_manager.crear_conexion_migrada()
+    if not conn:
+        return 1
+    try:
+        grafo = cargar_grafo(conn)
+        planificador = PlanificadorGraduacion(grafo, args.max_creditos, args.max_materias, args.limite_nodos)
+        plan = planificador.planificar(db_manager.obtener_materias_cursadas(conn))
+    finally:
+        conn.close()
+
+    for numero, periodo in enumerate(plan, start=1):
+        print(f"Periodo {numero}: {', '.join(periodo)}")
+    estado = "óptimo" if planificador.es_optimo else "mejor encontrado (límite de nodos alcanzado)"
+    print(f"{len(plan)} periodos - plan {estado} tras {planificador.nodos_explorados} nodos.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
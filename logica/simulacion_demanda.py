@@ -0,0 +1,330 @@
+# PROYECTO_RAIZ/logica/simulacion_demanda.py
+#
+# Simulación Monte Carlo de la demanda por grupo antes de abrir el semestre:
+#
+#     python -m logica.simulacion_demanda --estudiantes 2000 --replicas 50 -o demanda.csv
+#
+# Cada réplica muestrea una cohorte (número de materias, materias y turno de
+# cada estudiante), le arma a cada uno su horario con logica.generar_horarios y
+# cuenta cuántos estudiantes cayeron en cada grupo. Con todas las réplicas se
+# estima la distribución de la demanda y la probabilidad de que un grupo se
+# quede sin cupos. Requiere NumPy.
+
+import sys
+import os
+import csv
+import json
+import time
+import sqlite3
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_logica = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_logica)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica import logica
+from logica.memoria_compartida import CatalogoCompartido, catalogo_de_trabajador
+
+TURNOS = ('cualquiera', 'mañana', 'tarde')
+PROB_TURNOS = (0.5, 0.3, 0.2)
+# Peso del i-ésimo mejor horario cuando el estudiante elige entre alternativas
+PESOS_ALTERNATIVAS = (0.6, 0.25, 0.15)
+
+# Estado del proceso trabajador; se recibe una sola vez al iniciar el pool
+_simulador = None
+
+
+def modelo_parametrico(catalogo, popularidad=None, media_materias=5.0, max_materias=7,
+                       prob_turnos=PROB_TURNOS):
+    """
+    Modelo de demanda paramétrico: el número de materias por estudiante sigue
+    una Poisson de media `media_materias` (recortada a [1, max_materias]) y
+    cada materia se elige con probabilidad proporcional a `popularidad`
+    ({codigo: peso}; las que falten pesan 1).
+    """
+    codigos = sorted(c for c, m in catalogo.items() if m['grupos'])
+    popularidad = popularidad or {}
+    pesos = np.array([float(popularidad.get(c, 1.0)) for c in codigos])
+    if (pesos < 0).any() or pesos.sum() <= 0:
+        raise ValueError("Los pesos de popularidad deben ser no negativos y no todos cero.")
+    return {
+        'codigos': codigos,
+        'pesos': pesos / pesos.sum(),
+        'media_materias': float(media_materias),
+        'max_materias': min(int(max_materias), len(codigos)),
+        'prob_turnos': np.asarray(prob_turnos, dtype=float) / sum(prob_turnos)
+    }
+
+
+def modelo_historico(conn, catalogo, prob_turnos=PROB_TURNOS):
+    """
+    Modelo estimado con las matrículas registradas (tabla Matriculas): la
+    popularidad de cada materia es su número de matriculados (más uno, para
+    que ninguna quede en cero) y la media de materias es la observada.
+    Devuelve None si todavía no hay matrículas.
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Matriculas'")
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute("""
+            SELECT G.codigo_materia_fk, COUNT(*)
+            FROM Matriculas AS M
+            JOIN GruposMateria AS G ON G.id_grupo_materia = M.id_grupo_materia_fk
+            GROUP BY G.codigo_materia_fk
+        """)
+        conteos = dict(cursor.fetchall())
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT id_estudiante) FROM Matriculas")
+        total, estudiantes = cursor.fetchone()
+    except sqlite3.Error as e:
+        print(f"Error al leer el historial de matrículas: {e}")
+        return None
+    if not estudiantes:
+        return None
+    popularidad = {codigo: conteos.get(codigo, 0) + 1 for codigo in catalogo}
+    media = total / estudiantes
+    return modelo_parametrico(catalogo, popularidad, media, max(1, round(media * 1.5)), prob_turnos)
+
+
+def muestrear_cohorte(modelo, num_estudiantes, rng):
+    """
+    Muestrea una cohorte de forma vectorizada. Devuelve (materias, turnos):
+    `materias` es una matriz (estudiantes x max_materias) de índices en
+    modelo['codigos'] ordenados por preferencia y rellena con -1; `turnos`
+    son índices en TURNOS.
+    """
+    num_codigos = len(modelo['codigos'])
+    cantidad = np.clip(rng.poisson(modelo['media_materias'], num_estudiantes), 1, modelo['max_materias'])
+    # Muestreo ponderado sin reemplazo con el truco de Gumbel: las k mayores
+    # claves log(p) + Gumbel son una muestra de k materias distintas
+    with np.errstate(divide='ignore'):
+        claves = np.log(modelo['pesos']) + rng.gumbel(size=(num_estudiantes, num_codigos))
+    orden = np.argsort(-claves, axis=1)[:, :modelo['max_materias']]
+    materias = np.where(np.arange(modelo['max_materias']) < cantidad[:, None], orden, -1)
+    turnos = rng.choice(len(TURNOS), size=num_estudiantes, p=modelo['prob_turnos'])
+    return materias, turnos
+
+
+class SimuladorDemanda:
+    """Arma los horarios de cohortes muestreadas y cuenta la demanda por grupo."""
+
+    def __init__(self, catalogo, modelo, max_alternativas=len(PESOS_ALTERNATIVAS)):
+        self.catalogo = catalogo
+        self.modelo = modelo
+        self.max_alternativas = max_alternativas
+        pesos = np.asarray(PESOS_ALTERNATIVAS[:max_alternativas], dtype=float)
+        self.acumulado_alternativas = [np.cumsum(pesos[:k] / pesos[:k].sum()) for k in range(1, max_alternativas + 1)]
+
+        self.ids_grupos = []
+        self.cupos = []
+        # Grupos de una materia con la misma máscara son intercambiables para el
+        # solucionador; la demanda de la clase se reparte entre ellos según sus
+        # cupos (o por igual si alguno no tiene cupos definidos)
+        self.clase_de_grupo = {}
+        self.miembros_clase = []
+        self.reparto_clase = []
+        for codigo in sorted(catalogo):
+            clases = defaultdict(list)
+            for grupo in catalogo[codigo]['grupos']:
+                clases[grupo['mascara']].append(grupo)
+            for grupos in clases.values():
+                indices = []
+                for grupo in grupos:
+                    self.clase_de_grupo[grupo['id']] = len(self.miembros_clase)
+                    indices.append(len(self.ids_grupos))
+                    self.ids_grupos.append(grupo['id'])
+                    self.cupos.append(grupo['cupos'])
+                if all(g['cupos'] for g in grupos):
+                    capacidad = np.array([g['cupos'] for g in grupos], dtype=float)
+                else:
+                    capacidad = np.ones(len(grupos))
+                self.miembros_clase.append(np.array(indices))
+                self.reparto_clase.append(capacidad / capacidad.sum())
+        self._soluciones = {}
+
+    def _alternativas(self, materias, turno):
+        """Clases de grupo de los mejores horarios; si no hay, se relaja el turno y luego se quitan materias."""
+        clave = (materias, turno)
+        alternativas = self._soluciones.get(clave)
+        if alternativas is None:
+            codigos = [self.modelo['codigos'][i] for i in materias]
+            horarios = []
+            while codigos and not horarios:
+                horarios = logica.generar_horarios(self.catalogo, codigos, {'turno': turno},
+                                                   max_resultados=self.max_alternativas)
+                if not horarios and turno != 'cualquiera':
+                    horarios = logica.generar_horarios(self.catalogo, codigos,
+                                                       max_resultados=self.max_alternativas)
+                if not horarios:
+                    codigos.pop()  # El estudiante deja la materia que menos quería
+            alternativas = self._soluciones[clave] = [
+                [self.clase_de_grupo[g['id']] for g in horario['grupos'].values()] for horario in horarios
+            ]
+        return alternativas
+
+    def simular_cohorte(self, num_estudiantes, semilla):
+        """Simula una réplica y devuelve (demanda por grupo, estudiantes sin horario)."""
+        rng = np.random.default_rng(semilla)
+        materias, turnos = muestrear_cohorte(self.modelo, num_estudiantes, rng)
+        eleccion = rng.random(num_estudiantes)
+        demanda_clase = np.zeros(len(self.miembros_clase), dtype=np.int64)
+        sin_horario = 0
+        for fila, turno, u in zip(materias.tolist(), turnos.tolist(), eleccion.tolist()):
+            alternativas = self._alternativas(tuple(i for i in fila if i >= 0), TURNOS[turno])
+            if not alternativas:
+                sin_horario += 1
+                continue
+            acumulado = self.acumulado_alternativas[len(alternativas) - 1]
+            demanda_clase[alternativas[min(int(acumulado.searchsorted(u)), len(alternativas) - 1)]] += 1
+
+        demanda = np.zeros(len(self.ids_grupos), dtype=np.int64)
+        for clase in np.flatnonzero(demanda_clase):
+            demanda[self.miembros_clase[clase]] = rng.multinomial(demanda_clase[clase], self.reparto_clase[clase])
+        return demanda, sin_horario
+
+
+def _inicializar_trabajador(catalogo, modelo):
+    global _simulador
+    _simulador = SimuladorDemanda(catalogo, modelo)
+
+
+def _adjuntar_trabajador(nombre, modelo):
+    _inicializar_trabajador(catalogo_de_trabajador(nombre), modelo)
+
+
+def _simular_en_trabajador(argumentos):
+    num_estudiantes, semilla = argumentos
+    return _simulador.simular_cohorte(num_estudiantes, semilla)
+
+
+def simular_demanda(catalogo, modelo, num_estudiantes, replicas, procesos=None, semilla=None):
+    """
+    Corre `replicas` cohortes de `num_estudiantes`, repartidas entre procesos.
+    Devuelve (ids_grupos, demanda, sin_horario): `demanda` es una matriz
+    (replicas x grupos) y `sin_horario` cuenta, por réplica, los estudiantes
+    que no lograron ningún horario.
+    """
+    semillas = np.random.SeedSequence(semilla).spawn(replicas)
+    trabajos = [(num_estudiantes, s) for s in semillas]
+    if procesos == 1:
+        _inicializar_trabajador(catalogo, modelo)
+        resultados = list(map(_simular_en_trabajador, trabajos))
+    else:
+        with CatalogoCompartido.publicar(catalogo) as compartido, \
+                ProcessPoolExecutor(max_workers=procesos, initializer=_adjuntar_trabajador,
+                                    initargs=(compartido.nombre, modelo)) as pool:
+            resultados = list(pool.map(_simular_en_trabajador, trabajos))
+    ids_grupos = SimuladorDemanda(catalogo, modelo).ids_grupos
+    demanda = np.vstack([d for d, _ in resultados]) if resultados else np.zeros((0, len(ids_grupos)), dtype=np.int64)
+    return ids_grupos, demanda, np.array([s for _, s in resultados])
+
+
+def resumir_demanda(catalogo, ids_grupos, demanda, cupos_por_defecto=None):
+    """
+    Resume la demanda por grupo: media, percentiles 5/50/95 y probabilidad de
+    desborde (demanda > cupos). Los grupos sin cupos definidos usan
+    `cupos_por_defecto`; si tampoco hay, su probabilidad queda en None.
+    Ordenado de mayor a menor riesgo.
+    """
+    grupos = {g['id']: g for m in catalogo.values() for g in m['grupos']}
+    cupos = np.array([grupos[i]['cupos'] if grupos[i]['cupos'] is not None else
+                      (cupos_por_defecto if cupos_por_defecto is not None else np.nan)
+                      for i in ids_grupos], dtype=float)
+    media = demanda.mean(axis=0)
+    p5, p50, p95 = np.percentile(demanda, [5, 50, 95], axis=0)
+    desborde = (demanda > cupos).mean(axis=0)
+
+    resumen = []
+    for j, id_grupo in enumerate(ids_grupos):
+        grupo = grupos[id_grupo]
+        resumen.append({
+            'id_grupo': id_grupo,
+            'codigo': grupo['codigo'],
+            'materia': catalogo[grupo['codigo']]['nombre'],
+            'nombre_grupo': grupo['nombre'],
+            'cupos': None if np.isnan(cupos[j]) else int(cupos[j]),
+            'demanda_media': round(float(media[j]), 2),
+            'demanda_p5': round(float(p5[j]), 2),
+            'demanda_p50': round(float(p50[j]), 2),
+            'demanda_p95': round(float(p95[j]), 2),
+            'prob_desborde': None if np.isnan(cupos[j]) else round(float(desborde[j]), 4)
+        })
+    resumen.sort(key=lambda r: (r['prob_desborde'] is None, -(r['prob_desborde'] or 0), -r['demanda_media']))
+    return resumen
+
+
+def exportar_resumen(resumen, ruta):
+    """Escribe el resumen en CSV o JSON según la extensión de `ruta`."""
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        if ruta.lower().endswith(".json"):
+            json.dump(resumen, archivo, ensure_ascii=False, indent=2)
+        else:
+            escritor = csv.DictWriter(archivo, fieldnames=list(resumen[0]) if resumen else ['id_grupo'])
+            escritor.writeheader()
+            escritor.writerows(resumen)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula la demanda por grupo y estima qué grupos se quedan sin cupos.")
+    parser.add_argument("--estudiantes", type=int, default=2000, help="Estudiantes por réplica")
+    parser.add_argument("--replicas", type=int, default=50)
+    parser.add_argument("--modelo", choices=("historico", "parametrico"), default="historico",
+                        help="'historico' usa las matrículas registradas (si no hay, cae al paramétrico)")
+    parser.add_argument("--media-materias", type=float, default=5.0)
+    parser.add_argument("--max-materias", type=int, default=7)
+    parser.add_argument("--popularidad", help="JSON {codigo: peso} para el modelo paramétrico")
+    parser.add_argument("--cupos-por-defecto", type=int, default=None,
+                        help="Cupos supuestos para los grupos que no los tienen definidos")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("-o", "--salida", help="Archivo .csv o .json con el resumen por grupo")
+    parser.add_argument("--db", default=None, help="Ruta de la base de datos (por defecto, database/horarios.db)")
+    args = parser.parse_args(argv)
+
+    conn = db_manager.crear_conexion_migrada(args.db)
+    if not conn:
+        return 1
+    try:
+        catalogo = logica.compilar_catalogo(db_manager.obtener_sesiones_catalogo(conn))
+        modelo = modelo_historico(conn, catalogo) if args.modelo == "historico" else None
+    finally:
+        conn.close()
+    if modelo is None:
+        popularidad = None
+        if args.popularidad:
+            with open(args.popularidad, encoding="utf-8") as archivo:
+                popularidad = json.load(archivo)
+        modelo = modelo_parametrico(catalogo, popularidad, args.media_materias, args.max_materias)
+
+    inicio = time.perf_counter()
+    ids_grupos, demanda, sin_horario = simular_demanda(catalogo, modelo, args.estudiantes, args.replicas,
+                                                       args.procesos, args.semilla)
+    duracion = time.perf_counter() - inicio
+    resumen = resumir_demanda(catalogo, ids_grupos, demanda, args.cupos_por_defecto)
+
+    total = args.estudiantes * args.replicas
+    print(f"{total} estudiantes simulados en {duracion:.2f} s ({total / duracion:.0f} estudiantes/s); "
+          f"sin horario: {int(sin_horario.sum())}", file=sys.stderr)
+    if args.salida:
+        exportar_resumen(resumen, args.salida)
+    else:
+        print(f"{'Grupo':<45} {'Cupos':>6} {'Media':>8} {'p95':>6} {'P(desborde)':>12}")
+        for fila in resumen[:20]:
+            etiqueta = f"{fila['materia'][:30]} - {fila['nombre_grupo']}"
+            cupos = '-' if fila['cupos'] is None else fila['cupos']
+            prob = '-' if fila['prob_desborde'] is None else f"{fila['prob_desborde']:.2%}"
+            print(f"{etiqueta:<45} {cupos:>6} {fila['demanda_media']:>8.1f} {fila['demanda_p95']:>6.0f} {prob:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
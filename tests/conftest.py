@@ -0,0 +1,75 @@
+# PROYECTO_RAIZ/tests/conftest.py
+#
+# Catálogo pequeño armado a mano para las pruebas de la lógica pura, y una base
+# SQLite temporal con ese mismo catálogo para las de db_manager:
+#
+#     python -m pytest -q
+
+import sys
+import os
+
+import pytest
+
+# --- Inicio: Ajuste de ruta para importar db_manager ---
+directorio_actual_tests = os.path.dirname(os.path.abspath(__file__))
+proyecto_raiz = os.path.dirname(directorio_actual_tests)
+if proyecto_raiz not in sys.path:
+    sys.path.append(proyecto_raiz)
+# --- Fin: Ajuste de ruta ---
+
+from database import db_manager
+from logica.catalogo import catalogo_desde_filas
+
+# Mismas columnas que db_manager.obtener_sesiones_catalogo:
+# codigo, nombre, creditos, id_grupo, grupo, cupos, id_sesion, tipo, dia, inicio, fin, docente, salon
+FILAS = [
+    ("1001", "CALCULO DIFERENCIAL", 4, 10, "Grupo 1", 30, 100, "Teoría", "Lunes", "08:00", "10:00", "RAMIREZ ANA", "A101"),
+    ("1001", "CALCULO DIFERENCIAL", 4, 11, "Grupo 2", 30, 101, "Teoría", "Martes", "08:00", "10:00", "PEREZ LUIS", "A102"),
+    ("2002", "PROGRAMACIÓN", 3, 20, "Grupo 1", 25, 200, "Teoría", "Lunes", "09:00", "11:00", "GOMEZ SOFIA", "A101"),
+    ("2002", "PROGRAMACIÓN", 3, 21, "Grupo 2", 25, 201, "Laboratorio", "Miércoles", "14:00", "16:00", "RAMIREZ ANA", "LAB1"),
+    ("3003", "FÍSICA MECÁNICA", 4, 30, "Grupo 1", 40, 300, "Teoría", "Jueves", "10:00", "12:00", "GOMEZ SOFIA", "A205"),
+    ("4004", "ÉTICA", 2, None, None, None, None, None, None, None, None, None, None),
+]
+
+
+@pytest.fixture
+def catalogo():
+    return catalogo_desde_filas(FILAS)
+
+
+def poblar_base(conn, filas=FILAS):
+    """Inserta `filas` en una base ya creada y migrada, conservando los IDs de grupos y sesiones."""
+    for codigo, nombre, creditos, id_grupo, grupo, cupos, id_sesion, tipo, dia, inicio, fin, docente, salon in filas:
+        conn.execute("INSERT OR IGNORE INTO Materias VALUES (?, ?, ?)", (codigo, nombre, creditos))
+        if id_grupo is not None:
+            conn.execute("INSERT OR IGNORE INTO GruposMateria VALUES (?, ?, ?, ?)", (id_grupo, codigo, grupo, cupos))
+        if id_sesion is not None:
+            conn.execute("INSERT OR IGNORE INTO Docentes(nombre) VALUES (?)", (docente,))
+            conn.execute("INSERT OR IGNORE INTO Salones(nombre) VALUES (?)", (salon,))
+            conn.execute("""
+                INSERT INTO SesionesClase(id_sesion, id_grupo_materia_fk, tipo_sesion, dia_semana, hora_inicio, hora_fin,
+                                          id_docente_fk, id_salon_fk)
+                VALUES (?, ?, ?, ?, ?, ?, (SELECT id_docente FROM Docentes WHERE nombre = ?),
+                        (SELECT id_salon FROM Salones WHERE nombre = ?))
+            """, (id_sesion, id_grupo, tipo, dia, inicio, fin, docente, salon))
+    conn.commit()
+
+
+@pytest.fixture
+def ruta_base(tmp_path):
+    """Ruta de una base temporal con las tablas creadas y el catálogo de FILAS."""
+    ruta = str(tmp_path / "horarios.db")
+    conn = db_manager.crear_conexion(ruta)
+    try:
+        db_manager.crear_tablas(conn)
+        poblar_base(conn)
+    finally:
+        conn.close()
+    return ruta
+
+
+@pytest.fixture
+def conn(ruta_base):
+    conexion = db_manager.crear_conexion(ruta_base)
+    yield conexion
+    conexion.close()
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from logica.asignacion_cupos import asignar_cohorte
+from logica.logica import compilar_catalogo
+
+from conftest import FILAS
+
+
+def _catalogo(cupos):
+    """Catálogo de FILAS con `cupos` en todos los grupos."""
+    return compilar_catalogo([fila[:5] + (cupos if fila[3] is not None else None,) + fila[6:] for fila in FILAS])
+
+
+def _grupos_por_id(catalogo):
+    return {g['id']: g for materia in catalogo.values() for g in materia['grupos']}
+
+
+def test_nunca_se_excede_el_cupo_ni_hay_cruces():
+    catalogo = _catalogo(3)
+    grupos = _grupos_por_id(catalogo)
+    azar = random.Random(5)
+    solicitudes = []
+    for i in range(40):
+        codigos = azar.sample(["1001", "2002", "3003"], azar.randint(1, 3))
+        preferidos = {c: azar.sample([g['id'] for g in catalogo[c]['grupos']], len(catalogo[c]['grupos']))
+                      for c in codigos if azar.random() < 0.5}
+        solicitudes.append({'estudiante': f"e{i}", 'codigos': codigos, 'grupos_preferidos': preferidos})
+
+    resultado = asignar_cohorte(catalogo, solicitudes)
+
+    assert all(n <= grupos[id_grupo]['cupos'] for id_grupo, n in resultado['ocupacion'].items())
+    ocupacion = {}
+    for estudiante, asignadas in resultado['asignaciones'].items():
+        mascara = 0
+        for codigo, id_grupo in asignadas.items():
+            assert grupos[id_grupo]['codigo'] == codigo
+            assert not mascara & grupos[id_grupo]['mascara']
+            mascara |= grupos[id_grupo]['mascara']
+            ocupacion[id_grupo] = ocupacion.get(id_grupo, 0) + 1
+    assert ocupacion == resultado['ocupacion']
+    # Cada materia pedida queda asignada o reportada, nunca las dos cosas
+    sin_asignar = {(e, c) for e, c, _ in resultado['sin_asignar']}
+    for solicitud in solicitudes:
+        for codigo in solicitud['codigos']:
+            asignada = codigo in resultado['asignaciones'][solicitud['estudiante']]
+            assert asignada != ((solicitud['estudiante'], codigo) in sin_asignar)
+    assert len(resultado['sin_asignar']) > 0 and resultado['rechazadas'] == []
+
+
+def test_respeta_el_ranking_cuando_hay_cupo():
+    resultado = asignar_cohorte(_catalogo(5), [
+        {'estudiante': "a", 'codigos': ["1001"], 'grupos_preferidos': {"1001": [11, 10]}},
+        {'estudiante': "b", 'codigos': ["1001", "2002"], 'grupos_preferidos': {"2002": ["Grupo 1"]}},
+    ])
+    assert resultado['asignaciones']["a"] == {"1001": 11}
+    # 2002 sólo acepta el grupo 20 (lunes 09:00), así que 1001 no puede ser el grupo 10
+    assert resultado['asignaciones']["b"] == {"1001": 11, "2002": 20}
+    assert resultado['costo_total'] == 0
+
+
+def test_el_unico_grupo_compatible_queda_para_quien_no_tiene_otro():
+    # "a" puede ir a cualquier grupo de 1001; "b" sólo al 10 porque el martes lo tiene bloqueado
+    resultado = asignar_cohorte(_catalogo(1), [
+        {'estudiante': "a", 'codigos': ["1001"], 'grupos_preferidos': {"1001": [10, 11]}},
+        {'estudiante': "b", 'codigos': ["1001"], 'bloqueos': ["Martes 08:00-10:00"]},
+    ])
+    assert resultado['asignaciones'] == {"a": {"1001": 11}, "b": {"1001": 10}}
+    assert resultado['sin_asignar'] == []
+
+
+@pytest.mark.parametrize("solicitud", [
+    {'error': "JSON inválido"},
+    {'codigos': "1001"},
+    {'codigos': ["1001"], 'grupos_preferidos': ["Grupo 1"]},
+    {'codigos': ["1001"], 'grupos_preferidos': {"1001": "Grupo 1"}},
+    {'codigos': ["1001"], 'grupos_preferidos': {"1001": [[10]]}},
+    {'codigos': ["1001"], 'bloqueos': [["Lunes", 7, 9]]},
+    {'codigos': ["1001"], 'bloqueos': ["Lunes 23:00-23:30"]},
+    {'codigos': [["1001"]]},
+])
+def test_solicitudes_malformadas_se_rechazan_sin_afectar_a_las_demas(solicitud):
+    resultado = asignar_cohorte(_catalogo(1), [
+        dict(solicitud, estudiante="malo"),
+        {'estudiante': "bueno", 'codigos': ["1001"]},
+    ])
+    assert [estudiante for estudiante, _ in resultado['rechazadas']] == ["malo"]
+    assert "malo" not in resultado['asignaciones']
+    assert resultado['asignaciones']["bueno"] == {"1001": 10}
+
+
+def test_estudiante_repetido_y_materia_desconocida():
+    resultado = asignar_cohorte(_catalogo(1), [
+        {'estudiante': "a", 'codigos': ["1001", "9999"]},
+        {'estudiante': "a", 'codigos': ["3003"]},
+    ])
+    assert resultado['asignaciones'] == {"a": {"1001": 10}}
+    assert resultado['sin_asignar'] == [("a", "9999", "materia desconocida")]
+    assert resultado['rechazadas'] == [("a", "estudiante repetido; se conserva su primera solicitud")]
@@ -0,0 +1,65 @@
+import random
+
+from logica.auditoria import auditar, barrer_solapamientos, sesiones_desde_catalogo
+
+from conftest import FILAS
+
+
+def _intervalos(*tramos):
+    """Tramos (inicio, fin, id_grupo) -> intervalos ordenados por inicio, con el índice como id de sesión."""
+    intervalos = [(inicio, fin, {'id_sesion': i, 'id_grupo': grupo})
+                  for i, (inicio, fin, grupo) in enumerate(tramos)]
+    intervalos.sort(key=lambda intervalo: (intervalo[0], intervalo[1]))
+    return intervalos
+
+
+def _pares(intervalos):
+    return {frozenset((a['id_sesion'], b['id_sesion'])) for a, b in barrer_solapamientos(intervalos)}
+
+
+def test_solapamientos_basicos():
+    intervalos = _intervalos(
+        (480, 600, 1),   # 0: 08:00-10:00
+        (540, 660, 2),   # 1: 09:00-11:00, se cruza con 0
+        (600, 720, 3),   # 2: 10:00-12:00, sólo toca a 0 y se cruza con 1
+        (500, 520, 4),   # 3: dentro de 0
+    )
+    assert _pares(intervalos) == {frozenset(p) for p in [(0, 1), (1, 2), (0, 3)]}
+
+
+def test_intervalos_que_se_tocan_no_se_cruzan():
+    assert _pares(_intervalos((480, 600, 1), (600, 720, 2))) == set()
+
+
+def test_sesiones_del_mismo_grupo_no_se_reportan():
+    assert _pares(_intervalos((480, 600, 1), (540, 660, 1), (550, 560, 2))) == {frozenset((0, 2)), frozenset((1, 2))}
+
+
+def test_coincide_con_la_comparacion_de_todos_los_pares():
+    azar = random.Random(7)
+    tramos = []
+    for _ in range(200):
+        inicio = azar.randrange(420, 1260, 30)
+        tramos.append((inicio, inicio + azar.choice((60, 90, 120, 180)), azar.randrange(40)))
+    intervalos = _intervalos(*tramos)
+
+    esperados = set()
+    for i, (ini_a, fin_a, grupo_a) in enumerate(tramos):
+        for j in range(i + 1, len(tramos)):
+            ini_b, fin_b, grupo_b = tramos[j]
+            if grupo_a != grupo_b and ini_a < fin_b and ini_b < fin_a:
+                esperados.add(frozenset((i, j)))
+
+    pares = list(barrer_solapamientos(intervalos))
+    assert len(pares) == len(esperados)
+    assert {frozenset((a['id_sesion'], b['id_sesion'])) for a, b in pares} == esperados
+
+
+def test_auditar_catalogo():
+    cruces = auditar(sesiones_desde_catalogo(FILAS))
+
+    assert len(cruces) == 1
+    cruce = cruces[0]
+    assert (cruce['recurso'], cruce['nombre'], cruce['dia']) == ('salon', 'A101', 'Lunes')
+    assert (cruce['inicio'], cruce['fin']) == ('09:00', '10:00')
+    assert {cruce['sesion_a'], cruce['sesion_b']} == {100, 200}
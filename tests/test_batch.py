@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from logica.batch import leer_bloqueo, leer_solicitudes, procesar_lote, resolver_solicitud
+from logica.logica import compilar_catalogo
+
+from conftest import FILAS
+
+
+@pytest.fixture
+def catalogo_batch():
+    return compilar_catalogo(FILAS)
+
+
+def _grupos(resultado):
+    return {(g['codigo'], g['id_grupo']) for g in resultado['horarios'][0]['grupos']}
+
+
+def test_resuelve_sin_cruces_y_respeta_bloqueos(catalogo_batch):
+    resultado = resolver_solicitud({'estudiante': 'e1', 'codigos': ["1001", "2002"]}, catalogo_batch)
+    assert resultado['estado'] == 'ok'
+    assert (("1001", 10) in _grupos(resultado)) != (("2002", 20) in _grupos(resultado))
+
+    for bloqueo in ("Lunes 07:00-09:00", ["Lunes", "07:00", "09:00"]):
+        resultado = resolver_solicitud({'codigos': ["1001"], 'bloqueos': [bloqueo]}, catalogo_batch)
+        assert _grupos(resultado) == {("1001", 11)}
+
+    resultado = resolver_solicitud({'codigos': ["1001"], 'bloqueos': ["Lunes 08:00-10:00", "Martes 08:00-10:00"]},
+                                   catalogo_batch)
+    assert (resultado['estado'], resultado['horarios']) == ('sin_solucion', [])
+
+
+def test_leer_bloqueo_rechaza_formas_invalidas():
+    assert leer_bloqueo("Lunes 07:00-09:00") == ("Lunes", "07:00", "09:00")
+    for bloqueo in ("Lunes", "Lunes 07:00", ["Lunes", 7, 9], ["Lunes", "07:00"], {"dia": "Lunes"}, 7):
+        with pytest.raises(ValueError):
+            leer_bloqueo(bloqueo)
+
+
+@pytest.mark.parametrize("solicitud", [
+    {'error': "JSON inválido"},
+    {'codigos': "1001"},
+    {'codigos': ["9999"]},
+    {'codigos': [["1001"]]},
+    {'codigos': ["1001"], 'bloqueos': [["Lunes", 7, 9]]},
+    {'codigos': ["1001"], 'bloqueos': ["Lunes 23:00-23:30"]},
+    {'codigos': ["1001"], 'bloqueos': "Lunes 07:00-09:00"},
+    {'codigos': ["1001"], 'preferencias': ["tarde"]},
+])
+def test_solicitudes_malformadas_dan_error_sin_excepcion(catalogo_batch, solicitud):
+    resultado = resolver_solicitud(dict(solicitud, estudiante='e1'), catalogo_batch)
+    assert resultado['estudiante'] == 'e1'
+    assert resultado['estado'] == 'error' and resultado['error']
+    assert 'latencia_ms' in resultado
+
+
+def test_el_lote_sigue_despues_de_una_solicitud_invalida(tmp_path, catalogo_batch):
+    ruta = tmp_path / "solicitudes.jsonl"
+    ruta.write_text("\n".join([
+        json.dumps({'estudiante': 'a', 'codigos': ["3003"]}),
+        "{no es json",
+        "",
+        "[1, 2]",
+        json.dumps({'codigos': ["1001"], 'bloqueos': [[1, 2, 3]]}),
+        json.dumps({'estudiante': 'b', 'codigos': ["2002"]}),
+    ]), encoding="utf-8")
+
+    salida = io.StringIO()
+    latencias = procesar_lote(catalogo_batch, leer_solicitudes(str(ruta)), salida, procesos=1)
+
+    registros = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert len(latencias) == len(registros) == 5
+    assert [(r['estudiante'], r['estado']) for r in registros] == [
+        ('a', 'ok'), ('linea-2', 'error'), ('linea-4', 'error'), ('linea-5', 'error'), ('b', 'ok')]
@@ -0,0 +1,88 @@
+import pytest
+
+from logica.busqueda import IndiceBusqueda
+from logica.catalogo import catalogo_desde_filas
+
+
+@pytest.fixture
+def indice(catalogo):
+    return IndiceBusqueda(catalogo)
+
+
+def _codigos(materias):
+    return [materia.codigo for materia in materias]
+
+
+def test_sin_texto_devuelve_todo_el_catalogo(indice):
+    assert _codigos(indice.buscar("")) == ["1001", "2002", "3003", "4004"]
+    assert _codigos(indice.buscar("  ", limite=2)) == ["1001", "2002"]
+
+
+def test_ignora_tildes_y_mayusculas(indice):
+    assert _codigos(indice.buscar("programacion")) == ["2002"]
+    assert _codigos(indice.buscar("FISICA")) == _codigos(indice.buscar("física")) == ["3003"]
+    assert _codigos(indice.buscar("Ramírez")) == ["1001", "2002"]
+
+
+def test_busca_por_codigo_docente_salon_y_dia(indice):
+    assert _codigos(indice.buscar("1001")) == ["1001"]
+    assert _codigos(indice.buscar("perez")) == ["1001"]
+    assert _codigos(indice.buscar("lab1")) == ["2002"]
+    assert _codigos(indice.buscar("jueves")) == ["3003"]
+
+
+def test_todos_los_terminos_deben_coincidir(indice):
+    assert _codigos(indice.buscar("ramirez miercoles")) == ["2002"]
+    assert _codigos(indice.buscar("ramirez xyz")) == []
+
+
+def test_coincidencias_parciales_ordenadas_por_relevancia(indice):
+    # "ca" empieza una palabra del nombre de CALCULO y sólo aparece dentro de las demás
+    assert _codigos(indice.buscar("ca")) == ["1001", "3003", "4004"]
+    assert _codigos(indice.buscar("mecan")) == ["3003"]
+    assert _codigos(indice.buscar("ca", limite=1)) == ["1001"]
+
+
+def test_el_codigo_pesa_mas_que_el_docente():
+    filas = [
+        ("5005", "TALLER", 2, 1, "Grupo 1", 20, 1, "Teoría", "Lunes", "08:00", "10:00", "ANA 7007", "B1"),
+        ("7007", "SEMINARIO", 2, 2, "Grupo 1", 20, 2, "Teoría", "Martes", "08:00", "10:00", "LUIS", "B2"),
+    ]
+    indice = IndiceBusqueda(catalogo_desde_filas(filas))
+    assert _codigos(indice.buscar("7007")) == ["7007", "5005"]
+
+
+def test_repetir_la_busqueda_da_el_mismo_resultado(indice):
+    primera = _codigos(indice.buscar("ram"))
+    indice.buscar("rami")
+    assert _codigos(indice.buscar("ram")) == primera == ["1001", "2002"]
+
+
+def test_facetas_de_todo_el_catalogo(indice):
+    facetas = indice.facetas("")
+    assert facetas['dia'] == [("Lunes", 2), ("Martes", 1), ("Miércoles", 1), ("Jueves", 1)]
+    assert facetas['tipo'] == [("Teoría", 4), ("Laboratorio", 1)]
+    assert facetas['docente'][-1] == ("PEREZ LUIS", 1)
+    assert dict(facetas['docente']) == {"GOMEZ SOFIA": 2, "RAMIREZ ANA": 2, "PEREZ LUIS": 1}
+    assert facetas['creditos'] == [(3, 2), (4, 3)]
+    assert facetas['turno'] == [("mañana", 4), ("tarde", 1)]
+
+
+def test_facetas_de_una_busqueda(indice):
+    facetas = indice.facetas("programacion")
+    assert facetas['dia'] == [("Lunes", 1), ("Miércoles", 1)]
+    assert facetas['docente'] == [("GOMEZ SOFIA", 1), ("RAMIREZ ANA", 1)]
+    assert facetas['creditos'] == [(3, 2)]
+    assert indice.facetas("xyz") == {faceta: [] for faceta in facetas}
+
+
+def test_facetas_dia_canonico_y_turno_mixto():
+    filas = [
+        ("5005", "TALLER", 2, 1, "Grupo 1", 20, 1, "Teoría", "miercoles", "08:00", "10:00", "ANA", "B1"),
+        ("5005", "TALLER", 2, 1, "Grupo 1", 20, 2, "Laboratorio", "Miércoles", "14:00", "16:00", "ANA", "B2"),
+        ("5005", "TALLER", 2, 2, "Grupo 2", 20, 3, "Teoría", "Viernes", "15:00", "17:00", "LUIS", "B1"),
+    ]
+    facetas = IndiceBusqueda(catalogo_desde_filas(filas)).facetas("taller")
+    assert facetas['dia'] == [("Miércoles", 1), ("Viernes", 1)]
+    assert facetas['tipo'] == [("Teoría", 2), ("Laboratorio", 1)]
+    assert facetas['turno'] == [("tarde", 1), ("mixto", 1)]
@@ -0,0 +1,78 @@
+from database import db_manager
+
+
+def _leer(conn, materias=(), grupos=(), sesiones=()):
+    for codigo in materias:
+        db_manager.obtener_materia_por_codigo(conn, codigo)
+    for id_grupo in grupos:
+        db_manager.obtener_grupo_por_id(conn, id_grupo)
+    for id_sesion in sesiones:
+        db_manager.obtener_sesion_por_id(conn, id_sesion)
+
+
+def test_aciertos_y_fallos(conn):
+    primera = db_manager.obtener_materia_por_codigo(conn, "1001")
+    assert db_manager.obtener_materia_por_codigo(conn, "1001") == primera == ("1001", "CALCULO DIFERENCIAL", 4)
+    assert db_manager.obtener_materia_por_codigo(conn, "9999") is None  # lo que no existe no se guarda
+    assert db_manager.obtener_materia_por_codigo(conn, "9999") is None
+
+    estadisticas = db_manager.estadisticas_cache(conn)
+    assert (estadisticas["aciertos"], estadisticas["fallos"], estadisticas["entradas"]) == (1, 3, 1)
+    assert estadisticas["tasa_aciertos"] == 0.25
+
+
+def test_desaloja_la_menos_reciente(ruta_base):
+    conn = db_manager.crear_conexion(ruta_base, tamano_cache=2)
+    try:
+        _leer(conn, materias=["1001", "2002"])
+        _leer(conn, materias=["1001"])  # 2002 queda como la menos reciente
+        _leer(conn, materias=["3003"])
+        estadisticas = db_manager.estadisticas_cache(conn)
+        assert (estadisticas["entradas"], estadisticas["desalojos"]) == (2, 1)
+
+        _leer(conn, materias=["1001", "3003"])
+        assert db_manager.estadisticas_cache(conn)["aciertos"] == 3
+        _leer(conn, materias=["2002"])
+        assert db_manager.estadisticas_cache(conn)["fallos"] == 4
+    finally:
+        conn.close()
+
+
+def test_eliminar_materia_desaloja_grupos_y_sesiones(conn):
+    _leer(conn, materias=["1001", "2002"], grupos=[10, 20], sesiones=[100, 101, 200])
+
+    assert db_manager.eliminar_materia(conn, "1001")
+
+    # El grupo 11 no estaba en la caché, pero su sesión 101 sí
+    assert db_manager.estadisticas_cache(conn)["invalidaciones"] == 4
+    assert db_manager.obtener_materia_por_codigo(conn, "1001") is None
+    assert db_manager.obtener_grupo_por_id(conn, 10) is None
+    assert db_manager.obtener_sesion_por_id(conn, 100) is None
+    assert db_manager.obtener_sesion_por_id(conn, 101) is None
+    aciertos = db_manager.estadisticas_cache(conn)["aciertos"]
+    _leer(conn, materias=["2002"], grupos=[20], sesiones=[200])
+    assert db_manager.estadisticas_cache(conn)["aciertos"] == aciertos + 3
+
+
+def test_las_actualizaciones_no_dejan_filas_viejas(conn):
+    _leer(conn, materias=["1001"], grupos=[10], sesiones=[100])
+
+    assert db_manager.actualizar_materia(conn, "1001", nuevos_creditos=5)
+    assert db_manager.obtener_materia_por_codigo(conn, "1001")[2] == 5
+    assert db_manager.actualizar_sesion_clase(conn, 100, salon="B9")
+    assert db_manager.obtener_sesion_por_id(conn, 100)[7] == "B9"
+
+    # SQL directo en la misma conexión: se vacía todo en la siguiente lectura
+    assert db_manager.obtener_grupo_por_id(conn, 10)[3] == 30
+    conn.execute("UPDATE GruposMateria SET cupos = 0 WHERE id_grupo_materia = 10")
+    conn.commit()
+    assert db_manager.obtener_grupo_por_id(conn, 10)[3] == 0
+
+
+def test_cache_desactivada(ruta_base):
+    conn = db_manager.crear_conexion(ruta_base, tamano_cache=0)
+    try:
+        assert db_manager.obtener_materia_por_codigo(conn, "1001")[0] == "1001"
+        assert db_manager.estadisticas_cache(conn) is None
+    finally:
+        conn.close()
@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+
+from logica import catalogo as catalogo_compacto
+from logica.catalogo import catalogo_desde_filas
+from logica.compatibles import BuscadorCompatibles
+from logica.estado_horario import EstadoHorario
+
+
+def _grupo(catalogo, codigo, indice):
+    return catalogo.materia(codigo).grupos[indice]
+
+
+def _nombres(catalogo, arreglo):
+    return {(g.materia.codigo, g.nombre) for g in catalogo.grupos if arreglo[g.id]}
+
+
+def test_horario_vacio(catalogo):
+    buscador = BuscadorCompatibles(catalogo)
+    compatibles = buscador.compatibles(EstadoHorario())
+    assert compatibles.all()
+    assert not compatibles.flags.writeable
+
+
+def test_excluye_cruces_y_materias_inscritas(catalogo):
+    buscador = BuscadorCompatibles(catalogo)
+    estado = EstadoHorario()
+    estado.agregar(_grupo(catalogo, "1001", 0))  # Lunes 08:00-10:00
+
+    assert _nombres(catalogo, buscador.compatibles(estado)) == {("2002", "Grupo 2"), ("3003", "Grupo 1")}
+    assert not buscador.cabe(_grupo(catalogo, "1001", 1), estado)
+    assert not buscador.cabe(_grupo(catalogo, "2002", 0), estado)
+    assert buscador.cabe(_grupo(catalogo, "2002", 1), estado)
+
+    materias = buscador.materias_compatibles(estado)
+    assert [m.codigo for m in catalogo.materias if materias[m.id]] == ["2002", "3003"]
+
+
+def test_recalcula_al_cambiar_la_version(catalogo):
+    buscador = BuscadorCompatibles(catalogo)
+    estado = EstadoHorario()
+    antes = buscador.compatibles(estado)
+    assert buscador.compatibles(estado) is antes
+
+    estado.agregar(_grupo(catalogo, "3003", 0))
+    despues = buscador.compatibles(estado)
+    assert despues is not antes
+    assert not despues[_grupo(catalogo, "3003", 0).id]
+
+    estado.limpiar()
+    assert buscador.compatibles(estado).all()
+    # Otro estado con la misma versión no reutiliza el resultado
+    otro = EstadoHorario()
+    otro.agregar(_grupo(catalogo, "1001", 0))
+    assert not buscador.compatibles(otro).all()
+
+
+def test_grupo_fuera_de_la_jornada_nunca_cabe():
+    filas = [
+        ("5005", "TALLER", 2, 1, "Grupo 1", 20, 1, "Teoría", "Domingo", "08:00", "10:00", "ANA", "B1"),
+        ("5005", "TALLER", 2, 2, "Grupo 2", 20, 2, "Teoría", "Lunes", "08:00", "10:00", "ANA", "B1"),
+    ]
+    catalogo = catalogo_desde_filas(filas)
+    buscador = BuscadorCompatibles(catalogo)
+    assert buscador.compatibles(EstadoHorario()).tolist() == [False, True]
+
+
+def test_coincide_con_estado_horario_en_un_catalogo_sintetico():
+    conn = catalogo_compacto.base_sintetica(2000, 3)
+    try:
+        catalogo = catalogo_compacto.cargar_catalogo(conn)
+    finally:
+        conn.close()
+    buscador = BuscadorCompatibles(catalogo)
+    azar = random.Random(3)
+    estado = EstadoHorario()
+    for _ in range(8):
+        esperado = np.array([grupo.materia.id not in estado.materias and estado.cabe(grupo)
+                             for grupo in catalogo.grupos])
+        compatibles = buscador.compatibles(estado)
+        assert (compatibles == esperado).all()
+        caben = np.flatnonzero(compatibles)
+        if not len(caben):
+            break
+        assert estado.agregar(catalogo.grupos[int(caben[azar.randrange(len(caben))])])
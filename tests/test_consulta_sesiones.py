@@ -0,0 +1,76 @@
+import pytest
+
+from database import db_manager
+from database.db_manager import ConsultaSesiones
+
+ORDEN = [100, 200, 101, 201, 300]  # por día, hora de inicio e id
+
+
+def _ids(filas):
+    return [fila[0] for fila in filas]
+
+
+def _paginas(consulta, conn, tamano):
+    paginas, siguiente = [], None
+    while True:
+        filas, siguiente = consulta.pagina(conn, tamano, despues_de=siguiente)
+        paginas.append(_ids(filas))
+        if siguiente is None:
+            return paginas
+
+
+def test_compila_los_filtros_en_una_consulta_parametrizada():
+    consulta = (ConsultaSesiones().dias("Miércoles", "lunes").franja("08:00", "11:00")
+                .tipos("teoría").docente("100%").creditos(3, 4).con_cupos())
+    sql, parametros = consulta.compilar(limite=10)
+
+    assert "S.dia_num IN (?, ?)" in sql and "S.fin_min <= ?" in sql and "S.inicio_min >= ?" in sql
+    assert "LIKE ? ESCAPE" in sql and "G.cupos IS NULL OR G.cupos > 0" in sql
+    assert sql.rstrip().endswith("LIMIT ?")
+    assert parametros == [2, 0, 660, "TEORÍA", "%100\\%%", 3, 4, 480, 10]
+    # Una sola cota inferior de inicio_min, la más estricta
+    sql, parametros = consulta.compilar(inicio_minimo=540)
+    assert sql.count("S.inicio_min >= ?") == 1 and parametros[-1] == 540
+
+
+def test_filtros(conn):
+    assert _ids(ConsultaSesiones().iterar(conn)) == ORDEN
+    assert _ids(ConsultaSesiones().dias("Lunes", "miercoles").iterar(conn)) == [100, 200, 201]
+    assert _ids(ConsultaSesiones().franja(desde="09:00").iterar(conn)) == [200, 201, 300]
+    assert _ids(ConsultaSesiones().franja(hasta="10:00").iterar(conn)) == [100, 101]
+    assert _ids(ConsultaSesiones().tipos("LABORATORIO").iterar(conn)) == [201]
+    assert _ids(ConsultaSesiones().docente("ramirez").iterar(conn)) == [100, 201]
+    assert _ids(ConsultaSesiones().salon("a10").dias("Lunes").iterar(conn)) == [100, 200]
+    assert _ids(ConsultaSesiones().creditos(minimo=4).iterar(conn)) == [100, 101, 300]
+    assert _ids(ConsultaSesiones().materias("2002", "3003").iterar(conn, tamano_lote=1)) == [200, 201, 300]
+    assert ConsultaSesiones().materias("2002").contar(conn) == 2
+
+    conn.execute("UPDATE GruposMateria SET cupos = 0 WHERE id_grupo_materia = 10")
+    conn.commit()
+    assert _ids(ConsultaSesiones().con_cupos().iterar(conn)) == [200, 101, 201, 300]
+
+
+@pytest.mark.parametrize("tamano", [1, 2, 4, 5, 6])
+def test_paginas_cubren_todo_sin_repetir(conn, tamano):
+    paginas = _paginas(ConsultaSesiones(), conn, tamano)
+    assert [i for pagina in paginas for i in pagina] == ORDEN
+    assert all(len(pagina) == tamano for pagina in paginas[:-1])
+    # Si el total es múltiplo del tamaño no queda una página vacía al final
+    assert len(paginas) == -(-len(ORDEN) // tamano)
+
+
+def test_paginas_con_filtros(conn):
+    assert _paginas(ConsultaSesiones().dias("Lunes", "Jueves"), conn, 2) == [[100, 200], [300]]
+    assert _paginas(ConsultaSesiones().docente("gomez"), conn, 1) == [[200], [300]]
+    assert _paginas(ConsultaSesiones().franja(desde="09:00"), conn, 2) == [[200, 201], [300]]
+
+
+def test_la_clave_sigue_valiendo_tras_insertar_antes(conn):
+    filas, siguiente = ConsultaSesiones().pagina(conn, 2)
+    assert _ids(filas) == [100, 200] and siguiente == (0, 540, 200)
+
+    # Una sesión nueva antes de la clave no desplaza la página siguiente (con OFFSET sí lo haría)
+    nueva = db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "07:00", "08:00", "OTRO", "B9")
+    filas, _ = ConsultaSesiones().pagina(conn, 2, despues_de=siguiente)
+    assert _ids(filas) == [101, 201]
+    assert nueva in _ids(ConsultaSesiones().iterar(conn))
@@ -0,0 +1,96 @@
+from logica.estado_horario import EstadoHorario, mascara_grupo
+
+
+def _grupo(catalogo, codigo, indice):
+    return catalogo.materia(codigo).grupos[indice]
+
+
+def test_agregar_y_quitar(catalogo):
+    estado = EstadoHorario()
+    calculo = _grupo(catalogo, "1001", 0)
+
+    assert estado.agregar(calculo)
+    assert calculo in estado and len(estado) == 1
+    assert estado.creditos == 4
+    assert estado.ocupacion == mascara_grupo(calculo)
+    assert set(estado.celdas) == {("Lunes", "08:00"), ("Lunes", "09:00")}
+    assert estado.grupo_en("Lunes", "09:00") is calculo
+
+    assert estado.quitar(calculo)
+    assert calculo not in estado and len(estado) == 0
+    assert estado.celdas == {} and estado.materias == {}
+    assert estado.ocupacion == 0 and estado.creditos == 0
+    assert not estado.quitar(calculo)
+
+
+def test_rechaza_grupo_que_se_cruza(catalogo):
+    estado = EstadoHorario()
+    calculo = _grupo(catalogo, "1001", 0)
+    programacion = _grupo(catalogo, "2002", 0)  # Lunes 09:00-11:00
+    estado.agregar(calculo)
+    version = estado.version
+
+    assert [(dia, hora) for dia, hora, _ in estado.conflictos(programacion)] == [("Lunes", "09:00")]
+    assert not estado.cabe(programacion)
+    assert not estado.agregar(programacion)
+    assert programacion not in estado
+    assert estado.version == version
+    assert estado.creditos == 4
+
+
+def test_rechaza_segundo_grupo_de_la_misma_materia(catalogo):
+    estado = EstadoHorario()
+    estado.agregar(_grupo(catalogo, "1001", 0))
+    otro_grupo = _grupo(catalogo, "1001", 1)  # no se cruza, pero es la misma materia
+
+    assert estado.conflictos(otro_grupo) == []
+    assert not estado.agregar(otro_grupo)
+    assert estado.materias[otro_grupo.materia.id] is _grupo(catalogo, "1001", 0)
+
+
+def test_quitar_en(catalogo):
+    estado = EstadoHorario()
+    fisica = _grupo(catalogo, "3003", 0)
+    estado.agregar(fisica)
+    estado.agregar(_grupo(catalogo, "1001", 0))
+
+    assert estado.quitar_en("Jueves", "11:00") is fisica
+    assert fisica not in estado
+    assert ("Jueves", "10:00") not in estado.celdas
+    assert estado.quitar_en("Jueves", "10:00") is None
+    assert len(estado) == 1
+
+
+def test_limpiar(catalogo):
+    estado = EstadoHorario()
+    for codigo in ("1001", "3003"):
+        estado.agregar(_grupo(catalogo, codigo, 0))
+
+    estado.limpiar()
+    assert len(estado) == 0 and estado.grupos() == []
+    assert estado.celdas == {} and estado.materias == {}
+    assert estado.ocupacion == 0 and estado.creditos == 0
+    assert estado.agregar(_grupo(catalogo, "2002", 0))
+
+
+def test_version_cambia_solo_con_cambios(catalogo):
+    estado = EstadoHorario()
+    calculo = _grupo(catalogo, "1001", 0)
+    versiones = [estado.version]
+
+    estado.agregar(calculo)
+    versiones.append(estado.version)
+    estado.agregar(calculo)  # ya está: no cambia nada
+    versiones.append(estado.version)
+    estado.quitar(calculo)
+    versiones.append(estado.version)
+    estado.quitar(calculo)
+    versiones.append(estado.version)
+    estado.limpiar()
+    versiones.append(estado.version)
+
+    assert versiones[1] > versiones[0]
+    assert versiones[2] == versiones[1]
+    assert versiones[3] > versiones[2]
+    assert versiones[4] == versiones[3]
+    assert versiones[5] > versiones[4]
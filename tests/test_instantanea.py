@@ -0,0 +1,87 @@
+import os
+import sqlite3
+
+import pytest
+
+from database import db_manager
+from logica import catalogo as catalogo_compacto
+from logica.catalogo import catalogo_desde_filas
+
+from conftest import FILAS
+
+HUELLA = bytes(range(32))
+
+
+def _resumen(catalogo):
+    """El catálogo como tuplas anidadas, para comparar dos catálogos."""
+    return [
+        (m.id, m.codigo, m.nombre, m.creditos, [
+            (g.id, g.id_db, g.nombre, g.cupos, [
+                (s.id, s.id_db, s.tipo, s.dia, s.hora_inicio, s.hora_fin, s.docente, s.salon) for s in g.sesiones
+            ]) for g in m.grupos
+        ]) for m in catalogo.materias
+    ]
+
+
+def test_ida_y_vuelta(tmp_path, catalogo):
+    ruta = str(tmp_path / "catalogo.bin")
+    catalogo.grupos[0].cupos = None
+    catalogo.sesiones[0].salon = None
+    catalogo_compacto.guardar_instantanea(catalogo, ruta, HUELLA)
+
+    leido = catalogo_compacto.leer_instantanea(ruta, HUELLA)
+    assert _resumen(leido) == _resumen(catalogo)
+    assert leido.materia("2002").grupos[1].sesiones[0].grupo.materia is leido.materia("2002")
+    assert catalogo_compacto.leer_instantanea(ruta) is not None  # sin huella no se valida
+
+
+def test_rechaza_huella_formato_o_archivo_incompleto(tmp_path, catalogo):
+    ruta = str(tmp_path / "catalogo.bin")
+    catalogo_compacto.guardar_instantanea(catalogo, ruta, HUELLA)
+    with open(ruta, "rb") as archivo:
+        datos = archivo.read()
+
+    assert catalogo_compacto.leer_instantanea(ruta, bytes(32)) is None
+    for alterados in (datos[:-1], datos + b"\0", datos[:4] + b"\x63\x00" + datos[6:], b"CATH"):
+        with open(ruta, "wb") as archivo:
+            archivo.write(alterados)
+        assert catalogo_compacto.leer_instantanea(ruta, HUELLA) is None
+    assert catalogo_compacto.leer_instantanea(str(tmp_path / "no_existe.bin")) is None
+
+
+def test_cargar_rapido_reutiliza_la_instantanea_vigente(ruta_base, monkeypatch):
+    primero = catalogo_compacto.cargar_catalogo_rapido(ruta_base)
+    assert _resumen(primero) == _resumen(catalogo_desde_filas(sorted(FILAS, key=lambda f: f[1])))
+    assert os.path.exists(catalogo_compacto.ruta_instantanea(ruta_base))
+
+    def no_consultar(conn):
+        raise AssertionError("con la instantánea vigente no se consulta la base")
+    monkeypatch.setattr(catalogo_compacto, "cargar_catalogo", no_consultar)
+    assert _resumen(catalogo_compacto.cargar_catalogo_rapido(ruta_base)) == _resumen(primero)
+
+
+def test_un_cambio_en_la_base_invalida_la_instantanea(ruta_base):
+    catalogo_compacto.cargar_catalogo_rapido(ruta_base)
+    huella = catalogo_compacto.huella_base(ruta_base)
+
+    conn = db_manager.crear_conexion(ruta_base)
+    db_manager.insertar_materia(conn, "5005", "TALLER", 2)
+    conn.close()
+
+    assert catalogo_compacto.huella_base(ruta_base) != huella
+    assert catalogo_compacto.cargar_catalogo_rapido(ruta_base).materia("5005") is not None
+    assert catalogo_compacto.leer_instantanea(catalogo_compacto.ruta_instantanea(ruta_base),
+                                              catalogo_compacto.huella_base(ruta_base)) is not None
+
+
+def test_una_carga_fallida_no_escribe_la_instantanea(tmp_path):
+    ruta = str(tmp_path / "anterior.db")
+    conn = db_manager.crear_conexion(ruta)
+    conn.execute("CREATE TABLE Materias (codigo_materia TEXT PRIMARY KEY, nombre_materia TEXT, creditos INTEGER)")
+    conn.commit()
+    try:
+        with pytest.raises(sqlite3.Error):
+            catalogo_compacto.cargar_catalogo_rapido(ruta, conn=conn)
+    finally:
+        conn.close()
+    assert not os.path.exists(catalogo_compacto.ruta_instantanea(ruta))
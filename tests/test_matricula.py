@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+
+import pytest
+
+from logica import matricula
+
+
+@pytest.fixture
+def conn_matricula(ruta_base):
+    conn = matricula.abrir_conexion_matricula(ruta_base)
+    conn.execute("UPDATE GruposMateria SET cupos = 2 WHERE id_grupo_materia = 10")
+    yield conn
+    conn.close()
+
+
+def _cupos(conn, id_grupo):
+    return conn.execute("SELECT cupos FROM GruposMateria WHERE id_grupo_materia = ?", (id_grupo,)).fetchone()[0]
+
+
+def test_cupo_lleno_pasa_a_lista_de_espera(conn_matricula):
+    conn = conn_matricula
+    assert matricula.matricular(conn, "a", 10) == matricula.MATRICULADO
+    assert matricula.matricular(conn, "b", 10) == matricula.MATRICULADO
+    assert matricula.matricular(conn, "c", 10) == matricula.EN_LISTA_ESPERA
+    assert matricula.matricular(conn, "d", 10, lista_espera=False) == matricula.SIN_CUPO
+    assert matricula.matricular(conn, "c", 10) == matricula.EN_LISTA_ESPERA  # no se repite en la lista
+    assert _cupos(conn, 10) == 0
+    assert matricula.obtener_lista_espera(conn, 10) == ["c"]
+
+
+def test_cancelar_promueve_al_primero_sin_cruces(conn_matricula):
+    conn = conn_matricula
+    for estudiante in ("a", "b"):
+        matricula.matricular(conn, estudiante, 10)
+    # "c" llega primero a la lista pero luego toma el grupo 20 (lunes 09:00), que se cruza con el 10
+    assert matricula.matricular(conn, "c", 10) == matricula.EN_LISTA_ESPERA
+    assert matricula.matricular(conn, "d", 10) == matricula.EN_LISTA_ESPERA
+    assert matricula.matricular(conn, "c", 20) == matricula.MATRICULADO
+
+    assert matricula.cancelar_matricula(conn, "a", 10) == (matricula.CANCELADO, "d")
+    assert _cupos(conn, 10) == 0
+    assert matricula.obtener_lista_espera(conn, 10) == ["c"]
+    assert [fila[0] for fila in matricula.obtener_matriculas_estudiante(conn, "d")] == [10]
+    assert matricula.obtener_matriculas_estudiante(conn, "a") == []
+
+    # Sin nadie que pueda tomarlo, el cupo queda libre
+    assert matricula.cancelar_matricula(conn, "b", 10) == (matricula.CANCELADO, None)
+    assert _cupos(conn, 10) == 1
+    assert matricula.cancelar_matricula(conn, "b", 10) == (matricula.NO_MATRICULADO, None)
+
+
+def test_rechazos(conn_matricula):
+    conn = conn_matricula
+    assert matricula.matricular(conn, "a", 10) == matricula.MATRICULADO
+    assert matricula.matricular(conn, "a", 11) == matricula.YA_MATRICULADO
+    assert matricula.matricular(conn, "a", 20) == matricula.CONFLICTO_HORARIO
+    assert matricula.matricular(conn, "a", 999) == matricula.GRUPO_INEXISTENTE
+
+    conn.execute("INSERT INTO SesionesClase(id_grupo_materia_fk, tipo_sesion, dia_semana, hora_inicio, hora_fin) "
+                 "VALUES (30, 'Teoría', 'Domingo', '08:00', '10:00')")
+    assert matricula.matricular(conn, "a", 30) == matricula.GRUPO_INVALIDO
+    assert matricula.cancelar_matricula(conn, "a", 30) == (matricula.GRUPO_INVALIDO, None)
+    assert _cupos(conn, 10) == 1
+
+
+def test_no_confirma_la_transaccion_del_llamador(conn_matricula):
+    conn = conn_matricula
+    conn.execute("BEGIN")
+    conn.execute("UPDATE GruposMateria SET cupos = 50 WHERE id_grupo_materia = 30")
+    with pytest.raises(sqlite3.ProgrammingError):
+        matricula.matricular(conn, "a", 10)
+    conn.execute("ROLLBACK")
+    assert _cupos(conn, 30) == 40
+
+
+def test_conexiones_concurrentes_no_venden_de_mas(ruta_base, conn_matricula):
+    estados = []
+
+    def estudiante(numero):
+        conn = matricula.abrir_conexion_matricula(ruta_base)
+        try:
+            estados.append(matricula.matricular(conn, f"e{numero}", 10))
+        finally:
+            conn.close()
+
+    hilos = [threading.Thread(target=estudiante, args=(i,)) for i in range(12)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert estados.count(matricula.MATRICULADO) == 2
+    assert estados.count(matricula.EN_LISTA_ESPERA) == 10
+    assert _cupos(conn_matricula, 10) == 0
+    assert conn_matricula.execute("SELECT COUNT(*) FROM Matriculas").fetchone()[0] == 2
+    assert len(matricula.obtener_lista_espera(conn_matricula, 10)) == 10
@@ -0,0 +1,126 @@
+import sqlite3
+
+import pytest
+
+from database import db_manager
+
+from conftest import FILAS
+
+CODIGOS = sorted({fila[0] for fila in FILAS})
+
+
+def _base_anterior(ruta, filas=FILAS):
+    """Base con el esquema anterior: SesionesClase guarda docente y salón como texto."""
+    conn = db_manager.crear_conexion(ruta)
+    conn.executescript("""
+        CREATE TABLE Materias (codigo_materia TEXT PRIMARY KEY, nombre_materia TEXT NOT NULL, creditos INTEGER);
+        CREATE TABLE GruposMateria (
+            id_grupo_materia INTEGER PRIMARY KEY AUTOINCREMENT,
+            codigo_materia_fk TEXT NOT NULL,
+            nombre_grupo TEXT NOT NULL,
+            cupos INTEGER,
+            FOREIGN KEY (codigo_materia_fk) REFERENCES Materias (codigo_materia) ON DELETE CASCADE ON UPDATE CASCADE
+        );
+        CREATE TABLE SesionesClase (
+            id_sesion INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_grupo_materia_fk INTEGER NOT NULL,
+            tipo_sesion TEXT NOT NULL,
+            dia_semana TEXT NOT NULL,
+            hora_inicio TEXT NOT NULL,
+            hora_fin TEXT NOT NULL,
+            docente TEXT,
+            salon TEXT,
+            FOREIGN KEY (id_grupo_materia_fk) REFERENCES GruposMateria (id_grupo_materia) ON DELETE CASCADE ON UPDATE CASCADE
+        );
+    """)
+    for codigo, nombre, creditos, id_grupo, grupo, cupos, id_sesion, tipo, dia, inicio, fin, docente, salon in filas:
+        conn.execute("INSERT OR IGNORE INTO Materias VALUES (?, ?, ?)", (codigo, nombre, creditos))
+        if id_grupo is not None:
+            conn.execute("INSERT OR IGNORE INTO GruposMateria VALUES (?, ?, ?, ?)", (id_grupo, codigo, grupo, cupos))
+        if id_sesion is not None:
+            conn.execute("INSERT INTO SesionesClase VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (id_sesion, id_grupo, tipo, dia, inicio, fin, docente, salon))
+    conn.commit()
+    return conn
+
+
+def _ordenar(filas):
+    return sorted(filas, key=lambda fila: (fila[0], fila[6] or 0))
+
+
+def test_la_migracion_conserva_docentes_y_salones(tmp_path):
+    conn = _base_anterior(str(tmp_path / "anterior.db"))
+    try:
+        assert db_manager.necesita_migracion(conn)
+        db_manager.crear_tablas(conn)
+
+        assert not db_manager.necesita_migracion(conn)
+        assert _ordenar(db_manager.obtener_sesiones_catalogo(conn)) == _ordenar(FILAS)
+        docentes = {nombre for _, nombre in db_manager.obtener_todos_los_docentes(conn)}
+        assert docentes == {"RAMIREZ ANA", "PEREZ LUIS", "GOMEZ SOFIA"}
+        assert conn.execute("SELECT COUNT(*) FROM Salones").fetchone()[0] == 4
+    finally:
+        conn.close()
+
+
+def test_las_consultas_por_materia_no_cambian(tmp_path, conn):
+    anterior = _base_anterior(str(tmp_path / "anterior.db"))
+    try:
+        db_manager.crear_tablas(anterior)
+        for codigo in CODIGOS:
+            assert db_manager.obtener_materia_con_detalles(anterior, codigo) == \
+                db_manager.obtener_materia_con_detalles(conn, codigo)
+            assert db_manager.obtener_horarios_de_materia(anterior, codigo) == \
+                db_manager.obtener_horarios_de_materia(conn, codigo)
+    finally:
+        anterior.close()
+
+    assert db_manager.obtener_horarios_de_materia(conn, "2002") == [
+        {"dia_semana": "Lunes", "hora_inicio": "09:00", "hora_fin": "11:00", "nombre_grupo": "Grupo 1",
+         "docente": "GOMEZ SOFIA", "salon": "A101", "tipo_sesion": "Teoría"},
+        {"dia_semana": "Miércoles", "hora_inicio": "14:00", "hora_fin": "16:00", "nombre_grupo": "Grupo 2",
+         "docente": "RAMIREZ ANA", "salon": "LAB1", "tipo_sesion": "Laboratorio"},
+    ]
+    detalles = db_manager.obtener_materia_con_detalles(conn, "1001")
+    assert [grupo["id_db_grupo"] for grupo in detalles["grupos_materia"]] == [10, 11]
+    assert detalles["grupos_materia"][0]["sesiones"] == [
+        {"id_db_sesion": 100, "tipo": "Teoría", "dia": "Lunes", "hora_inicio": "08:00", "hora_fin": "10:00",
+         "docente": "RAMIREZ ANA", "salon": "A101"},
+    ]
+    assert db_manager.obtener_materia_con_detalles(conn, "4004")["grupos_materia"] == []
+
+
+def test_nombres_que_solo_difieren_en_mayusculas_quedan_en_un_registro(tmp_path):
+    filas = FILAS + [("1001", "CALCULO DIFERENCIAL", 4, 10, "Grupo 1", 30, 102, "Teoría", "Viernes",
+                      "08:00", "10:00", "ramirez ana", "a101")]
+    conn = _base_anterior(str(tmp_path / "anterior.db"), filas)
+    try:
+        db_manager.crear_tablas(conn)
+        assert not db_manager.necesita_migracion(conn)
+        fk = conn.execute("SELECT id_docente_fk, id_salon_fk FROM SesionesClase WHERE id_sesion IN (100, 102)").fetchall()
+        assert fk[0] == fk[1]
+        assert db_manager.obtener_sesion_por_id(conn, 102)[6:] == ("RAMIREZ ANA", "A101")
+    finally:
+        conn.close()
+
+
+def test_conexion_migrada_rechaza_la_base_anterior(tmp_path):
+    ruta = str(tmp_path / "anterior.db")
+    _base_anterior(ruta).close()
+    assert db_manager.crear_conexion_migrada(ruta) is None
+
+    conn = db_manager.crear_conexion(ruta)
+    db_manager.crear_tablas(conn)
+    conn.close()
+    conn = db_manager.crear_conexion_migrada(ruta)
+    assert conn is not None
+    conn.close()
+
+
+def test_obtener_sesiones_catalogo_falla_en_la_base_anterior(tmp_path):
+    conn = _base_anterior(str(tmp_path / "anterior.db"))
+    try:
+        with pytest.raises(sqlite3.Error):
+            db_manager.obtener_sesiones_catalogo(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,66 @@
+from database import db_manager
+
+
+def _sesiones(conn):
+    return conn.execute("SELECT COUNT(*) FROM SesionesClase").fetchone()[0]
+
+
+def test_insertar_rechaza_cruces_de_salon_y_docente(conn):
+    antes = _sesiones(conn)
+    # A101 está ocupado el lunes de 08:00 a 11:00; RAMIREZ ANA dicta el lunes de 08:00 a 10:00
+    assert db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "10:30", "11:30", "OTRO", "A101",
+                                            estricto=True) is None
+    assert db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "09:30", "10:30", "ramirez ana", "B9",
+                                            estricto=True) is None
+    assert _sesiones(conn) == antes
+
+    # Tocarse en el borde no es cruzarse
+    nueva = db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "11:00", "12:00", "RAMIREZ ANA", "A101",
+                                             estricto=True)
+    assert nueva is not None
+    assert db_manager.obtener_sesion_por_id(conn, nueva)[3:] == ("Lunes", "11:00", "12:00", "RAMIREZ ANA", "A101")
+
+
+def test_sin_modo_estricto_se_aceptan_los_cruces(conn):
+    assert db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "08:00", "09:00", "OTRO", "A101") is not None
+    with db_manager.modo_estricto():
+        assert db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "08:00", "09:00", "OTRO", "A101") is None
+        with db_manager.modo_estricto(False):
+            assert db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "08:00", "09:00", "OTRO", "A101")
+    assert not db_manager.MODO_ESTRICTO
+
+
+def test_actualizar_rechaza_el_cambio_que_se_cruza(conn):
+    assert not db_manager.actualizar_sesion_clase(conn, 300, dia_semana="Lunes", hora_inicio="08:00",
+                                                  hora_fin="10:00", salon="A101", estricto=True)
+    assert db_manager.obtener_sesion_por_id(conn, 300)[3:] == ("Jueves", "10:00", "12:00", "GOMEZ SOFIA", "A205")
+    # La sesión no choca consigo misma
+    assert db_manager.actualizar_sesion_clase(conn, 300, hora_inicio="11:00", estricto=True)
+
+
+def test_lote_estricto_cuenta_los_cruces_dentro_del_lote(conn):
+    cruzado = [(101, "Viernes", "08:00", "10:00", "B1"), (300, "Viernes", "09:00", "11:00", "B1")]
+    assert db_manager.actualizar_franjas_sesiones(conn, cruzado, estricto=True) is None
+    assert db_manager.obtener_sesion_por_id(conn, 101)[3:6] == ("Martes", "08:00", "10:00")
+    assert db_manager.obtener_sesion_por_id(conn, 300)[3:6] == ("Jueves", "10:00", "12:00")
+
+    assert db_manager.actualizar_salones_sesiones(conn, [(100, "A102"), (101, "A102")], estricto=True) == 2
+    assert db_manager.actualizar_salones_sesiones(conn, [(300, "A102"), (200, "A102")], estricto=True) is None
+    assert db_manager.obtener_sesion_por_id(conn, 200)[7] == "A101"
+    assert db_manager.actualizar_salones_sesiones(conn, [(300, "A102"), (200, "A102")]) == 2
+
+
+def test_el_rechazo_no_descarta_la_transaccion_del_llamador(conn):
+    conn.execute("INSERT INTO Materias VALUES ('5005', 'TALLER', 2)")
+    assert conn.in_transaction
+
+    assert db_manager.insertar_sesion_clase(conn, 30, "Teoría", "Lunes", "08:00", "09:00", "OTRO", "A101",
+                                            estricto=True) is None
+    assert not db_manager.actualizar_sesion_clase(conn, 300, dia_semana="Lunes", hora_inicio="08:00",
+                                                  hora_fin="10:00", salon="A101", estricto=True)
+    assert db_manager.actualizar_franjas_sesiones(conn, [(300, "Lunes", "08:00", "10:00", "A101")], estricto=True) is None
+
+    assert conn.in_transaction
+    conn.commit()
+    assert db_manager.obtener_materia_por_codigo(conn, "5005") == ("5005", "TALLER", 2)
+    assert db_manager.obtener_sesion_por_id(conn, 300)[7] == "A205"
@@ -0,0 +1,77 @@
+import pytest
+
+from logica.plan_estudios import GrafoPrerrequisitos, PlanificadorGraduacion
+
+
+def _validar_plan(grafo, plan, aprobadas=(), max_creditos=None, max_materias=None):
+    """Cada materia aparece una vez, después de sus prerrequisitos y sin pasar los límites."""
+    vistas = set(aprobadas)
+    for periodo in plan:
+        for codigo in periodo:
+            assert codigo not in vistas
+            assert grafo.es_elegible(codigo, grafo.mascara(vistas))
+        if max_creditos is not None:
+            assert sum(grafo.creditos[grafo.indice[c]] for c in periodo) <= max_creditos
+        if max_materias is not None:
+            assert len(periodo) <= max_materias
+        vistas.update(periodo)
+    return vistas
+
+
+def test_grafo_rechaza_codigos_desconocidos_y_ciclos():
+    with pytest.raises(ValueError):
+        GrafoPrerrequisitos(["A"], [("A", "X")])
+    with pytest.raises(ValueError):
+        GrafoPrerrequisitos(["A", "B"], [("A", "B"), ("B", "A")])
+
+
+def test_cierre_transitivo():
+    grafo = GrafoPrerrequisitos(["A", "B", "C"], [("B", "A"), ("C", "B")])
+    assert not grafo.es_elegible("C", grafo.mascara(["B"]))
+    assert grafo.es_elegible("C", grafo.mascara(["A", "B"]))
+    assert grafo.codigos_de(grafo.elegibles(grafo.mascara(["A"]), grafo.mascara(["B", "C"]))) == ["B"]
+
+
+def test_plan_optimo_prioriza_la_ruta_critica():
+    # A -> B -> C es la cadena larga; D y E son libres. Con dos materias por
+    # periodo el óptimo son 3 periodos, empezando la cadena desde el primero.
+    grafo = GrafoPrerrequisitos("ABCDE", [("B", "A"), ("C", "B")])
+    planificador = PlanificadorGraduacion(grafo, max_creditos=None, max_materias=2)
+
+    plan = planificador.planificar()
+
+    assert planificador.es_optimo
+    assert len(plan) == 3
+    assert "A" in plan[0]
+    assert _validar_plan(grafo, plan, max_materias=2) == set("ABCDE")
+
+
+def test_plan_respeta_creditos_aprobadas_y_objetivo():
+    creditos = {"A": 4, "B": 4, "C": 3, "D": 3, "E": 2}
+    grafo = GrafoPrerrequisitos("ABCDE", [("B", "A"), ("D", "C")], creditos)
+    planificador = PlanificadorGraduacion(grafo, max_creditos=7)
+
+    plan = planificador.planificar(aprobadas=["A"], objetivo=["D"])
+
+    assert planificador.es_optimo
+    assert plan == [["C"], ["D"]]
+    _validar_plan(grafo, plan, aprobadas=["A"], max_creditos=7)
+
+
+def test_materia_que_no_cabe_en_un_periodo():
+    grafo = GrafoPrerrequisitos(["A"], [], {"A": 20})
+    with pytest.raises(ValueError):
+        PlanificadorGraduacion(grafo, max_creditos=18).planificar()
+
+
+def test_limite_de_nodos_devuelve_plan_voraz_valido():
+    codigos = [f"M{i}" for i in range(12)]
+    prerrequisitos = [(codigos[i], codigos[i - 3]) for i in range(3, 12)]
+    creditos = {codigo: 3 + i % 3 for i, codigo in enumerate(codigos)}
+    grafo = GrafoPrerrequisitos(codigos, prerrequisitos, creditos)
+    planificador = PlanificadorGraduacion(grafo, max_creditos=10, limite_nodos=1)
+
+    plan = planificador.planificar()
+
+    assert not planificador.es_optimo
+    assert _validar_plan(grafo, plan, max_creditos=10) == set(codigos)